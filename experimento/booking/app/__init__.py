@@ -1,14 +1,26 @@
 from flask import Flask
 from flask_cors import CORS
 from .database import init_db
+from .clients import init_clients
+from .room_cache import init_room_cache
+from .dispatcher import init_dispatcher
+from .logging_config import configure_logging, init_request_logging
+from .metrics import init_metrics
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('app.config.Config')
     
+    configure_logging(app)
+    
     CORS(app)
     
     init_db(app)
+    init_request_logging(app)
+    init_clients(app)
+    init_room_cache(app)
+    init_dispatcher(app)
+    init_metrics(app)
     
     from .routes import booking_bp
     app.register_blueprint(booking_bp, url_prefix='/api')
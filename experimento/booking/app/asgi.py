@@ -0,0 +1,913 @@
+"""
+ASGI variant of the booking service.
+
+Serves the same /api/bookings/confirm contract as create_app, but every
+wait (Redis, the inventory service, PostgreSQL) is awaited, so a single
+process keeps hundreds of bookings in flight instead of one per gunicorn
+worker. The room price lookup and the lock acquisition run concurrently.
+
+Only the synchronous, retry-mode locking path is supported: create_asgi_app
+refuses to start with LOCK_MODE=queue, BOOKING_MODE=async or
+BOOKING_DISPATCH=lanes. Idempotency-Key is answered from the bookings
+table alone (no Redis record, no waiting on an in-flight duplicate).
+
+    uvicorn --factory app.asgi:create_asgi_app --port 5003
+"""
+
+import time
+import uuid
+import re
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+import httpx
+import redis.asyncio as aioredis
+from quart import Quart, Blueprint, Response, request, jsonify, current_app
+from prometheus_client import CONTENT_TYPE_LATEST
+from quart_cors import cors
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from .models import Booking
+from .booking_service import (
+    CONFIRM_ATTEMPTS,
+    NoFreeUnit,
+    taken_units_query,
+    lowest_free_unit,
+    same_booking_request
+)
+from .idempotency import IDEMPOTENCY_HEADER
+from .room_cache import (
+    RoomCache,
+    ROOM_META_KEY_PREFIX,
+    ROOM_META_VERSION_KEY_PREFIX,
+    FILL_IF_UNCHANGED_SCRIPT,
+    fill_args,
+    _decode
+)
+from .redis_lock import (
+    ACQUIRE_ALL_SCRIPT,
+    RELEASE_ALL_SCRIPT,
+    RENEW_ALL_SCRIPT,
+    FENCE_KEY_PREFIX,
+    LockLost,
+    fence_seed
+)
+from .logging_config import configure_logging, bind_log_context, current_request_id, REQUEST_ID_HEADER
+from .metrics import (
+    render_metrics,
+    record_request,
+    INVENTORY_REQUEST_SECONDS,
+    LOCK_ACQUIRE_SECONDS,
+    LOCK_ATTEMPTS
+)
+
+logger = logging.getLogger(__name__)
+
+booking_asgi_bp = Blueprint('booking_asgi', __name__)
+
+
+def async_database_url(url):
+    """
+    Maps the sync DATABASE_URL onto its asyncio driver.
+    """
+
+    for prefix, async_prefix in (
+        ('postgresql://', 'postgresql+asyncpg://'),
+        ('sqlite://', 'sqlite+aiosqlite://')
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+
+    return url
+
+
+class AsyncMultiKeyRedisLock:
+    """
+    redis.asyncio port of MultiKeyRedisLock (retry mode): the same Lua
+    scripts, so sync and ASGI instances exclude each other and share the
+    room fencing counter.
+    """
+
+    def __init__(self, redis_client, lock_keys, fence_key, timeout=10):
+        self.redis_client = redis_client
+        self.lock_keys = sorted(lock_keys)
+        self.fence_key = fence_key
+        self.timeout = timeout
+        self.lock_value = str(uuid.uuid4())
+        self.acquired = False
+        self.fencing_token = None
+        self.lost = False
+        self.attempts = 0
+        self._renew_task = None
+
+    async def acquire(self, retry_attempts=3, retry_delay=0.1):
+        """
+        Retry-mode acquisition, observed under the same lock metrics as
+        BookingLockManager.acquire.
+        """
+
+        start = time.perf_counter()
+
+        acquired = await self._acquire(retry_attempts, retry_delay)
+
+        outcome = 'acquired' if acquired else 'timeout'
+
+        LOCK_ACQUIRE_SECONDS.labels('retry', outcome).observe(time.perf_counter() - start)
+        LOCK_ATTEMPTS.labels('retry', outcome).observe(self.attempts)
+
+        return acquired
+
+    async def _acquire(self, retry_attempts, retry_delay):
+
+        for attempt in range(retry_attempts):
+
+            self.attempts += 1
+
+            token = await self.redis_client.eval(
+                ACQUIRE_ALL_SCRIPT,
+                len(self.lock_keys) + 1,
+                self.fence_key,
+                *self.lock_keys,
+                self.lock_value,
+                int(self.timeout * 1000),
+                fence_seed()
+            )
+
+            if token:
+                self.acquired = True
+                self.fencing_token = int(token)
+                return True
+
+            if attempt < retry_attempts - 1:
+                await asyncio.sleep(retry_delay * (2 ** attempt))
+
+        logger.warning(f"Failed to acquire locks: {self.lock_keys}")
+        return False
+
+    async def _renew(self, interval):
+
+        while True:
+
+            await asyncio.sleep(interval)
+
+            renewed = await self.redis_client.eval(
+                RENEW_ALL_SCRIPT,
+                len(self.lock_keys),
+                *self.lock_keys,
+                self.lock_value,
+                int(self.timeout * 1000)
+            )
+
+            if renewed != len(self.lock_keys):
+                self.lost = True
+                logger.error(f"Lock lease lost: {self.lock_keys}")
+                return
+
+    def start_renewal(self, interval):
+
+        self._renew_task = asyncio.create_task(self._renew(interval))
+
+    async def release(self):
+
+        if self._renew_task:
+            self._renew_task.cancel()
+            self._renew_task = None
+
+        if not self.acquired:
+            return
+
+        try:
+            await self.redis_client.eval(
+                RELEASE_ALL_SCRIPT,
+                len(self.lock_keys),
+                *self.lock_keys,
+                self.lock_value
+            )
+        except Exception as e:
+            logger.error(f"Error releasing locks: {str(e)}")
+        finally:
+            self.acquired = False
+
+
+UNSUPPORTED_SETTINGS = {
+    'LOCK_MODE': 'queue',
+    'BOOKING_MODE': 'async',
+    'BOOKING_DISPATCH': 'lanes'
+}
+
+
+def _room_busy(start_time):
+    """
+    Same retryable answer as the sync service's lock contention.
+    """
+
+    elapsed_time = time.time() - start_time
+
+    return jsonify({
+        'success': False,
+        'error': 'Room is busy, please retry',
+        'retryable': True,
+        'response_time': f"{elapsed_time:.3f}s"
+    }), 409, {'Retry-After': '1'}
+
+
+async def _booking_for_idempotency_key(session, key, data):
+    """
+    Replays a confirmed booking stored under key, or answers 422 when the
+    key came with a different request. None lets the request run.
+    """
+
+    booking = (await session.execute(
+        select(Booking).where(Booking.idempotency_key == key)
+    )).scalar_one_or_none()
+
+    if booking is None:
+        return None
+
+    if not same_booking_request(booking, data):
+        return jsonify({
+            'success': False,
+            'error': f'{IDEMPOTENCY_HEADER} was already used with a different request'
+        }), 422
+
+    if booking.status != 'confirmed':
+        return None
+
+    return jsonify({
+        'success': True,
+        'message': 'Booking confirmed successfully',
+        'booking': booking.to_dict()
+    }), 201, {'Idempotent-Replayed': 'true'}
+
+
+def _confirm_with_unit(session, booking, total_quantity):
+    """
+    Sync half of the confirm, run through AsyncSession.run_sync: assigns the
+    lowest free unit in a savepoint and picks again on an exclusion
+    conflict, as reserve_and_confirm does. A rolled back savepoint expires
+    the booking, which only a sync session can reload.
+    """
+
+    for attempt in range(CONFIRM_ATTEMPTS):
+
+        try:
+
+            with session.begin_nested():
+                taken = set(session.execute(taken_units_query(booking)).scalars())
+                booking.room_unit = lowest_free_unit(taken, total_quantity)
+                booking.status = 'confirmed'
+
+            return
+
+        except IntegrityError:
+
+            if attempt == CONFIRM_ATTEMPTS - 1:
+                raise
+
+            logger.info(f"Room unit taken for booking {booking.id}, picking again")
+
+
+def _nights(check_in, check_out):
+
+    nights = []
+
+    current_date = check_in
+
+    while current_date < check_out:
+
+        nights.append(current_date)
+
+        current_date += timedelta(days=1)
+
+    return nights
+
+
+def _redis():
+
+    return current_app.extensions['redis']
+
+
+def _inventory():
+
+    return current_app.extensions['inventory_client']
+
+
+async def find_sold_out_nights(room_id, nights):
+
+    prefix = current_app.config['AVAILABILITY_COUNTER_PREFIX']
+
+    try:
+
+        values = await _redis().mget(
+            [f"{prefix}{room_id}:{night.isoformat()}" for night in nights]
+        )
+
+    except Exception as e:
+
+        logger.warning(f"Availability counter check failed: {str(e)}")
+
+        return []
+
+    return [
+        night for night, value in zip(nights, values)
+        if value is not None and int(value.split(':')[0]) <= 0
+    ]
+
+
+async def get_room_metadata(room_id):
+
+    cache = current_app.extensions['room_cache']
+
+    room = cache.get(room_id)
+
+    if room is not None:
+        return room
+
+    key = f"{ROOM_META_KEY_PREFIX}{room_id}"
+    version_key = f"{ROOM_META_VERSION_KEY_PREFIX}{room_id}"
+
+    try:
+        async with _redis().pipeline() as pipe:
+            data, version = await pipe.hgetall(key).get(version_key).execute()
+    except Exception as e:
+        logger.warning(f"Room cache read failed for {room_id}: {str(e)}")
+        data = version = None
+
+    if data:
+        room = _decode(data)
+        cache.set(room_id, room)
+        return room
+
+    response = await _inventory().get(f"/rooms/{room_id}")
+
+    if response.status_code != 200:
+        return None
+
+    room = _decode(response.json()['room'])
+
+    stale = False
+
+    # Same generation check as the sync fill.
+    if data is not None:
+
+        try:
+            stale = not await _redis().eval(
+                FILL_IF_UNCHANGED_SCRIPT,
+                2,
+                key,
+                version_key,
+                *fill_args(version, current_app.config['ROOM_CACHE_REDIS_TTL'], room)
+            )
+        except Exception as e:
+            logger.warning(f"Room cache write failed for {room_id}: {str(e)}")
+
+    if not stale:
+        cache.set(room_id, room)
+
+    return room
+
+
+async def watch_room_changes(app, cache):
+    """
+    Async counterpart of RoomChangeSubscriber: evicts rooms from the
+    in-process cache when the inventory service publishes a change.
+    """
+
+    # Dedicated connection: the pool's socket_timeout would cut an idle
+    # subscription every few seconds.
+    subscriber = aioredis.Redis(
+        host=app.config['REDIS_HOST'],
+        port=app.config['REDIS_PORT'],
+        db=app.config['REDIS_DB'],
+        decode_responses=True
+    )
+
+    while True:
+
+        try:
+
+            pubsub = subscriber.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(app.config['ROOM_EVENTS_CHANNEL'])
+
+            async for message in pubsub.listen():
+
+                if message['type'] == 'message':
+                    cache.invalidate(int(message['data']))
+
+        except asyncio.CancelledError:
+
+            raise
+
+        except Exception as e:
+
+            logger.warning(f"Room change subscription lost: {str(e)}")
+
+            await asyncio.sleep(1)
+
+
+async def compensate_reservation(room_id, check_in, check_out, reservation_key):
+
+    retry_attempts = current_app.config.get('COMPENSATION_RETRY_ATTEMPTS', 5)
+    retry_delay = current_app.config.get('COMPENSATION_RETRY_DELAY', 0.2)
+
+    for attempt in range(retry_attempts):
+
+        try:
+
+            response = await _inventory().post(
+                f"/rooms/{room_id}/release-range",
+                json={
+                    'check_in': check_in.strftime('%Y-%m-%d'),
+                    'check_out': check_out.strftime('%Y-%m-%d'),
+                    'reservation_key': reservation_key
+                }
+            )
+
+            if response.status_code == 200:
+                logger.info(f"Compensated reservation {reservation_key} for room {room_id}")
+                return True
+
+            if response.status_code == 400:
+                logger.error(f"Compensation rejected for {reservation_key}: {response.text}")
+                return False
+
+        except httpx.HTTPError as e:
+
+            logger.warning(
+                f"Compensation attempt {attempt + 1} failed "
+                f"for {reservation_key}: {str(e)}"
+            )
+
+        if attempt < retry_attempts - 1:
+            await asyncio.sleep(retry_delay * (2 ** attempt))
+
+    logger.error(
+        f"Compensation exhausted retries for {reservation_key}, "
+        f"leaving it to the reconciler"
+    )
+
+    return False
+
+
+@booking_asgi_bp.route('/health', methods=['GET'])
+async def health():
+
+    try:
+        await _redis().ping()
+        redis_status = 'connected'
+    except Exception as e:
+        redis_status = f'error: {str(e)}'
+
+    return jsonify({
+        'status': 'healthy',
+        'service': 'booking-asgi',
+        'redis': redis_status
+    }), 200
+
+
+@booking_asgi_bp.route('/bookings/confirm', methods=['POST'])
+async def confirm_booking():
+
+    start_time = time.time()
+
+    try:
+
+        data = await request.get_json()
+
+        user_id = data.get('user_id')
+        room_id = data.get('room_id')
+        check_in_date_str = data.get('check_in_date')
+        check_out_date_str = data.get('check_out_date')
+
+        if not all([user_id, room_id, check_in_date_str, check_out_date_str]):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields'
+            }), 400
+
+        check_in_date = datetime.strptime(check_in_date_str, '%Y-%m-%d').date()
+        check_out_date = datetime.strptime(check_out_date_str, '%Y-%m-%d').date()
+
+        if check_out_date <= check_in_date:
+            return jsonify({
+                'success': False,
+                'error': 'Check-out date must be after check-in date'
+            }), 400
+
+        nights = _nights(check_in_date, check_out_date)
+
+        bind_log_context(
+            user_id=user_id,
+            room_id=room_id,
+            check_in=check_in_date_str,
+            nights=len(nights)
+        )
+
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+
+        if idempotency_key:
+
+            if len(idempotency_key) > 255:
+                return jsonify({
+                    'success': False,
+                    'error': f'{IDEMPOTENCY_HEADER} must be at most 255 characters'
+                }), 400
+
+            async with current_app.extensions['db_sessionmaker']() as session:
+                replay = await _booking_for_idempotency_key(session, idempotency_key, data)
+
+            if replay is not None:
+                return replay
+
+        if current_app.config['FAST_REJECT_ENABLED']:
+
+            sold_out = await find_sold_out_nights(room_id, nights)
+
+            if sold_out:
+
+                elapsed_time = time.time() - start_time
+
+                return jsonify({
+                    'success': False,
+                    'error': 'No availability for the selected dates',
+                    'unavailable_dates': [night.isoformat() for night in sold_out],
+                    'response_time': f"{elapsed_time:.3f}s"
+                }), 409
+
+        lock = None
+
+        if current_app.config.get('LOCK_BACKEND') != 'none':
+
+            lock = AsyncMultiKeyRedisLock(
+                _redis(),
+                [f"lock:room:{room_id}:{night.isoformat()}" for night in nights],
+                f"{FENCE_KEY_PREFIX}{room_id}",
+                current_app.config.get('LOCK_TIMEOUT', 10)
+            )
+
+        async def acquire():
+
+            if lock is None:
+                return True
+
+            return await lock.acquire(
+                current_app.config.get('LOCK_RETRY_ATTEMPTS', 3),
+                current_app.config.get('LOCK_RETRY_DELAY', 0.1)
+            )
+
+        try:
+
+            # The price lookup does not need the lock, so both waits overlap.
+            # return_exceptions lets acquire() finish even when the lookup
+            # fails, so the finally below releases whatever it took.
+            room_data, acquired = await asyncio.gather(
+                get_room_metadata(room_id),
+                acquire(),
+                return_exceptions=True
+            )
+
+            for result in (room_data, acquired):
+                if isinstance(result, BaseException):
+                    raise result
+
+            if room_data is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Could not get room information'
+                }), 500
+
+            if not acquired:
+                return _room_busy(start_time)
+
+            renew_interval = current_app.config.get('LOCK_RENEW_INTERVAL')
+
+            if lock and renew_interval:
+                lock.start_renewal(renew_interval)
+
+            total_price = room_data['price_per_night'] * len(nights)
+
+            async with current_app.extensions['db_sessionmaker']() as session:
+
+                booking = Booking(
+                    user_id=user_id,
+                    room_id=room_id,
+                    check_in_date=check_in_date,
+                    check_out_date=check_out_date,
+                    total_price=total_price,
+                    status='pending',
+                    reservation_key=uuid.uuid4().hex,
+                    idempotency_key=idempotency_key
+                )
+
+                session.add(booking)
+
+                try:
+
+                    await session.flush()
+
+                except IntegrityError:
+
+                    # A duplicate with the same key got here first; its
+                    # insert blocked ours until it committed or rolled back.
+                    await session.rollback()
+
+                    replay = await _booking_for_idempotency_key(session, idempotency_key, data)
+
+                    return replay if replay is not None else _room_busy(start_time)
+
+                bind_log_context(booking_id=booking.id)
+
+                # Kept apart from the booking, whose attributes a rollback
+                # would expire.
+                reservation = (room_id, check_in_date, check_out_date, booking.reservation_key)
+
+                try:
+
+                    reserve_response = await _inventory().post(
+                        f"/rooms/{room_id}/reserve-range",
+                        json={
+                            'check_in': check_in_date_str,
+                            'check_out': check_out_date_str,
+                            'reservation_key': booking.reservation_key,
+                            'fencing_token': lock.fencing_token if lock else None
+                        }
+                    )
+
+                except httpx.HTTPError:
+
+                    await session.rollback()
+
+                    await compensate_reservation(*reservation)
+
+                    raise
+
+                if reserve_response.status_code != 200:
+
+                    await session.rollback()
+
+                    return jsonify({
+                        'success': False,
+                        'error': reserve_response.json().get('error', 'Could not reserve room')
+                    }), 409
+
+                try:
+
+                    await session.run_sync(_confirm_with_unit, booking, room_data['total_quantity'])
+
+                    if lock and lock.lost:
+                        raise LockLost(f"Lock lease lost: {lock.lock_keys}")
+
+                    await session.commit()
+
+                except NoFreeUnit as e:
+
+                    logger.warning(f"Booking not confirmed: {str(e)}")
+
+                    await session.rollback()
+
+                    await compensate_reservation(*reservation)
+
+                    return jsonify({
+                        'success': False,
+                        'error': str(e)
+                    }), 409
+
+                except (IntegrityError, LockLost) as conflict:
+
+                    # Another holder may have taken over the nights or the
+                    # unit; give the reservation back and let the client retry.
+                    logger.warning(f"Booking not confirmed: {str(conflict)}")
+
+                    await session.rollback()
+
+                    await compensate_reservation(*reservation)
+
+                    return _room_busy(start_time)
+
+                except Exception:
+
+                    await session.rollback()
+
+                    await compensate_reservation(*reservation)
+
+                    raise
+
+                elapsed_time = time.time() - start_time
+
+                logger.info(
+                    f"Booking confirmed: ID={booking.id}, "
+                    f"Room={room_id}, User={user_id}, "
+                    f"Time={elapsed_time:.3f}s"
+                )
+
+                return jsonify({
+                    'success': True,
+                    'message': 'Booking confirmed successfully',
+                    'booking': booking.to_dict(),
+                    'response_time': f"{elapsed_time:.3f}s"
+                }), 201
+
+        finally:
+
+            if lock:
+                await lock.release()
+
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid date format: {str(ve)}'
+        }), 400
+
+    except httpx.HTTPError as he:
+
+        logger.error(f"Inventory service error: {str(he)}")
+
+        return jsonify({
+            'success': False,
+            'error': 'Inventory service unavailable'
+        }), 503
+
+    except Exception as e:
+
+        logger.error(f"Error confirming booking: {str(e)}")
+
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@booking_asgi_bp.route('/bookings/<int:booking_id>', methods=['GET'])
+async def get_booking(booking_id):
+
+    try:
+
+        async with current_app.extensions['db_sessionmaker']() as session:
+            booking = await session.get(Booking, booking_id)
+
+        if not booking:
+            return jsonify({
+                'success': False,
+                'error': 'Booking not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'booking': booking.to_dict()
+        }), 200
+
+    except Exception as e:
+
+        logger.error(f"Error getting booking {booking_id}: {str(e)}")
+
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+async def forward_request_id(inventory_request):
+
+    request_id = current_request_id()
+
+    if request_id:
+        inventory_request.headers[REQUEST_ID_HEADER] = request_id
+
+    inventory_request.extensions['started'] = time.perf_counter()
+
+
+async def observe_inventory_response(response):
+
+    started = response.request.extensions.get('started')
+
+    if started is not None:
+
+        # Same labels as the sync client: the route template, not the room.
+        path = response.request.url.path[len(current_app.extensions['inventory_base_path']):]
+        endpoint = re.sub(r'/rooms/\d+', '/rooms/<room_id>', path)
+
+        INVENTORY_REQUEST_SECONDS.labels(endpoint, str(response.status_code)).observe(
+            time.perf_counter() - started
+        )
+
+
+def create_asgi_app():
+    app = Quart(__name__)
+    app.config.from_object('app.config.Config')
+
+    for setting, unsupported in UNSUPPORTED_SETTINGS.items():
+        if app.config.get(setting) == unsupported:
+            raise RuntimeError(f"The ASGI variant does not support {setting}={unsupported}")
+
+    configure_logging(app)
+
+    app = cors(app)
+
+    # Each request runs in its own task, so the bound context never leaks
+    # into the next one.
+    @app.before_request
+    async def bind_request_context():
+
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+
+        request.request_id = request_id
+        request.started = time.perf_counter()
+
+        bind_log_context(
+            request_id=request_id,
+            method=request.method,
+            path=request.path,
+            sampled=random.random() < app.config['LOG_SAMPLE_RATE']
+        )
+
+    @app.after_request
+    async def add_request_id_header(response):
+
+        request_id = getattr(request, 'request_id', None)
+
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+
+        started = getattr(request, 'started', None)
+
+        if started is not None and request.url_rule is not None:
+            record_request(
+                request.url_rule.rule,
+                request.method,
+                response.status_code,
+                time.perf_counter() - started
+            )
+
+        return response
+
+    @app.route('/metrics')
+    async def metrics():
+
+        return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+    @app.before_serving
+    async def open_clients():
+
+        config = app.config
+
+        app.extensions['redis'] = aioredis.Redis(
+            connection_pool=aioredis.BlockingConnectionPool(
+                host=config['REDIS_HOST'],
+                port=config['REDIS_PORT'],
+                db=config['REDIS_DB'],
+                max_connections=config['ASGI_REDIS_POOL_SIZE'],
+                timeout=config['REDIS_POOL_TIMEOUT'],
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_timeout=5
+            )
+        )
+
+        app.extensions['inventory_base_path'] = httpx.URL(config['INVENTORY_SERVICE_URL']).path.rstrip('/')
+
+        app.extensions['inventory_client'] = httpx.AsyncClient(
+            base_url=config['INVENTORY_SERVICE_URL'],
+            timeout=config['INVENTORY_TIMEOUT'],
+            event_hooks={
+                'request': [forward_request_id],
+                'response': [observe_inventory_response]
+            },
+            limits=httpx.Limits(
+                max_connections=config['ASGI_INVENTORY_POOL_SIZE'],
+                max_keepalive_connections=config['ASGI_INVENTORY_POOL_SIZE']
+            )
+        )
+
+        engine = create_async_engine(
+            config['ASYNC_DATABASE_URL'] or async_database_url(config['SQLALCHEMY_DATABASE_URI']),
+            echo=config['SQLALCHEMY_ECHO'],
+            **({'pool_size': config['ASGI_DB_POOL_SIZE']}
+               if config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql') else {})
+        )
+
+        app.extensions['db_engine'] = engine
+        app.extensions['db_sessionmaker'] = async_sessionmaker(engine, expire_on_commit=False)
+
+        app.extensions['room_cache'] = RoomCache(
+            config['ROOM_CACHE_SIZE'],
+            config['ROOM_CACHE_TTL']
+        )
+
+        app.extensions['room_watcher'] = asyncio.create_task(
+            watch_room_changes(app, app.extensions['room_cache'])
+        )
+
+    @app.after_serving
+    async def close_clients():
+
+        app.extensions['room_watcher'].cancel()
+
+        await app.extensions['inventory_client'].aclose()
+        await app.extensions['redis'].aclose()
+        await app.extensions['db_engine'].dispose()
+
+    app.register_blueprint(booking_asgi_bp, url_prefix='/api')
+
+    return app
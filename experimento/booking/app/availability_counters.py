@@ -0,0 +1,44 @@
+import logging
+from datetime import timedelta
+from flask import current_app
+from .clients import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def find_sold_out_nights(room_id, check_in, check_out):
+    """
+    Checks the inventory service's Redis availability counters with a single
+    MGET. Returns the nights whose counter says sold out. Missing counters
+    and Redis errors count as unknown, so the request goes on to the
+    authoritative lock + inventory path.
+    """
+
+    prefix = current_app.config['AVAILABILITY_COUNTER_PREFIX']
+
+    nights = []
+
+    current_date = check_in
+
+    while current_date < check_out:
+
+        nights.append(current_date)
+
+        current_date += timedelta(days=1)
+
+    try:
+
+        values = get_redis_client().mget(
+            [f"{prefix}{room_id}:{night.isoformat()}" for night in nights]
+        )
+
+    except Exception as e:
+
+        logger.warning(f"Availability counter check failed: {str(e)}")
+
+        return []
+
+    return [
+        night for night, value in zip(nights, values)
+        if value is not None and int(value.split(':')[0]) <= 0
+    ]
@@ -0,0 +1,259 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+import redis
+import requests
+from flask import current_app
+from sqlalchemy import update
+from .database import db
+from .models import Booking
+from .clients import get_redis_client
+from .booking_service import reserve_and_confirm
+from .hash_ring import HashRing
+from .logging_config import bind_log_context, clear_log_context
+
+logger = logging.getLogger(__name__)
+
+
+_rings = {}
+
+
+def partition_for(room_id, partitions=None):
+
+    if partitions is None:
+        partitions = current_app.config['BOOKING_STREAM_PARTITIONS']
+
+    ring = _rings.get(partitions)
+
+    if ring is None:
+        ring = _rings.setdefault(
+            partitions,
+            HashRing(range(partitions), current_app.config['HASH_RING_REPLICAS'])
+        )
+
+    return ring.get_node(int(room_id))
+
+
+def stream_key(partition):
+
+    return f"{current_app.config['BOOKING_STREAM_PREFIX']}{partition}"
+
+
+def enqueue_booking(booking):
+    """
+    Appends a committed pending booking to its room's stream partition.
+    Every booking for a room lands on the same partition, and each
+    partition has exactly one consumer, so a room is processed serially.
+    The stream is not capped: a MAXLEN trim could drop entries nobody has
+    processed yet. Consumers delete entries once they are acked instead.
+    """
+
+    return get_redis_client().xadd(
+        stream_key(partition_for(booking.room_id)),
+        {'booking_id': booking.id}
+    )
+
+
+def requeue_stale_bookings():
+    """
+    Re-queues bookings still pending BOOKING_PENDING_TIMEOUT seconds after
+    they were last queued, whose stream entry was lost (a crash between
+    commit and XADD, a Redis failover). Processing is idempotent and a
+    room's entries share one consumer, so a booking that was only slow is
+    skipped the second time. updated_at is bumped, so each booking is
+    re-queued at most once per timeout. Returns how many were re-queued.
+    """
+
+    cutoff = datetime.utcnow() - timedelta(
+        seconds=current_app.config['BOOKING_PENDING_TIMEOUT']
+    )
+
+    stale = db.session.execute(
+        update(Booking).where(
+            Booking.status == 'pending',
+            Booking.updated_at < cutoff
+        ).values(
+            updated_at=datetime.utcnow()
+        ).returning(
+            Booking.id,
+            Booking.room_id
+        ),
+        execution_options={'synchronize_session': False}
+    ).all()
+
+    db.session.commit()
+
+    if not stale:
+        return 0
+
+    pipe = get_redis_client().pipeline(transaction=False)
+
+    for booking in stale:
+        pipe.xadd(stream_key(partition_for(booking.room_id)), {'booking_id': booking.id})
+
+    pipe.execute()
+
+    logger.warning(f"Re-queued {len(stale)} bookings pending for over {current_app.config['BOOKING_PENDING_TIMEOUT']}s")
+
+    return len(stale)
+
+
+def process_booking_job(booking_id):
+    """
+    Reserves inventory for a queued booking and settles its status.
+    Redelivered jobs are safe: a booking that already left pending is
+    skipped, and replaying its reservation_key is a no-op in inventory.
+    """
+
+    booking = Booking.query.get(booking_id)
+
+    if booking is None or booking.status != 'pending':
+        return
+
+    bind_log_context(
+        booking_id=booking.id,
+        user_id=booking.user_id,
+        room_id=booking.room_id,
+        check_in=booking.check_in_date.isoformat(),
+        nights=(booking.check_out_date - booking.check_in_date).days
+    )
+
+    try:
+
+        error = reserve_and_confirm(booking)
+
+    except requests.RequestException as e:
+
+        logger.error(f"Inventory service error for booking {booking_id}: {str(e)}")
+
+        _settle(booking_id, 'failed', 'Inventory service unavailable')
+
+        return
+
+    except Exception as e:
+
+        logger.error(f"Error processing booking {booking_id}: {str(e)}")
+
+        _settle(booking_id, 'failed', str(e))
+
+        return
+
+    if error:
+
+        db.session.rollback()
+
+        _settle(booking_id, 'rejected', error)
+
+        return
+
+    logger.info(
+        f"Booking confirmed: ID={booking_id}, "
+        f"Room={booking.room_id}, User={booking.user_id}"
+    )
+
+
+def _settle(booking_id, status, reason):
+
+    booking = Booking.query.get(booking_id)
+
+    booking.status = status
+    booking.failure_reason = reason[:255]
+
+    db.session.commit()
+
+
+class PartitionConsumer(threading.Thread):
+    """
+    Single consumer of one booking stream partition. Entries are read
+    through a consumer group named after the partition, so entries left
+    un-acked by a crashed worker are picked up again when it restarts.
+    """
+
+    def __init__(self, app, partition):
+        super().__init__(daemon=True, name=f"booking-partition-{partition}")
+        self.app = app
+        self.partition = partition
+        self._stop_event = threading.Event()
+
+    def stop(self):
+
+        self._stop_event.set()
+
+    def run(self):
+
+        with self.app.app_context():
+
+            redis_client = get_redis_client()
+
+            key = stream_key(self.partition)
+            group = current_app.config['BOOKING_CONSUMER_GROUP']
+            consumer = f"partition-{self.partition}"
+            block_ms = current_app.config['BOOKING_WORKER_BLOCK_MS']
+            batch_size = current_app.config['BOOKING_WORKER_BATCH_SIZE']
+
+            try:
+                redis_client.xgroup_create(key, group, id='0', mkstream=True)
+            except redis.ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+
+            # Drain this consumer's un-acked entries first, then new ones.
+            last_id = '0'
+
+            while not self._stop_event.is_set():
+
+                try:
+
+                    response = redis_client.xreadgroup(
+                        group,
+                        consumer,
+                        {key: last_id},
+                        count=batch_size,
+                        block=block_ms
+                    )
+
+                except redis.RedisError as e:
+
+                    logger.error(f"Error reading {key}: {str(e)}")
+
+                    self._stop_event.wait(1)
+
+                    continue
+
+                entries = response[0][1] if response else []
+
+                if not entries:
+
+                    last_id = '>'
+
+                    continue
+
+                for entry_id, fields in entries:
+
+                    try:
+                        # Entries deleted from the stream come back empty.
+                        if fields:
+                            process_booking_job(int(fields['booking_id']))
+                    except Exception as e:
+                        logger.error(f"Error processing stream entry {entry_id}: {str(e)}")
+                        break
+                    finally:
+                        db.session.remove()
+                        clear_log_context()
+
+                    # Acked entries are deleted so the stream only holds
+                    # unfinished work.
+                    pipe = redis_client.pipeline(transaction=False)
+                    pipe.xack(key, group, entry_id)
+                    pipe.xdel(key, entry_id)
+                    pipe.execute()
+
+                else:
+                    continue
+
+                # The booking could not be settled (e.g. the database is
+                # down). Leave the entry un-acked and read this consumer's
+                # pending entries again, starting with it, after a pause.
+                last_id = '0'
+
+                self._stop_event.wait(1)
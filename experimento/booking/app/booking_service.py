@@ -0,0 +1,216 @@
+import uuid
+import logging
+import requests
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from .database import db
+from .models import Booking
+from .inventory_client import reserve_room_range
+from .compensation import compensate_reservation
+from .room_cache import get_room_metadata
+from .logging_config import bind_log_context
+
+logger = logging.getLogger(__name__)
+
+# Two bookings of the same room confirmed at once (no per-room locks with
+# LOCK_BACKEND=none, or lanes in different workers) can pick the same
+# unit; the exclusion constraint rejects the second one and it picks again.
+CONFIRM_ATTEMPTS = 3
+
+
+class NoFreeUnit(Exception):
+    pass
+
+
+def reserve_and_confirm(booking, locks=None):
+    """
+    Reserves the booking's nights in inventory and commits it as confirmed.
+    Returns None on success, or the inventory error when the nights could
+    not be reserved (nothing is committed then; the caller decides what
+    happens to the booking). Ambiguous inventory failures and failed
+    commits are compensated by reservation_key and re-raised, as is a
+    booking whose locks' lease was lost before the commit. A booking with
+    no free unit left is compensated and returns that error: confirming it
+    without a unit would slip past the exclusion constraint.
+    """
+
+    try:
+
+        reserve_response = reserve_room_range(
+            booking.room_id,
+            booking.check_in_date,
+            booking.check_out_date,
+            booking.reservation_key,
+            locks.fencing_token if locks else None
+        )
+
+    except requests.RequestException:
+
+        # The reservation may or may not have landed; release it
+        # by key so an ambiguous timeout never leaks capacity.
+        rollback_and_compensate(booking)
+
+        raise
+
+    if reserve_response.status_code != 200:
+
+        return reserve_response.json().get(
+            'error',
+            'Could not reserve room'
+        )
+
+    try:
+
+        for attempt in range(CONFIRM_ATTEMPTS):
+
+            try:
+
+                # A savepoint, so a unit conflict only undoes this attempt
+                # and not the booking's insert.
+                with db.session.begin_nested():
+                    booking.room_unit = assign_room_unit(booking)
+                    booking.status = 'confirmed'
+
+                break
+
+            except IntegrityError:
+
+                if attempt == CONFIRM_ATTEMPTS - 1:
+                    raise
+
+                logger.info(f"Room unit taken for booking {booking.id}, picking again")
+
+        if locks:
+            locks.ensure_held()
+
+        db.session.commit()
+
+    except NoFreeUnit as e:
+
+        logger.warning(f"Booking {booking.id} not confirmed: {str(e)}")
+
+        rollback_and_compensate(booking)
+
+        return str(e)
+
+    except Exception:
+
+        rollback_and_compensate(booking)
+
+        raise
+
+    return None
+
+
+def assign_room_unit(booking):
+    """
+    Picks the lowest unit of the room that no confirmed booking holds on
+    any night of this stay. Inventory already guarantees there is spare
+    capacity; the exclusion constraint on (room_id, room_unit, stay) turns
+    any disagreement into a failed commit instead of a double assignment,
+    and NoFreeUnit is raised when every unit is taken.
+    """
+
+    room = get_room_metadata(booking.room_id)
+
+    if room is None:
+        raise NoFreeUnit('Could not get room information')
+
+    taken = set(db.session.execute(taken_units_query(booking)).scalars())
+
+    return lowest_free_unit(taken, room['total_quantity'])
+
+
+def taken_units_query(booking):
+    """
+    Units of the booking's room held by a confirmed booking on any night
+    of its stay. Shared with the ASGI variant, which runs it on an async
+    session.
+    """
+
+    return select(Booking.room_unit).where(
+        Booking.room_id == booking.room_id,
+        Booking.status == 'confirmed',
+        Booking.room_unit.isnot(None),
+        Booking.check_in_date < booking.check_out_date,
+        Booking.check_out_date > booking.check_in_date
+    )
+
+
+def lowest_free_unit(taken, total_quantity):
+
+    for unit in range(1, total_quantity + 1):
+        if unit not in taken:
+            return unit
+
+    raise NoFreeUnit('No free room unit for the selected dates')
+
+
+def same_booking_request(booking, data):
+    """
+    Whether a request body asks for exactly this booking, for replaying a
+    retried Idempotency-Key.
+    """
+
+    return (
+        str(booking.user_id) == str(data.get('user_id')) and
+        str(booking.room_id) == str(data.get('room_id')) and
+        booking.check_in_date.isoformat() == data.get('check_in_date') and
+        booking.check_out_date.isoformat() == data.get('check_out_date')
+    )
+
+
+def create_and_confirm(user_id, room_id, check_in, check_out, total_price,
+                       locks=None, idempotency_key=None):
+    """
+    Creates the booking and runs reserve_and_confirm for it. Returns
+    (booking dict, None) when confirmed or (None, inventory error) when the
+    nights were taken; a rejected booking is never persisted.
+    """
+
+    booking = Booking(
+        user_id=user_id,
+        room_id=room_id,
+        check_in_date=check_in,
+        check_out_date=check_out,
+        total_price=total_price,
+        status='pending',
+        reservation_key=uuid.uuid4().hex,
+        idempotency_key=idempotency_key
+    )
+
+    db.session.add(booking)
+    db.session.flush()
+
+    bind_log_context(booking_id=booking.id)
+
+    error = reserve_and_confirm(booking, locks)
+
+    if error:
+
+        db.session.rollback()
+
+        return None, error
+
+    return booking.to_dict(), None
+
+
+def rollback_and_compensate(booking):
+    """
+    Rolls back the session and releases the booking's reservation by key,
+    for a reservation that may have landed although the booking won't.
+    """
+
+    room_id = booking.room_id
+    check_in = booking.check_in_date
+    check_out = booking.check_out_date
+    reservation_key = booking.reservation_key
+
+    db.session.rollback()
+
+    compensate_reservation(
+        room_id,
+        check_in,
+        check_out,
+        reservation_key
+    )
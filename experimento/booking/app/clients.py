@@ -0,0 +1,111 @@
+import threading
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    Blocking Redis pool that also tracks how many callers are waiting for a
+    free connection, so pool exhaustion shows up in the pool metrics.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    def get_connection(self, command_name, *keys, **options):
+
+        if not self.pool.empty():
+            return super().get_connection(command_name, *keys, **options)
+
+        with self._waiting_lock:
+            self._waiting += 1
+
+        try:
+            return super().get_connection(command_name, *keys, **options)
+        finally:
+            with self._waiting_lock:
+                self._waiting -= 1
+
+    def stats(self):
+
+        idle = sum(1 for connection in list(self.pool.queue) if connection is not None)
+        created = len(self._connections)
+
+        return {
+            'max_connections': self.max_connections,
+            'created': created,
+            'checked_out': created - idle,
+            'idle': idle,
+            'waiting': self._waiting
+        }
+
+
+def init_clients(app):
+    """
+    Builds the process-wide Redis pool and inventory HTTP session. Neither
+    connects here; with gunicorn --preload they are built in the master and
+    each worker opens its own connections after the fork (redis-py resets
+    a pool inherited from another pid).
+    """
+
+    app.extensions['redis_pool'] = InstrumentedConnectionPool(
+        host=app.config['REDIS_HOST'],
+        port=app.config['REDIS_PORT'],
+        db=app.config['REDIS_DB'],
+        max_connections=app.config['REDIS_POOL_SIZE'],
+        timeout=app.config['REDIS_POOL_TIMEOUT'],
+        decode_responses=True,
+        socket_connect_timeout=5,
+        socket_timeout=5
+    )
+
+    session = requests.Session()
+
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=app.config['INVENTORY_POOL_SIZE']
+    )
+
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    app.extensions['inventory_session'] = session
+
+
+def get_redis_client():
+
+    return redis.Redis(connection_pool=current_app.extensions['redis_pool'])
+
+
+def get_http_session():
+
+    return current_app.extensions['inventory_session']
+
+
+def pool_stats():
+
+    http_pools = []
+
+    for adapter in set(get_http_session().adapters.values()):
+
+        for key in adapter.poolmanager.pools.keys():
+
+            pool = adapter.poolmanager.pools[key]
+            idle = pool.pool.qsize() if pool.pool else 0
+
+            http_pools.append({
+                'host': f"{pool.scheme}://{pool.host}:{pool.port}",
+                'max_connections': pool.pool.maxsize if pool.pool else 0,
+                'created': pool.num_connections,
+                'checked_out': (pool.pool.maxsize - idle) if pool.pool else 0,
+                'requests': pool.num_requests
+            })
+
+    return {
+        'redis': current_app.extensions['redis_pool'].stats(),
+        'inventory_http': http_pools
+    }
@@ -0,0 +1,199 @@
+import time
+import logging
+from datetime import date
+import requests
+from flask import current_app
+from .database import db
+from .models import Booking
+from .inventory_client import (
+    release_room_range,
+    list_reservations,
+    lookup_reservations
+)
+
+logger = logging.getLogger(__name__)
+
+LIVE_BOOKING_STATUSES = ('pending', 'held', 'confirmed')
+
+
+def compensate_reservation(room_id, check_in, check_out, reservation_key):
+    """
+    Saga compensation step: gives back the nights taken by reservation_key.
+    Retries with exponential backoff; release-range is idempotent, so
+    retrying after an ambiguous failure is always safe. Returns False when
+    every attempt failed and the reservation is left for the reconciler.
+    """
+
+    retry_attempts = current_app.config.get('COMPENSATION_RETRY_ATTEMPTS', 5)
+    retry_delay = current_app.config.get('COMPENSATION_RETRY_DELAY', 0.2)
+
+    for attempt in range(retry_attempts):
+
+        try:
+
+            response = release_room_range(
+                room_id,
+                check_in,
+                check_out,
+                reservation_key
+            )
+
+            if response.status_code == 200:
+
+                logger.info(
+                    f"Compensated reservation {reservation_key} "
+                    f"for room {room_id}"
+                )
+
+                return True
+
+            if response.status_code == 400:
+
+                logger.error(
+                    f"Compensation rejected for {reservation_key}: "
+                    f"{response.text}"
+                )
+
+                return False
+
+        except requests.RequestException as e:
+
+            logger.warning(
+                f"Compensation attempt {attempt + 1} failed "
+                f"for {reservation_key}: {str(e)}"
+            )
+
+        if attempt < retry_attempts - 1:
+            time.sleep(retry_delay * (2 ** attempt))
+
+    logger.error(
+        f"Compensation exhausted retries for {reservation_key}, "
+        f"leaving it to the reconciler"
+    )
+
+    return False
+
+
+def release_orphan_reservations():
+    """
+    Releases inventory reservations older than the grace period that no
+    pending or confirmed booking owns.
+    """
+
+    grace_period = current_app.config.get('RECONCILE_GRACE_PERIOD', 300)
+    batch_size = current_app.config.get('RECONCILE_BATCH_SIZE', 500)
+
+    orphaned = 0
+    released = 0
+    after_id = 0
+
+    while True:
+
+        response = list_reservations(
+            status='reserved',
+            older_than=grace_period,
+            after_id=after_id,
+            limit=batch_size
+        )
+
+        response.raise_for_status()
+
+        reservations = response.json()['reservations']
+
+        if not reservations:
+            break
+
+        keys = [r['reservation_key'] for r in reservations]
+
+        live_keys = {
+            key for (key,) in db.session.query(Booking.reservation_key).filter(
+                Booking.reservation_key.in_(keys),
+                Booking.status.in_(LIVE_BOOKING_STATUSES)
+            )
+        }
+
+        for reservation in reservations:
+
+            if reservation['reservation_key'] in live_keys:
+                continue
+
+            orphaned += 1
+
+            if compensate_reservation(
+                reservation['room_id'],
+                date.fromisoformat(reservation['check_in']),
+                date.fromisoformat(reservation['check_out']),
+                reservation['reservation_key']
+            ):
+                released += 1
+
+        after_id = reservations[-1]['id']
+
+    return orphaned, released
+
+
+def find_unbacked_bookings():
+    """
+    Returns ids of confirmed, not yet finished bookings whose inventory
+    reservation is missing or released. These cannot be fixed
+    automatically without risking an oversell, so they are only reported.
+    """
+
+    batch_size = current_app.config.get('RECONCILE_BATCH_SIZE', 500)
+
+    query = Booking.query.filter(
+        Booking.status == 'confirmed',
+        Booking.reservation_key.isnot(None),
+        Booking.check_out_date >= date.today()
+    ).order_by(Booking.id)
+
+    unbacked = []
+    batch = []
+
+    for booking in query.yield_per(batch_size):
+
+        batch.append(booking)
+
+        if len(batch) >= batch_size:
+            unbacked.extend(_unbacked_in(batch))
+            batch = []
+
+    if batch:
+        unbacked.extend(_unbacked_in(batch))
+
+    return unbacked
+
+
+def _unbacked_in(bookings):
+
+    response = lookup_reservations(b.reservation_key for b in bookings)
+
+    response.raise_for_status()
+
+    statuses = response.json()['statuses']
+
+    return [
+        b.id for b in bookings
+        if statuses.get(b.reservation_key) != 'reserved'
+    ]
+
+
+def reconcile_reservations():
+
+    orphaned, released = release_orphan_reservations()
+
+    unbacked = find_unbacked_bookings()
+
+    if orphaned or unbacked:
+
+        logger.warning(
+            f"Reconciliation: {orphaned} orphan reservations, "
+            f"{released} released, {len(unbacked)} unbacked bookings "
+            f"{unbacked[:20]}"
+        )
+
+    return {
+        'orphan_reservations': orphaned,
+        'released': released,
+        'unbacked_bookings': unbacked
+    }
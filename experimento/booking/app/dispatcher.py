@@ -0,0 +1,125 @@
+import time
+import queue
+import logging
+import contextvars
+import threading
+from concurrent.futures import Future
+from flask import current_app
+from .database import db
+from .hash_ring import HashRing
+
+logger = logging.getLogger(__name__)
+
+
+class LaneBusy(Exception):
+    pass
+
+
+class Lane(threading.Thread):
+    """
+    Single writer for the rooms hashed onto it: jobs run one at a time, in
+    arrival order, each inside its own app context.
+    """
+
+    def __init__(self, app, index, queue_size):
+        super().__init__(daemon=True, name=f"booking-lane-{index}")
+        self.app = app
+        self.jobs = queue.Queue(maxsize=queue_size)
+
+    def run(self):
+
+        while True:
+
+            future, deadline, context, fn, args = self.jobs.get()
+
+            if time.monotonic() > deadline:
+                # The caller stopped waiting; running it now would confirm a
+                # booking nobody is told about.
+                future.set_exception(LaneBusy('Booking lane wait exceeded'))
+                continue
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self.app.app_context():
+
+                try:
+                    # The caller's log context (request id, room, ...)
+                    # follows the job onto the lane.
+                    future.set_result(context.run(fn, *args))
+                except BaseException as e:
+                    future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+
+class BookingDispatcher:
+    """
+    Consistent-hashes room_id onto a fixed set of in-process lanes, so
+    bookings for the same room are serialized by a queue instead of racing
+    for per-night locks. Lanes start on first use.
+    """
+
+    def __init__(self, app, lanes, queue_size, max_wait, replicas=100):
+        self.app = app
+        self.lane_count = lanes
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.ring = HashRing(range(lanes), replicas)
+        self._lanes = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+
+        if self._lanes is not None:
+            return self._lanes
+
+        with self._start_lock:
+
+            if self._lanes is None:
+
+                lanes = [
+                    Lane(self.app, index, self.queue_size)
+                    for index in range(self.lane_count)
+                ]
+
+                for lane in lanes:
+                    lane.start()
+
+                self._lanes = lanes
+
+        return self._lanes
+
+    def submit(self, room_id, fn, *args):
+        """
+        Queues fn(*args) on the room's lane and returns a Future. Raises
+        LaneBusy right away when the lane's queue is full.
+        """
+
+        lane = self._ensure_started()[self.ring.get_node(room_id)]
+
+        future = Future()
+        deadline = time.monotonic() + self.max_wait
+
+        try:
+            lane.jobs.put_nowait((future, deadline, contextvars.copy_context(), fn, args))
+        except queue.Full:
+            raise LaneBusy(f"Booking lane for room {room_id} is full")
+
+        return future
+
+
+def init_dispatcher(app):
+
+    app.extensions['booking_dispatcher'] = BookingDispatcher(
+        app,
+        app.config['BOOKING_LANES'],
+        app.config['BOOKING_LANE_QUEUE_SIZE'],
+        app.config['BOOKING_LANE_MAX_WAIT'],
+        app.config['HASH_RING_REPLICAS']
+    )
+
+
+def get_dispatcher():
+
+    return current_app.extensions['booking_dispatcher']
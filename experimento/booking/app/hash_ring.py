@@ -0,0 +1,50 @@
+import bisect
+import hashlib
+
+
+class HashRing:
+    """
+    Consistent-hash ring with virtual nodes. Adding or removing a node only
+    moves the keys that hashed next to it, so resizing the lanes or stream
+    partitions reshuffles a fraction of the rooms instead of all of them.
+    """
+
+    def __init__(self, nodes, replicas=100):
+        self.replicas = replicas
+        self._hashes = []
+        self._nodes = {}
+
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(value):
+
+        return int.from_bytes(hashlib.md5(str(value).encode()).digest()[:8], 'big')
+
+    def add(self, node):
+
+        for replica in range(self.replicas):
+
+            point = self._hash(f"{node}#{replica}")
+
+            bisect.insort(self._hashes, point)
+            self._nodes[point] = node
+
+    def remove(self, node):
+
+        for replica in range(self.replicas):
+
+            point = self._hash(f"{node}#{replica}")
+
+            self._hashes.remove(point)
+            del self._nodes[point]
+
+    def get_node(self, key):
+
+        if not self._hashes:
+            return None
+
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+
+        return self._nodes[self._hashes[index]]
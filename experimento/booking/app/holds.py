@@ -0,0 +1,378 @@
+import time
+import uuid
+import logging
+from datetime import datetime, timedelta
+import redis
+import requests
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from .database import db
+from .models import Booking
+from .clients import get_redis_client
+from .inventory_client import reserve_room_range, release_reservations
+from .booking_service import assign_room_unit, rollback_and_compensate, CONFIRM_ATTEMPTS, NoFreeUnit
+from .logging_config import bind_log_context
+
+logger = logging.getLogger(__name__)
+
+
+class HoldError(Exception):
+
+    def __init__(self, error, status_code):
+        super().__init__(error)
+        self.error = error
+        self.status_code = status_code
+
+
+def _hold_key(booking_id):
+
+    return f"{current_app.config['HOLD_KEY_PREFIX']}{booking_id}"
+
+
+def hold_to_dict(booking, expires_in):
+
+    hold = booking.to_dict()
+
+    hold['expires_at'] = booking.hold_expires_at.isoformat()
+    hold['expires_in'] = expires_in
+
+    return hold
+
+
+def create_hold(user_id, room_id, check_in, check_out, total_price, ttl, locks=None):
+    """
+    Reserves the nights in inventory for a booking in 'held' status and
+    schedules its expiry in ttl seconds. Inventory's write-through takes
+    the nights off the availability counters right away, so the crowd is
+    fast-rejected while the hold lives. Returns (hold dict, None), or
+    (None, inventory error) when the nights were taken; a rejected hold is
+    never persisted.
+    """
+
+    booking = Booking(
+        user_id=user_id,
+        room_id=room_id,
+        check_in_date=check_in,
+        check_out_date=check_out,
+        total_price=total_price,
+        status='held',
+        reservation_key=uuid.uuid4().hex,
+        hold_expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+    )
+
+    db.session.add(booking)
+    db.session.flush()
+
+    bind_log_context(booking_id=booking.id)
+
+    try:
+
+        reserve_response = reserve_room_range(
+            room_id,
+            check_in,
+            check_out,
+            booking.reservation_key,
+            locks.fencing_token if locks else None
+        )
+
+    except requests.RequestException:
+
+        rollback_and_compensate(booking)
+
+        raise
+
+    if reserve_response.status_code != 200:
+
+        db.session.rollback()
+
+        return None, reserve_response.json().get(
+            'error',
+            'Could not reserve room'
+        )
+
+    try:
+
+        if locks:
+            locks.ensure_held()
+
+        db.session.commit()
+
+    except Exception:
+
+        rollback_and_compensate(booking)
+
+        raise
+
+    try:
+
+        pipe = get_redis_client().pipeline()
+
+        pipe.set(_hold_key(booking.id), booking.reservation_key, ex=ttl)
+        pipe.zadd(current_app.config['HOLD_EXPIRY_KEY'], {booking.id: time.time() + ttl})
+
+        pipe.execute()
+
+    except redis.RedisError:
+
+        # Without its expiry entry nothing would ever release the hold.
+        expire_holds([booking.id], 'failed', 'Could not schedule hold expiry')
+
+        raise
+
+    return hold_to_dict(booking, ttl), None
+
+
+def get_hold_expires_in(booking_id):
+    """
+    Seconds left on a hold's Redis key, or 0 once it has expired.
+    """
+
+    return max(get_redis_client().ttl(_hold_key(booking_id)), 0)
+
+
+def get_hold(booking_id, user_id):
+    """
+    Loads a booking created as a hold on behalf of user_id. Raises
+    HoldError 400 without a user_id (hold ids are sequential, so they are
+    no secret), 404 for unknown bookings and for those never held, and 403
+    when the hold belongs to someone else.
+    """
+
+    if user_id is None or str(user_id) == '':
+        raise HoldError('user_id is required', 400)
+
+    booking = Booking.query.get(booking_id)
+
+    if booking is None or booking.hold_expires_at is None:
+        raise HoldError('Hold not found', 404)
+
+    if str(booking.user_id) != str(user_id):
+        raise HoldError('Hold belongs to another user', 403)
+
+    return booking
+
+
+def confirm_hold(booking_id, user_id):
+    """
+    Turns a live hold into a confirmed booking. Its nights are already
+    reserved, so there is no lock to take and no inventory call; a
+    conditional UPDATE on status settles the race with the sweeper.
+    Returns (booking dict, replayed): confirming an already confirmed hold
+    answers with the booking again. Raises HoldError otherwise.
+    """
+
+    booking = get_hold(booking_id, user_id)
+
+    if booking.status == 'confirmed':
+        return booking.to_dict(), True
+
+    if booking.status != 'held':
+        raise HoldError(f'Hold is {booking.status}', 410 if booking.status == 'expired' else 409)
+
+    redis_client = get_redis_client()
+
+    # The key's TTL is the hold's deadline; the sweeper may not have
+    # released it yet.
+    if not redis_client.exists(_hold_key(booking_id)):
+        raise HoldError('Hold expired', 410)
+
+    for attempt in range(CONFIRM_ATTEMPTS):
+
+        try:
+
+            room_unit = assign_room_unit(booking)
+
+        except NoFreeUnit as e:
+
+            # Inventory sold nights no unit is free for: give them back
+            # rather than confirm a booking without a unit.
+            logger.warning(f"Hold {booking_id} not confirmed: {str(e)}")
+
+            db.session.rollback()
+
+            expire_holds([booking_id], 'failed', str(e))
+
+            raise HoldError(str(e), 409)
+
+        result = db.session.execute(
+            update(Booking).where(
+                Booking.id == booking_id,
+                Booking.status == 'held'
+            ).values(
+                status='confirmed',
+                room_unit=room_unit,
+                updated_at=datetime.utcnow()
+            ),
+            execution_options={'synchronize_session': False}
+        )
+
+        if result.rowcount == 0:
+
+            db.session.rollback()
+
+            raise HoldError('Hold expired', 410)
+
+        try:
+
+            db.session.commit()
+
+            break
+
+        except IntegrityError:
+
+            db.session.rollback()
+
+            if attempt == CONFIRM_ATTEMPTS - 1:
+                raise
+
+    try:
+
+        pipe = redis_client.pipeline()
+
+        pipe.delete(_hold_key(booking_id))
+        pipe.zrem(current_app.config['HOLD_EXPIRY_KEY'], booking_id)
+
+        pipe.execute()
+
+    except redis.RedisError as e:
+
+        # Harmless: the sweeper skips holds that are no longer 'held'.
+        logger.warning(f"Could not clear hold {booking_id} from Redis: {str(e)}")
+
+    db.session.refresh(booking)
+
+    return booking.to_dict(), False
+
+
+def expire_holds(booking_ids, status='expired', failure_reason=None):
+    """
+    Moves the bookings still 'held' among booking_ids to status and gives
+    their nights back with one bulk inventory call. Holds confirmed in the
+    meantime are left alone. Returns how many holds changed status. If
+    inventory is unreachable they keep the new status and the reconciler
+    releases their reservations, now orphaned, later.
+    """
+
+    if not booking_ids:
+        return 0
+
+    expired = db.session.execute(
+        update(Booking).where(
+            Booking.id.in_(booking_ids),
+            Booking.status == 'held'
+        ).values(
+            status=status,
+            failure_reason=failure_reason,
+            updated_at=datetime.utcnow()
+        ).returning(
+            Booking.id,
+            Booking.room_id,
+            Booking.check_in_date,
+            Booking.check_out_date,
+            Booking.reservation_key
+        ),
+        execution_options={'synchronize_session': False}
+    ).all()
+
+    db.session.commit()
+
+    if not expired:
+        return 0
+
+    try:
+
+        release_reservations([
+            {
+                'reservation_key': hold.reservation_key,
+                'room_id': hold.room_id,
+                'check_in': hold.check_in_date.isoformat(),
+                'check_out': hold.check_out_date.isoformat()
+            }
+            for hold in expired
+        ]).raise_for_status()
+
+    except requests.RequestException as e:
+
+        logger.warning(
+            f"Could not release {len(expired)} holds, "
+            f"leaving them to the reconciler: {str(e)}"
+        )
+
+        return len(expired)
+
+    try:
+
+        pipe = get_redis_client().pipeline()
+
+        for hold in expired:
+            pipe.delete(_hold_key(hold.id))
+            pipe.zrem(current_app.config['HOLD_EXPIRY_KEY'], hold.id)
+
+        pipe.execute()
+
+    except redis.RedisError as e:
+
+        logger.warning(f"Could not clear released holds from Redis: {str(e)}")
+
+    logger.info(f"Released {len(expired)} holds as {status}")
+
+    return len(expired)
+
+
+def sweep_expired_holds():
+    """
+    Claims up to HOLD_SWEEP_BATCH_SIZE holds whose expiry time has passed
+    and releases them. ZREM decides which sweeper owns each hold, so any
+    number of sweepers can run side by side. Returns how many expired.
+    """
+
+    redis_client = get_redis_client()
+
+    expiry_key = current_app.config['HOLD_EXPIRY_KEY']
+
+    due = redis_client.zrangebyscore(
+        expiry_key,
+        '-inf',
+        time.time(),
+        start=0,
+        num=current_app.config['HOLD_SWEEP_BATCH_SIZE']
+    )
+
+    if not due:
+        return 0
+
+    pipe = redis_client.pipeline()
+
+    for booking_id in due:
+        pipe.zrem(expiry_key, booking_id)
+
+    claimed = [
+        int(booking_id)
+        for booking_id, removed in zip(due, pipe.execute())
+        if removed
+    ]
+
+    return expire_holds(claimed)
+
+
+def expire_stale_holds():
+    """
+    Backstop for holds whose sorted-set entry was lost (a sweeper that died
+    after claiming it, a Redis flush): releases holds older than the
+    longest allowed TTL plus the reconcile grace period.
+    """
+
+    cutoff = datetime.utcnow() - timedelta(seconds=(
+        current_app.config['HOLD_MAX_TTL'] +
+        current_app.config.get('RECONCILE_GRACE_PERIOD', 300)
+    ))
+
+    stale = [
+        booking_id for (booking_id,) in db.session.query(Booking.id).filter(
+            Booking.status == 'held',
+            Booking.created_at < cutoff
+        ).order_by(Booking.id).limit(current_app.config['HOLD_SWEEP_BATCH_SIZE'])
+    ]
+
+    return expire_holds(stale)
@@ -0,0 +1,199 @@
+import json
+import time
+import uuid
+import hashlib
+import logging
+from functools import wraps
+import redis
+from flask import current_app, request, make_response
+from .clients import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_PREFIX = 'idem:'
+
+# Deletes the in-flight marker only if this execution still owns it.
+RELEASE_IN_FLIGHT_SCRIPT = """
+local record = redis.call("get", KEYS[1])
+if record and cjson.decode(record)["owner"] == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _fingerprint():
+
+    payload = request.get_json(silent=True)
+
+    body = json.dumps(payload, sort_keys=True) if payload is not None else request.get_data(as_text=True)
+
+    return hashlib.sha256(f"{request.method} {request.path} {body}".encode()).hexdigest()
+
+
+def _replay(record):
+
+    response = make_response(record['body'], record['status'])
+    response.headers['Content-Type'] = record['content_type']
+    response.headers['Idempotent-Replayed'] = 'true'
+
+    for name, value in record.get('headers', {}).items():
+        response.headers[name] = value
+
+    return response
+
+
+def _mismatch():
+
+    return make_response({
+        'success': False,
+        'error': f'{IDEMPOTENCY_HEADER} was already used with a different request'
+    }, 422)
+
+
+def _completed_record(response, fingerprint):
+
+    headers = {}
+
+    if 'Location' in response.headers:
+        headers['Location'] = response.headers['Location']
+
+    return {
+        'state': 'completed',
+        'fingerprint': fingerprint,
+        'status': response.status_code,
+        'body': response.get_data(as_text=True),
+        'content_type': response.content_type,
+        'headers': headers
+    }
+
+
+def idempotent(fallback=None):
+    """
+    Honors the Idempotency-Key header on a view. The first request with a key
+    runs the view and its response is stored in Redis for IDEMPOTENCY_TTL
+    seconds, unless it is a 5xx or carries Retry-After (a transient failure
+    such as lock contention); duplicates get the stored response back, and
+    duplicates arriving while it still runs wait for it instead of running
+    again. Reusing a key with a different body answers 422.
+
+    fallback(key) is consulted before running the view, so a key whose Redis
+    record expired or was lost can still be answered from the database.
+    """
+
+    def decorator(view):
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+
+            if not key:
+                return view(*args, **kwargs)
+
+            if len(key) > 255:
+                return make_response({
+                    'success': False,
+                    'error': f'{IDEMPOTENCY_HEADER} must be at most 255 characters'
+                }, 400)
+
+            config = current_app.config
+            redis_key = f"{IDEMPOTENCY_KEY_PREFIX}{key}"
+            fingerprint = _fingerprint()
+            owner = uuid.uuid4().hex
+            deadline = time.monotonic() + config['IDEMPOTENCY_WAIT']
+
+            try:
+
+                redis_client = get_redis_client()
+
+                in_flight = json.dumps({
+                    'state': 'in_flight',
+                    'fingerprint': fingerprint,
+                    'owner': owner
+                })
+
+                while True:
+
+                    if redis_client.set(redis_key, in_flight, nx=True, ex=config['IDEMPOTENCY_LOCK_TTL']):
+                        break
+
+                    record = redis_client.get(redis_key)
+
+                    if record is None:
+                        # The owner failed and cleared its marker; try again.
+                        continue
+
+                    record = json.loads(record)
+
+                    if record['fingerprint'] != fingerprint:
+                        return _mismatch()
+
+                    if record['state'] == 'completed':
+                        return _replay(record)
+
+                    if time.monotonic() > deadline:
+                        return make_response({
+                            'success': False,
+                            'error': 'A request with this Idempotency-Key is still in progress'
+                        }, 409)
+
+                    time.sleep(config['IDEMPOTENCY_POLL_INTERVAL'])
+
+            except redis.RedisError as e:
+
+                # Without the store, the database's unique key is the only
+                # guard against duplicates.
+                logger.warning(f"Idempotency store unavailable: {str(e)}")
+
+                if fallback:
+                    response = fallback(key)
+                    if response is not None:
+                        return make_response(response)
+
+                return view(*args, **kwargs)
+
+            response = None
+
+            try:
+
+                if fallback:
+                    response = fallback(key)
+
+                if response is None:
+                    response = view(*args, **kwargs)
+
+                response = make_response(response)
+
+            finally:
+
+                try:
+
+                    if (
+                        response is not None and
+                        response.status_code < 500 and
+                        'Retry-After' not in response.headers
+                    ):
+
+                        redis_client.set(
+                            redis_key,
+                            json.dumps(_completed_record(response, fingerprint)),
+                            ex=config['IDEMPOTENCY_TTL']
+                        )
+
+                    else:
+
+                        # Server errors and retryable answers are not final:
+                        # let a retry run again.
+                        redis_client.eval(RELEASE_IN_FLIGHT_SCRIPT, 1, redis_key, owner)
+
+                except redis.RedisError as e:
+
+                    logger.warning(f"Could not store idempotent response for {key}: {str(e)}")
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,121 @@
+from flask import current_app
+from .clients import get_http_session
+from .logging_config import current_request_id, REQUEST_ID_HEADER
+from .metrics import observe_inventory_call
+
+
+def _inventory_url():
+
+    return current_app.config['INVENTORY_SERVICE_URL']
+
+
+def _timeout():
+
+    return current_app.config.get('INVENTORY_TIMEOUT', 5)
+
+
+def _headers():
+
+    # Lets inventory log the same request id as the booking that called it.
+    request_id = current_request_id()
+
+    return {REQUEST_ID_HEADER: request_id} if request_id else {}
+
+
+def _request(endpoint, method, path, **kwargs):
+    """
+    Sends one inventory call and records its latency under endpoint (the
+    route template, so room ids don't explode the label set).
+    """
+
+    return observe_inventory_call(endpoint, lambda: get_http_session().request(
+        method,
+        f"{_inventory_url()}{path}",
+        headers=_headers(),
+        timeout=_timeout(),
+        **kwargs
+    ))
+
+
+def get_room(room_id):
+
+    return _request('/rooms/<room_id>', 'GET', f"/rooms/{room_id}")
+
+
+def reserve_room_range(room_id, check_in, check_out, reservation_key, fencing_token=None):
+    """
+    Reserves every night in [check_in, check_out) in a single, all-or-nothing
+    inventory transaction. Replaying the same reservation_key is a no-op.
+    A fencing_token older than the last one written for any night is
+    rejected with 409.
+    """
+
+    return _request(
+        '/rooms/<room_id>/reserve-range',
+        'POST',
+        f"/rooms/{room_id}/reserve-range",
+        json={
+            'check_in': check_in.strftime('%Y-%m-%d'),
+            'check_out': check_out.strftime('%Y-%m-%d'),
+            'reservation_key': reservation_key,
+            'fencing_token': fencing_token
+        }
+    )
+
+
+def release_room_range(room_id, check_in, check_out, reservation_key):
+    """
+    Releases the nights taken by reservation_key. Idempotent: releasing twice,
+    or releasing a reservation that never landed, returns 200.
+    """
+
+    return _request(
+        '/rooms/<room_id>/release-range',
+        'POST',
+        f"/rooms/{room_id}/release-range",
+        json={
+            'check_in': check_in.strftime('%Y-%m-%d'),
+            'check_out': check_out.strftime('%Y-%m-%d'),
+            'reservation_key': reservation_key
+        }
+    )
+
+
+def release_reservations(reservations):
+    """
+    Bulk release-range in a single inventory transaction. reservations is
+    a list of {'reservation_key', 'room_id', 'check_in', 'check_out'}
+    dicts; keys that never landed are tombstoned as with release-range.
+    """
+
+    return _request(
+        '/reservations/release',
+        'POST',
+        '/reservations/release',
+        json={'reservations': reservations}
+    )
+
+
+def list_reservations(status='reserved', older_than=0, after_id=0, limit=500):
+
+    return _request(
+        '/reservations',
+        'GET',
+        '/reservations',
+        params={
+            'status': status,
+            'older_than': older_than,
+            'after_id': after_id,
+            'limit': limit
+        }
+    )
+
+
+def lookup_reservations(reservation_keys):
+
+    return _request(
+        '/reservations/lookup',
+        'POST',
+        '/reservations/lookup',
+        json={'reservation_keys': list(reservation_keys)}
+    )
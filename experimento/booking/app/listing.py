@@ -0,0 +1,159 @@
+import json
+import base64
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import tuple_
+from .database import db
+from .models import Booking
+
+BOOKING_FIELDS = (
+    'id',
+    'user_id',
+    'room_id',
+    'check_in_date',
+    'check_out_date',
+    'total_price',
+    'status',
+    'reservation_key',
+    'failure_reason',
+    'room_unit',
+    'created_at',
+    'updated_at'
+)
+
+
+class ListingError(ValueError):
+    pass
+
+
+def encode_cursor(created_at, booking_id):
+
+    payload = json.dumps([created_at.isoformat(), booking_id])
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+
+    try:
+
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, booking_id = json.loads(base64.urlsafe_b64decode(padded))
+
+        return datetime.fromisoformat(created_at), int(booking_id)
+
+    except (ValueError, TypeError):
+
+        raise ListingError('Invalid cursor')
+
+
+def parse_fields(value):
+
+    if not value:
+        return BOOKING_FIELDS
+
+    fields = tuple(field.strip() for field in value.split(',') if field.strip())
+
+    unknown = [field for field in fields if field not in BOOKING_FIELDS]
+
+    if unknown:
+        raise ListingError(f"Unknown fields: {', '.join(unknown)}")
+
+    return fields
+
+
+def _serialize(value):
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    if isinstance(value, Decimal):
+        return float(value)
+
+    return value
+
+
+def _projected_query(fields, filters):
+    """
+    Selects only the requested columns plus the keyset columns, ordered by
+    (created_at, id) so each page continues where the cursor left off.
+    """
+
+    columns = list(dict.fromkeys(('created_at', 'id') + fields))
+
+    query = db.session.query(
+        *[getattr(Booking, column) for column in columns]
+    ).filter(*filters).order_by(Booking.created_at, Booking.id)
+
+    return query, columns
+
+
+def _row_to_dict(row, columns, fields):
+
+    values = dict(zip(columns, row))
+
+    return {field: _serialize(values[field]) for field in fields}
+
+
+def list_bookings(*filters):
+    """
+    Keyset-paginated booking listing shared by GET /bookings and
+    GET /bookings/user/<id>.
+
+    Query parameters:
+      limit   page size (default BOOKINGS_PAGE_SIZE, max BOOKINGS_MAX_PAGE_SIZE)
+      cursor  next_cursor from the previous page
+      fields  comma-separated columns to return
+      format  'ndjson' streams every matching row from the cursor on, one
+              JSON object per line, without buffering the result set
+    """
+
+    fields = parse_fields(request.args.get('fields'))
+
+    cursor = request.args.get('cursor')
+
+    if cursor:
+        filters = filters + (
+            tuple_(Booking.created_at, Booking.id) > tuple_(*decode_cursor(cursor)),
+        )
+
+    query, columns = _projected_query(fields, filters)
+
+    if request.args.get('format') == 'ndjson':
+
+        batch_size = current_app.config['BOOKINGS_STREAM_BATCH_SIZE']
+
+        def generate():
+
+            for row in query.yield_per(batch_size):
+                yield json.dumps(_row_to_dict(row, columns, fields)) + '\n'
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson'
+        )
+
+    limit = request.args.get('limit', current_app.config['BOOKINGS_PAGE_SIZE'], type=int)
+
+    if limit < 1:
+        raise ListingError('limit must be positive')
+
+    limit = min(limit, current_app.config['BOOKINGS_MAX_PAGE_SIZE'])
+
+    # One extra row tells whether there is a next page.
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = dict(zip(columns, rows[-1]))
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+
+    return jsonify({
+        'success': True,
+        'count': len(rows),
+        'bookings': [_row_to_dict(row, columns, fields) for row in rows],
+        'next_cursor': next_cursor
+    })
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import copy
+import random
+import logging
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+_log_context = contextvars.ContextVar('log_context', default=None)
+
+_listener = None
+
+
+def bind_log_context(**fields):
+    """
+    Adds fields (booking_id, room_id, nights, ...) to every record logged
+    from the current request, or from the current thread outside one.
+    """
+
+    context = dict(_log_context.get() or {})
+    context.update(fields)
+
+    _log_context.set(context)
+
+
+def current_request_id():
+
+    return (_log_context.get() or {}).get('request_id')
+
+
+def clear_log_context():
+
+    _log_context.set(None)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copies the bound context onto the record. Runs on the emitting thread,
+    before the record is handed to the queue listener.
+    """
+
+    def filter(self, record):
+
+        record.context = _log_context.get() or {}
+
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps WARNING and above, and a sample_rate fraction of the rest. Within
+    a request the decision is made once, so a sampled request keeps all its
+    lines and an unsampled one drops all of them.
+    """
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+
+        if record.levelno >= logging.WARNING or self.sample_rate >= 1:
+            return True
+
+        sampled = getattr(record, 'context', {}).get('sampled')
+
+        if sampled is None:
+            return random.random() < self.sample_rate
+
+        return sampled
+
+
+class JsonFormatter(logging.Formatter):
+
+    converter = time.gmtime
+
+    def format(self, record):
+
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+
+        for field, value in getattr(record, 'context', {}).items():
+            if field != 'sampled':
+                entry[field] = value
+
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Never blocks the request thread: when the listener falls behind and the
+    queue is full, the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+
+        # Resolve the message and traceback on the emitting thread (args
+        # and exception objects can change after the call returns), but
+        # leave the formatting to the listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def enqueue(self, record):
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(value):
+    """
+    'app.redis_lock=WARNING,sqlalchemy.engine=INFO' -> {logger: level}
+    """
+
+    levels = {}
+
+    for item in (value or '').split(','):
+
+        name, _, level = item.strip().partition('=')
+
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+
+    return levels
+
+
+def _start_listener(handler, stream_handler, queue_size):
+
+    global _listener
+
+    handler.queue = queue.Queue(maxsize=queue_size)
+
+    _listener = QueueListener(handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_logging(app):
+    """
+    Routes the root logger through a bounded queue to one stdout handler
+    on a background thread, so request threads only pay for building the
+    record. Idempotent: the app factory may run more than once per process.
+    """
+
+    root = logging.getLogger()
+
+    root.setLevel(app.config['LOG_LEVEL'])
+
+    for name, level in parse_levels(app.config['LOG_LEVELS']).items():
+        logging.getLogger(name).setLevel(level)
+
+    if any(isinstance(handler, DroppingQueueHandler) for handler in root.handlers):
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+
+    if app.config['LOG_FORMAT'] == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s: %(message)s'
+        ))
+
+    handler = DroppingQueueHandler(None)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SamplingFilter(app.config['LOG_SAMPLE_RATE']))
+
+    queue_size = app.config['LOG_QUEUE_SIZE']
+
+    _start_listener(handler, stream_handler, queue_size)
+
+    # gunicorn --preload forks workers after this runs; the listener thread
+    # stays behind in the master, so every child starts its own.
+    os.register_at_fork(
+        after_in_child=lambda: _start_listener(handler, stream_handler, queue_size)
+    )
+
+    atexit.register(_stop_listener)
+
+    root.handlers = [handler]
+
+
+def init_request_logging(app):
+
+    sample_rate = app.config['LOG_SAMPLE_RATE']
+
+    @app.before_request
+    def bind_request_context():
+
+        clear_log_context()
+
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+
+        bind_log_context(
+            request_id=g.request_id,
+            method=request.method,
+            path=request.path,
+            sampled=random.random() < sample_rate
+        )
+
+    @app.after_request
+    def add_request_id_header(response):
+
+        request_id = g.get('request_id')
+
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+
+        return response
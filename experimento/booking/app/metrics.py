@@ -0,0 +1,158 @@
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets from 1 ms to 10 s, dense around the booking P95 range.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075,
+    0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)
+
+REQUEST_SECONDS = Histogram(
+    'booking_http_request_seconds',
+    'Time spent serving a request, by route',
+    ['endpoint', 'method'],
+    buckets=LATENCY_BUCKETS
+)
+
+RESPONSES = Counter(
+    'booking_http_responses_total',
+    'Responses by route and status code (409 = sold out, 503 = dependency down)',
+    ['endpoint', 'method', 'status']
+)
+
+LOCK_ACQUIRE_SECONDS = Histogram(
+    'booking_lock_acquire_seconds',
+    'Time to acquire (or give up on) the per-night Redis locks',
+    ['mode', 'outcome'],
+    buckets=LATENCY_BUCKETS
+)
+
+LOCK_ATTEMPTS = Histogram(
+    'booking_lock_attempts',
+    'Acquire script calls needed per lock acquisition',
+    ['mode', 'outcome'],
+    buckets=(1, 2, 3, 4, 5, 8, 13, 21)
+)
+
+INVENTORY_REQUEST_SECONDS = Histogram(
+    'booking_inventory_request_seconds',
+    'Latency of calls to the inventory service, by endpoint',
+    ['endpoint', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+
+DB_TRANSACTION_SECONDS = Histogram(
+    'booking_db_transaction_seconds',
+    'Time from BEGIN to COMMIT/ROLLBACK on booking_db',
+    ['outcome'],
+    buckets=LATENCY_BUCKETS
+)
+
+
+@event.listens_for(Engine, 'begin')
+def _transaction_started(connection):
+
+    connection.info['transaction_started'] = time.perf_counter()
+
+
+def _transaction_finished(connection, outcome):
+
+    started = connection.info.pop('transaction_started', None)
+
+    if started is not None:
+        DB_TRANSACTION_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+
+
+@event.listens_for(Engine, 'commit')
+def _transaction_committed(connection):
+
+    _transaction_finished(connection, 'commit')
+
+
+@event.listens_for(Engine, 'rollback')
+def _transaction_rolled_back(connection):
+
+    _transaction_finished(connection, 'rollback')
+
+
+def observe_inventory_call(endpoint, call):
+    """
+    Runs call() (an inventory HTTP request) and records its latency under
+    endpoint, labelled with the status code or 'error' when it raised.
+    """
+
+    start = time.perf_counter()
+    status = 'error'
+
+    try:
+
+        response = call()
+        status = str(response.status_code)
+
+        return response
+
+    finally:
+
+        INVENTORY_REQUEST_SECONDS.labels(endpoint, status).observe(time.perf_counter() - start)
+
+
+def render_metrics():
+    """
+    Exposition for /metrics. Under gunicorn every worker is a separate
+    process; with PROMETHEUS_MULTIPROC_DIR set (entrypoint.sh does) the
+    values are aggregated across all of them.
+    """
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry)
+
+
+def record_request(endpoint, method, status, elapsed):
+
+    REQUEST_SECONDS.labels(endpoint, method).observe(elapsed)
+    RESPONSES.labels(endpoint, method, str(status)).inc()
+
+
+def init_metrics(app):
+
+    @app.before_request
+    def start_request_timer():
+
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+
+        started = g.get('request_started')
+
+        if started is not None and request.url_rule is not None:
+            record_request(
+                request.url_rule.rule,
+                request.method,
+                response.status_code,
+                time.perf_counter() - started
+            )
+
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+
+        return Response(render_metrics(), mimetype=CONTENT_TYPE_LATEST)
@@ -3,6 +3,15 @@ from .database import db
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        # Keyset pagination order for GET /bookings and /bookings/user/<id>
+        db.Index('ix_bookings_created_at_id', 'created_at', 'id'),
+        db.Index('ix_bookings_user_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_bookings_room_stay', 'room_id', 'check_in_date', 'check_out_date'),
+        db.Index('ix_bookings_status_check_out', 'status', 'check_out_date'),
+        # PostgreSQL also gets a GiST daterange index and the
+        # excl_bookings_room_unit_overlap constraint; see migrations/.
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False)
@@ -11,6 +20,12 @@ class Booking(db.Model):
     check_out_date = db.Column(db.Date, nullable=False)
     total_price = db.Column(db.Numeric(10, 2), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='pending')
+    reservation_key = db.Column(db.String(64), unique=True, nullable=True)
+    failure_reason = db.Column(db.String(255), nullable=True)
+    idempotency_key = db.Column(db.String(255), unique=True, nullable=True)
+    room_unit = db.Column(db.Integer, nullable=True)
+    # Set only on bookings created through POST /holds, whatever their status.
+    hold_expires_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -23,6 +38,9 @@ class Booking(db.Model):
             'check_out_date': self.check_out_date.isoformat(),
             'total_price': float(self.total_price),
             'status': self.status,
+            'reservation_key': self.reservation_key,
+            'failure_reason': self.failure_reason,
+            'room_unit': self.room_unit,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -1,137 +1,424 @@
-import redis
 import uuid
 import time
+import threading
 import logging
 from datetime import timedelta
 from flask import current_app
+from .clients import get_redis_client
+from .metrics import LOCK_ACQUIRE_SECONDS, LOCK_ATTEMPTS
 
 logger = logging.getLogger(__name__)
 
 
-class RedisLock:
+# KEYS[1] is the room fencing counter, KEYS[2..n] the lock keys.
+# ARGV: token, lock ttl (ms), fence seed (see fence_seed). Returns the new
+# fencing token, or 0.
+ACQUIRE_ALL_SCRIPT = """
+for i = 2, #KEYS do
+    if redis.call("exists", KEYS[i]) == 1 then
+        return 0
+    end
+end
+for i = 2, #KEYS do
+    redis.call("set", KEYS[i], ARGV[1], "PX", ARGV[2])
+end
+redis.call("set", KEYS[1], ARGV[3], "NX")
+return redis.call("incr", KEYS[1])
+"""
+
+RELEASE_ALL_SCRIPT = """
+local released = 0
+for i, key in ipairs(KEYS) do
+    if redis.call("get", key) == ARGV[1] then
+        released = released + redis.call("del", key)
+    end
+end
+return released
+"""
+
+RENEW_ALL_SCRIPT = """
+local renewed = 0
+for i, key in ipairs(KEYS) do
+    if redis.call("get", key) == ARGV[1] then
+        renewed = renewed + redis.call("pexpire", key, ARGV[2])
+    end
+end
+return renewed
+"""
+
+# KEYS[1] is the room fencing counter, KEYS[2] the room wait queue,
+# KEYS[3..n] the lock keys.
+# ARGV: token, lock ttl (ms), waiter heartbeat prefix, wake prefix, wake ttl (ms),
+# fence seed.
+# Waiters whose heartbeat expired (crashed or gave up) are pruned from the
+# head so they cannot block the queue.
+QUEUED_ACQUIRE_SCRIPT = """
+local queue = KEYS[2]
+local head = redis.call("lindex", queue, 0)
+while head and head ~= ARGV[1] and redis.call("exists", ARGV[3] .. head) == 0 do
+    redis.call("lpop", queue)
+    head = redis.call("lindex", queue, 0)
+end
+if head and head ~= ARGV[1] then
+    return 0
+end
+for i = 3, #KEYS do
+    if redis.call("exists", KEYS[i]) == 1 then
+        return 0
+    end
+end
+for i = 3, #KEYS do
+    redis.call("set", KEYS[i], ARGV[1], "PX", ARGV[2])
+end
+if head == ARGV[1] then
+    redis.call("lpop", queue)
+    redis.call("del", ARGV[3] .. ARGV[1])
+    local next_waiter = redis.call("lindex", queue, 0)
+    if next_waiter then
+        redis.call("rpush", ARGV[4] .. next_waiter, 1)
+        redis.call("pexpire", ARGV[4] .. next_waiter, ARGV[5])
+    end
+end
+redis.call("set", KEYS[1], ARGV[6], "NX")
+return redis.call("incr", KEYS[1])
+"""
+
+# KEYS[1] is the room wait queue, KEYS[2..n] the lock keys.
+# ARGV: token, wake prefix, wake ttl (ms).
+QUEUED_RELEASE_SCRIPT = """
+local released = 0
+for i = 2, #KEYS do
+    if redis.call("get", KEYS[i]) == ARGV[1] then
+        released = released + redis.call("del", KEYS[i])
+    end
+end
+local next_waiter = redis.call("lindex", KEYS[1], 0)
+if next_waiter then
+    redis.call("rpush", ARGV[2] .. next_waiter, 1)
+    redis.call("pexpire", ARGV[2] .. next_waiter, ARGV[3])
+end
+return released
+"""
+
+WAITER_KEY_PREFIX = 'lock:waiter:'
+WAKE_KEY_PREFIX = 'lock:wake:'
+FENCE_KEY_PREFIX = 'lock:fence:room:'
+
+
+class LockLost(Exception):
+    pass
+
+
+def fence_seed():
+    """
+    Starting value for a fencing counter that does not exist yet. Redis
+    keeps no other trace of the tokens it handed out, so a counter lost to
+    a restart or flush restarts from the clock (microseconds) instead of 1
+    and still tops every token inventory has already stored.
+    """
+
+    return int(time.time() * 1000000)
+
+
+class MultiKeyRedisLock:
+    """
+    All-or-nothing lock over several keys. Acquire and release are each a
+    single Lua script call, so a booking pays one Redis round trip per
+    attempt no matter how many nights it covers.
+
+    With a queue_key the lock can also be taken in FIFO order: waiters join
+    the queue and block on their own wake key until the holder hands off
+    on release.
 
-    def __init__(self, redis_client, lock_key, timeout=10):
+    Every successful acquire increments fence_key and keeps the result as
+    fencing_token, so downstream writes can reject a holder whose lease
+    expired and was taken over by someone else.
+    """
+
+    def __init__(self, redis_client, lock_keys, fence_key, timeout=10, queue_key=None):
         self.redis_client = redis_client
-        self.lock_key = lock_key
+        self.lock_keys = sorted(lock_keys)
+        self.fence_key = fence_key
         self.timeout = timeout
+        self.queue_key = queue_key
         self.lock_value = str(uuid.uuid4())
         self.acquired = False
+        self.fencing_token = None
+        self.attempts = 0
+        self._renew_script = redis_client.register_script(RENEW_ALL_SCRIPT)
+
+        if queue_key:
+            self._acquire_script = redis_client.register_script(QUEUED_ACQUIRE_SCRIPT)
+            self._release_script = redis_client.register_script(QUEUED_RELEASE_SCRIPT)
+        else:
+            self._acquire_script = redis_client.register_script(ACQUIRE_ALL_SCRIPT)
+            self._release_script = redis_client.register_script(RELEASE_ALL_SCRIPT)
+
+    def _try_acquire(self):
+
+        self.attempts += 1
+
+        if self.queue_key:
+            token = self._acquire_script(
+                keys=[self.fence_key, self.queue_key] + self.lock_keys,
+                args=[
+                    self.lock_value,
+                    int(self.timeout * 1000),
+                    WAITER_KEY_PREFIX,
+                    WAKE_KEY_PREFIX,
+                    int(self.timeout * 1000),
+                    fence_seed()
+                ]
+            )
+        else:
+            token = self._acquire_script(
+                keys=[self.fence_key] + self.lock_keys,
+                args=[self.lock_value, int(self.timeout * 1000), fence_seed()]
+            )
+
+        if token:
+            self.fencing_token = int(token)
+
+        return bool(token)
+
+    def renew(self):
+        """
+        Extends every held key back to the full timeout in one script call.
+        Returns False when any key has already expired or changed owner.
+        """
+
+        renewed = self._renew_script(
+            keys=self.lock_keys,
+            args=[self.lock_value, int(self.timeout * 1000)]
+        )
+
+        return renewed == len(self.lock_keys)
 
     def acquire(self, retry_attempts=3, retry_delay=0.1):
 
         for attempt in range(retry_attempts):
 
-            acquired = self.redis_client.set(
-                self.lock_key,
-                self.lock_value,
-                nx=True,
-                ex=self.timeout
-            )
-
-            if acquired:
+            if self._try_acquire():
                 self.acquired = True
-                logger.info(f"Lock acquired: {self.lock_key}")
+                logger.debug("Locks acquired: %d keys", len(self.lock_keys))
                 return True
 
             if attempt < retry_attempts - 1:
                 time.sleep(retry_delay * (2 ** attempt))
 
-        logger.warning(f"Failed to acquire lock: {self.lock_key}")
+        logger.warning("Failed to acquire locks: %s", self.lock_keys)
+        return False
+
+    def acquire_queued(self, max_wait=3.0, poll_interval=0.5):
+        """
+        Waits in FIFO order for up to max_wait seconds. poll_interval bounds
+        each blocking wait so a holder that dies without releasing only
+        delays the queue until its lock TTL expires.
+        """
+
+        if self._try_acquire():
+            self.acquired = True
+            logger.debug("Locks acquired: %d keys", len(self.lock_keys))
+            return True
+
+        waiter_key = f"{WAITER_KEY_PREFIX}{self.lock_value}"
+        wake_key = f"{WAKE_KEY_PREFIX}{self.lock_value}"
+        heartbeat_ms = int(poll_interval * 3000)
+
+        pipe = self.redis_client.pipeline()
+        pipe.set(waiter_key, 1, px=heartbeat_ms)
+        pipe.rpush(self.queue_key, self.lock_value)
+        pipe.execute()
+
+        deadline = time.monotonic() + max_wait
+
+        try:
+
+            while True:
+
+                if self._try_acquire():
+                    self.acquired = True
+                    logger.debug("Locks acquired from queue: %d keys", len(self.lock_keys))
+                    return True
+
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    break
+
+                self.redis_client.blpop(
+                    [wake_key],
+                    timeout=min(poll_interval, remaining)
+                )
+
+                self.redis_client.set(waiter_key, 1, px=heartbeat_ms)
+
+        finally:
+
+            if not self.acquired:
+                self._leave_queue(waiter_key, wake_key)
+
+        logger.warning("Gave up waiting for locks: %s", self.lock_keys)
         return False
 
+    def _leave_queue(self, waiter_key, wake_key):
+
+        pipe = self.redis_client.pipeline()
+        pipe.lrem(self.queue_key, 0, self.lock_value)
+        pipe.delete(waiter_key, wake_key)
+        pipe.lindex(self.queue_key, 0)
+        next_waiter = pipe.execute()[-1]
+
+        # A hand-off addressed to us may have arrived while we were leaving;
+        # pass it on so the next waiter does not sit out a full poll interval.
+        if next_waiter:
+            pipe = self.redis_client.pipeline()
+            pipe.rpush(f"{WAKE_KEY_PREFIX}{next_waiter}", 1)
+            pipe.pexpire(f"{WAKE_KEY_PREFIX}{next_waiter}", int(self.timeout * 1000))
+            pipe.execute()
+
     def release(self):
 
         if not self.acquired:
             return False
 
-        lua_script = """
-        if redis.call("get", KEYS[1]) == ARGV[1] then
-            return redis.call("del", KEYS[1])
-        else
-            return 0
-        end
-        """
-
         try:
 
-            result = self.redis_client.eval(
-                lua_script,
-                1,
-                self.lock_key,
-                self.lock_value
-            )
-
-            if result:
-                logger.info(f"Lock released: {self.lock_key}")
-                self.acquired = False
-                return True
+            if self.queue_key:
+                released = self._release_script(
+                    keys=[self.queue_key] + self.lock_keys,
+                    args=[self.lock_value, WAKE_KEY_PREFIX, int(self.timeout * 1000)]
+                )
             else:
-                logger.warning(
-                    f"Lock already expired or owned by another process: {self.lock_key}"
+                released = self._release_script(
+                    keys=self.lock_keys,
+                    args=[self.lock_value]
                 )
-                return False
+
+            self.acquired = False
+
+            if released == len(self.lock_keys):
+                logger.debug("Locks released: %d keys", len(self.lock_keys))
+                return True
+
+            logger.warning(
+                f"{len(self.lock_keys) - released} locks already expired "
+                f"or owned by another process: {self.lock_keys}"
+            )
+            return False
 
         except Exception as e:
-            logger.error(f"Error releasing lock {self.lock_key}: {str(e)}")
+            logger.error(f"Error releasing locks {self.lock_keys}: {str(e)}")
             return False
 
 
-def get_redis_client():
+class LockWatchdog(threading.Thread):
+    """
+    Renews a held lock every renew_interval seconds until stopped, so a slow
+    booking keeps its lease without needing a long base TTL. Sets lost when
+    a renewal finds the lease already gone.
+    """
 
-    return redis.Redis(
-        host=current_app.config['REDIS_HOST'],
-        port=current_app.config['REDIS_PORT'],
-        db=current_app.config['REDIS_DB'],
-        decode_responses=True,
-        socket_connect_timeout=5,
-        socket_timeout=5
-    )
+    def __init__(self, lock, renew_interval):
+        super().__init__(daemon=True)
+        self.lock = lock
+        self.renew_interval = renew_interval
+        self.lost = False
+        self._stopped = threading.Event()
+
+    def run(self):
+
+        while not self._stopped.wait(self.renew_interval):
+
+            try:
+
+                if not self.lock.renew():
+                    self.lost = True
+                    logger.error(f"Lock lease lost: {self.lock.lock_keys}")
+                    return
+
+            except Exception as e:
+                logger.warning(f"Error renewing locks {self.lock.lock_keys}: {str(e)}")
+
+    def stop(self):
+
+        self._stopped.set()
 
 
 class BookingLockManager:
     """
-    Manages acquiring and releasing multiple locks for a booking date range
+    Manages acquiring and releasing the locks for a booking date range
     """
 
-    def __init__(self, locks):
-        self.locks = locks
-        self.acquired_locks = []
+    def __init__(self, lock):
+        self.lock = lock
+        self.watchdog = None
+
+    @property
+    def fencing_token(self):
+
+        return self.lock.fencing_token
+
+    @property
+    def lost(self):
+
+        return bool(self.watchdog and self.watchdog.lost)
+
+    def ensure_held(self):
+        """
+        Raises LockLost once the watchdog has found the lease gone, so work
+        done after another holder may have taken over is rolled back
+        instead of committed.
+        """
+
+        if self.lost:
+            raise LockLost(f"Lock lease lost: {self.lock.lock_keys}")
 
     def acquire(self):
 
-        retry_attempts = current_app.config.get('LOCK_RETRY_ATTEMPTS', 3)
-        retry_delay = current_app.config.get('LOCK_RETRY_DELAY', 0.1)
+        mode = 'queue' if self.lock.queue_key else 'retry'
+        start = time.perf_counter()
 
-        for lock in self.locks:
+        if self.lock.queue_key:
 
-            if lock.acquire(retry_attempts, retry_delay):
+            max_wait = current_app.config.get('LOCK_MAX_WAIT', 3.0)
+            poll_interval = current_app.config.get('LOCK_QUEUE_POLL_INTERVAL', 0.5)
 
-                self.acquired_locks.append(lock)
+            acquired = self.lock.acquire_queued(max_wait, poll_interval)
 
-            else:
+        else:
 
-                logger.warning(
-                    "Lock acquisition failed, releasing previously acquired locks"
-                )
+            retry_attempts = current_app.config.get('LOCK_RETRY_ATTEMPTS', 3)
+            retry_delay = current_app.config.get('LOCK_RETRY_DELAY', 0.1)
 
-                self.release()
+            acquired = self.lock.acquire(retry_attempts, retry_delay)
 
-                return False
+        outcome = 'acquired' if acquired else 'timeout'
 
-        return True
+        LOCK_ACQUIRE_SECONDS.labels(mode, outcome).observe(time.perf_counter() - start)
+        LOCK_ATTEMPTS.labels(mode, outcome).observe(self.lock.attempts)
+
+        return acquired
 
     def release(self):
 
-        for lock in reversed(self.acquired_locks):
-            lock.release()
+        if self.watchdog:
+            self.watchdog.stop()
+            self.watchdog = None
 
-        self.acquired_locks = []
+        self.lock.release()
 
     def __enter__(self):
 
         if not self.acquire():
             raise Exception("Could not acquire booking locks")
 
+        renew_interval = current_app.config.get('LOCK_RENEW_INTERVAL')
+
+        if renew_interval:
+            self.watchdog = LockWatchdog(self.lock, renew_interval)
+            self.watchdog.start()
+
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -141,30 +428,70 @@ class BookingLockManager:
         return False
 
 
+class NullLockManager:
+    """
+    Stand-in for BookingLockManager when inventory's optimistic reservation
+    engine already guarantees the stock can't oversell
+    """
+
+    fencing_token = None
+    lost = False
+
+    def ensure_held(self):
+
+        pass
+
+    def acquire(self):
+
+        return True
+
+    def release(self):
+
+        pass
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+
+        return False
+
+
 def create_booking_locks(room_id, check_in, check_out):
     """
-    Creates a distributed lock for each date of the reservation range
+    Creates a distributed lock covering each date of the reservation range
     to prevent overlapping bookings.
     """
 
+    if current_app.config.get('LOCK_BACKEND') == 'none':
+        return NullLockManager()
+
     redis_client = get_redis_client()
 
     timeout = current_app.config.get('LOCK_TIMEOUT', 10)
 
-    locks = []
+    lock_keys = []
 
     current_date = check_in
 
     while current_date < check_out:
 
-        lock_key = f"lock:room:{room_id}:{current_date.isoformat()}"
-
-        locks.append(
-            RedisLock(redis_client, lock_key, timeout)
-        )
+        lock_keys.append(f"lock:room:{room_id}:{current_date.isoformat()}")
 
         current_date += timedelta(days=1)
 
-    locks.sort(key=lambda l: l.lock_key)
+    queue_key = None
 
-    return BookingLockManager(locks)
\ No newline at end of file
+    if current_app.config.get('LOCK_MODE') == 'queue':
+        queue_key = f"lock:queue:room:{room_id}"
+
+    return BookingLockManager(
+        MultiKeyRedisLock(
+            redis_client,
+            lock_keys,
+            f"{FENCE_KEY_PREFIX}{room_id}",
+            timeout,
+            queue_key
+        )
+    )
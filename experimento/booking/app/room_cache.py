@@ -0,0 +1,218 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from flask import current_app
+from .clients import get_redis_client
+from .inventory_client import get_room
+
+logger = logging.getLogger(__name__)
+
+ROOM_META_KEY_PREFIX = 'room:meta:'
+ROOM_META_VERSION_KEY_PREFIX = 'room:meta:version:'
+
+# KEYS[1] is the room's hash, KEYS[2] its generation, which inventory
+# increments on every change. ARGV: generation read before fetching the
+# room, hash ttl (s), then field/value pairs. A fill that raced with an
+# invalidation finds a newer generation and writes nothing.
+FILL_IF_UNCHANGED_SCRIPT = """
+if (redis.call("get", KEYS[2]) or "0") ~= ARGV[1] then
+    return 0
+end
+redis.call("hset", KEYS[1], unpack(ARGV, 3))
+redis.call("expire", KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class RoomCache:
+    """
+    Thread-safe in-process LRU for room metadata with a per-entry TTL.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, room_id):
+
+        with self._lock:
+
+            entry = self._entries.get(room_id)
+
+            if entry is None:
+                return None
+
+            expires_at, room = entry
+
+            if expires_at < time.monotonic():
+                del self._entries[room_id]
+                return None
+
+            self._entries.move_to_end(room_id)
+
+            return room
+
+    def set(self, room_id, room):
+
+        with self._lock:
+
+            self._entries[room_id] = (time.monotonic() + self.ttl, room)
+            self._entries.move_to_end(room_id)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, room_id):
+
+        with self._lock:
+            self._entries.pop(room_id, None)
+
+
+class RoomChangeSubscriber(threading.Thread):
+    """
+    Evicts rooms from the in-process cache when the inventory service
+    publishes a room change. Reconnects after Redis errors.
+    """
+
+    def __init__(self, redis_client, channel, cache):
+        super().__init__(daemon=True)
+        self.redis_client = redis_client
+        self.channel = channel
+        self.cache = cache
+
+    def run(self):
+
+        while True:
+
+            try:
+
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+
+                for message in pubsub.listen():
+
+                    if message['type'] == 'message':
+                        self.cache.invalidate(int(message['data']))
+
+            except Exception as e:
+
+                logger.warning(f"Room change subscription lost: {str(e)}")
+
+                time.sleep(1)
+
+
+def init_room_cache(app):
+
+    cache = RoomCache(
+        app.config['ROOM_CACHE_SIZE'],
+        app.config['ROOM_CACHE_TTL']
+    )
+
+    app.extensions['room_cache'] = cache
+
+    # The subscriber opens a Redis connection, so it starts with the first
+    # request instead of in create_app. That keeps startup free of network
+    # I/O and puts the thread in each gunicorn worker when the app is
+    # preloaded in the master (threads don't survive the fork).
+    started = []
+    start_lock = threading.Lock()
+
+    @app.before_request
+    def start_room_change_subscriber():
+
+        if started:
+            return
+
+        with start_lock:
+
+            if started:
+                return
+
+            RoomChangeSubscriber(
+                get_redis_client(),
+                app.config['ROOM_EVENTS_CHANNEL'],
+                cache
+            ).start()
+
+            started.append(True)
+
+
+def _decode(data):
+
+    return {
+        'id': int(data['id']),
+        'room_number': data['room_number'],
+        'room_type': data['room_type'],
+        'price_per_night': float(data['price_per_night']),
+        'total_quantity': int(data['total_quantity'])
+    }
+
+
+def fill_args(version, ttl, room):
+
+    args = [version or '0', ttl]
+
+    for field, value in room.items():
+        args.extend([field, str(value)])
+
+    return args
+
+
+def get_room_metadata(room_id):
+    """
+    Read-through lookup: in-process LRU, then the shared Redis hash, then
+    the inventory service. Returns None when the room does not exist. The
+    room is only cached if no invalidation arrived while it was fetched.
+    """
+
+    cache = current_app.extensions['room_cache']
+
+    room = cache.get(room_id)
+
+    if room is not None:
+        return room
+
+    redis_client = get_redis_client()
+    key = f"{ROOM_META_KEY_PREFIX}{room_id}"
+    version_key = f"{ROOM_META_VERSION_KEY_PREFIX}{room_id}"
+
+    try:
+        data, version = redis_client.pipeline().hgetall(key).get(version_key).execute()
+    except Exception as e:
+        logger.warning(f"Room cache read failed for {room_id}: {str(e)}")
+        data = version = None
+
+    if data:
+        room = _decode(data)
+        cache.set(room_id, room)
+        return room
+
+    response = get_room(room_id)
+
+    if response.status_code != 200:
+        return None
+
+    room = _decode(response.json()['room'])
+
+    stale = False
+
+    if data is not None:
+
+        try:
+            stale = not redis_client.eval(
+                FILL_IF_UNCHANGED_SCRIPT,
+                2,
+                key,
+                version_key,
+                *fill_args(version, current_app.config['ROOM_CACHE_REDIS_TTL'], room)
+            )
+        except Exception as e:
+            logger.warning(f"Room cache write failed for {room_id}: {str(e)}")
+
+    if not stale:
+        cache.set(room_id, room)
+
+    return room
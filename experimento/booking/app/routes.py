@@ -1,11 +1,23 @@
-from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app, url_for
+from datetime import datetime
 from .database import db
 from .models import Booking
-from .redis_lock import create_booking_locks, get_redis_client
+from .redis_lock import create_booking_locks
+from .clients import get_redis_client, pool_stats
+from .room_cache import get_room_metadata
+from .availability_counters import find_sold_out_nights
+from .booking_service import create_and_confirm, same_booking_request
+from .booking_queue import enqueue_booking
+from .holds import create_hold, get_hold, confirm_hold, expire_holds, get_hold_expires_in, hold_to_dict, HoldError
+from .dispatcher import get_dispatcher
+from .idempotency import idempotent, IDEMPOTENCY_HEADER
+from .listing import list_bookings, ListingError
+from .logging_config import bind_log_context
+import redis
 import requests
 import logging
 import time
+import uuid
 
 booking_bp = Blueprint('booking', __name__)
 logger = logging.getLogger(__name__)
@@ -27,7 +39,74 @@ def health():
     }), 200
 
 
+@booking_bp.route('/pools', methods=['GET'])
+def pools():
+    return jsonify({
+        'success': True,
+        'pools': pool_stats()
+    }), 200
+
+
+def _room_busy(start_time):
+    """
+    Answer for a booking that lost a transient race (lock not acquired, lane
+    full, unit conflict) rather than finding the room sold out. Retry-After
+    marks it retryable, so a retry with the same Idempotency-Key runs again
+    instead of replaying it.
+    """
+
+    elapsed_time = time.time() - start_time
+
+    return jsonify({
+        'success': False,
+        'error': 'Room is busy, please retry',
+        'retryable': True,
+        'response_time': f"{elapsed_time:.3f}s"
+    }), 409, {'Retry-After': '1'}
+
+
+def _booking_for_idempotency_key(key):
+    """
+    Answers a retried Idempotency-Key from the bookings table when its Redis
+    record is gone. Only confirmed (sync) or accepted (async) bookings keep
+    a key (a booking that could not be queued gives its key up), so
+    anything else runs the request again.
+    """
+
+    booking = Booking.query.filter_by(idempotency_key=key).first()
+
+    if booking is None:
+        return None
+
+    if not same_booking_request(booking, request.get_json(silent=True) or {}):
+        return jsonify({
+            'success': False,
+            'error': 'Idempotency-Key was already used with a different request'
+        }), 422
+
+    if current_app.config['BOOKING_MODE'] == 'async':
+
+        status_url = url_for('booking.get_booking', booking_id=booking.id)
+
+        return jsonify({
+            'success': True,
+            'message': 'Booking accepted for processing',
+            'booking': booking.to_dict(),
+            'status_url': status_url
+        }), 202, {'Location': status_url}
+
+    if booking.status != 'confirmed':
+        return None
+
+    return jsonify({
+        'success': True,
+        'message': 'Booking confirmed successfully',
+        'booking': booking.to_dict()
+    }), 201
+
+
 @booking_bp.route('/bookings/confirm', methods=['POST'])
+@idempotent(fallback=_booking_for_idempotency_key)
 def confirm_booking():
 
     start_time = time.time()
@@ -56,106 +135,322 @@ def confirm_booking():
                 'error': 'Check-out date must be after check-in date'
             }), 400
 
-        inventory_url = current_app.config['INVENTORY_SERVICE_URL']
+        bind_log_context(
+            user_id=user_id,
+            room_id=room_id,
+            check_in=check_in_date_str,
+            nights=(check_out_date - check_in_date).days
+        )
 
-        try:
+        if current_app.config['FAST_REJECT_ENABLED']:
 
-            with create_booking_locks(room_id, check_in_date, check_out_date):
+            sold_out = find_sold_out_nights(room_id, check_in_date, check_out_date)
 
-                logger.info(
-                    f"Locks acquired for room {room_id} "
-                    f"from {check_in_date} to {check_out_date}"
-                )
+            if sold_out:
 
-                room_response = requests.get(
-                    f"{inventory_url}/rooms/{room_id}",
-                    timeout=5
-                )
+                elapsed_time = time.time() - start_time
 
-                if room_response.status_code != 200:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Could not get room information'
-                    }), 500
+                return jsonify({
+                    'success': False,
+                    'error': 'No availability for the selected dates',
+                    'unavailable_dates': [night.isoformat() for night in sold_out],
+                    'response_time': f"{elapsed_time:.3f}s"
+                }), 409
 
-                room_data = room_response.json()['room']
-                price_per_night = room_data['price_per_night']
+        room_data = get_room_metadata(room_id)
 
-                num_nights = (check_out_date - check_in_date).days
-                total_price = price_per_night * num_nights
+        if room_data is None:
+            return jsonify({
+                'success': False,
+                'error': 'Could not get room information'
+            }), 500
 
-                booking = Booking(
-                    user_id=user_id,
-                    room_id=room_id,
-                    check_in_date=check_in_date,
-                    check_out_date=check_out_date,
-                    total_price=total_price,
-                    status='pending'
-                )
+        price_per_night = room_data['price_per_night']
 
-                db.session.add(booking)
-                db.session.flush()
+        num_nights = (check_out_date - check_in_date).days
+        total_price = price_per_night * num_nights
 
-                current_date = check_in_date
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
 
-                while current_date < check_out_date:
+        if current_app.config['BOOKING_MODE'] == 'async':
 
-                    reserve_response = requests.post(
-                        f"{inventory_url}/rooms/{room_id}/reserve",
-                        json={'date': current_date.strftime('%Y-%m-%d')},
-                        timeout=5
-                    )
+            booking = Booking(
+                user_id=user_id,
+                room_id=room_id,
+                check_in_date=check_in_date,
+                check_out_date=check_out_date,
+                total_price=total_price,
+                status='pending',
+                reservation_key=uuid.uuid4().hex,
+                idempotency_key=idempotency_key
+            )
 
-                    if reserve_response.status_code != 200:
+            db.session.add(booking)
+            db.session.commit()
 
-                        db.session.rollback()
+            bind_log_context(booking_id=booking.id)
 
-                        error_msg = reserve_response.json().get(
-                            'error',
-                            'Could not reserve room'
-                        )
+            try:
 
-                        return jsonify({
-                            'success': False,
-                            'error': error_msg
-                        }), 409
+                enqueue_booking(booking)
 
-                    current_date += timedelta(days=1)
+            except redis.RedisError as queue_error:
 
-                booking.status = 'confirmed'
+                logger.error(f"Could not queue booking {booking.id}: {str(queue_error)}")
+
+                # Never accepted, so the key is freed for a retry to run
+                # again instead of replaying a 202 for a dead booking.
+                booking.status = 'failed'
+                booking.failure_reason = 'Could not queue booking'
+                booking.idempotency_key = None
                 db.session.commit()
 
-                elapsed_time = time.time() - start_time
+                return jsonify({
+                    'success': False,
+                    'error': 'Booking queue unavailable'
+                }), 503
+
+            elapsed_time = time.time() - start_time
+
+            status_url = url_for('booking.get_booking', booking_id=booking.id)
+
+            logger.info(
+                f"Booking accepted: ID={booking.id}, "
+                f"Room={room_id}, User={user_id}, "
+                f"Time={elapsed_time:.3f}s"
+            )
+
+            return jsonify({
+                'success': True,
+                'message': 'Booking accepted for processing',
+                'booking': booking.to_dict(),
+                'status_url': status_url,
+                'response_time': f"{elapsed_time:.3f}s"
+            }), 202, {'Location': status_url}
+
+        try:
 
-                logger.info(
-                    f"Booking confirmed: ID={booking.id}, "
-                    f"Room={room_id}, User={user_id}, "
-                    f"Time={elapsed_time:.3f}s"
-                )
+            if current_app.config['BOOKING_DISPATCH'] == 'lanes':
+
+                # Same-room requests queue on one lane and run one at a
+                # time, so they don't race for the per-night locks.
+                booking_data, error_msg = get_dispatcher().submit(
+                    room_id,
+                    create_and_confirm,
+                    user_id,
+                    room_id,
+                    check_in_date,
+                    check_out_date,
+                    total_price,
+                    None,
+                    idempotency_key
+                ).result()
+
+            else:
+
+                with create_booking_locks(room_id, check_in_date, check_out_date) as locks:
+
+                    booking_data, error_msg = create_and_confirm(
+                        user_id,
+                        room_id,
+                        check_in_date,
+                        check_out_date,
+                        total_price,
+                        locks,
+                        idempotency_key
+                    )
+
+            if error_msg:
 
                 return jsonify({
-                    'success': True,
-                    'message': 'Booking confirmed successfully',
-                    'booking': booking.to_dict(),
-                    'response_time': f"{elapsed_time:.3f}s"
-                }), 201
+                    'success': False,
+                    'error': error_msg
+                }), 409
+
+            elapsed_time = time.time() - start_time
+
+            logger.info(
+                f"Booking confirmed: ID={booking_data['id']}, "
+                f"Room={room_id}, User={user_id}, "
+                f"Time={elapsed_time:.3f}s"
+            )
+
+            return jsonify({
+                'success': True,
+                'message': 'Booking confirmed successfully',
+                'booking': booking_data,
+                'response_time': f"{elapsed_time:.3f}s"
+            }), 201
+
+        except requests.RequestException:
+
+            raise
 
         except Exception as lock_error:
 
-            elapsed_time = time.time() - start_time
+            logger.error(f"Lock error: {str(lock_error)}")
+
+            return _room_busy(start_time)
+
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid date format: {str(ve)}'
+        }), 400
+
+    except requests.RequestException as re:
+
+        logger.error(f"Inventory service error: {str(re)}")
+
+        db.session.rollback()
+
+        return jsonify({
+            'success': False,
+            'error': 'Inventory service unavailable'
+        }), 503
+
+    except Exception as e:
+
+        logger.error(f"Error confirming booking: {str(e)}")
+
+        db.session.rollback()
+
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@booking_bp.route('/holds', methods=['POST'])
+@idempotent()
+def create_room_hold():
+
+    start_time = time.time()
+
+    try:
+
+        data = request.get_json()
+
+        user_id = data.get('user_id')
+        room_id = data.get('room_id')
+        check_in_date_str = data.get('check_in_date')
+        check_out_date_str = data.get('check_out_date')
+        ttl = int(data.get('ttl_seconds') or current_app.config['HOLD_TTL'])
+        max_ttl = current_app.config['HOLD_MAX_TTL']
+
+        if not all([user_id, room_id, check_in_date_str, check_out_date_str]):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields'
+            }), 400
+
+        if not 0 < ttl <= max_ttl:
+            return jsonify({
+                'success': False,
+                'error': f'ttl_seconds must be between 1 and {max_ttl}'
+            }), 400
+
+        check_in_date = datetime.strptime(check_in_date_str, '%Y-%m-%d').date()
+        check_out_date = datetime.strptime(check_out_date_str, '%Y-%m-%d').date()
+
+        if check_out_date <= check_in_date:
+            return jsonify({
+                'success': False,
+                'error': 'Check-out date must be after check-in date'
+            }), 400
+
+        bind_log_context(
+            user_id=user_id,
+            room_id=room_id,
+            check_in=check_in_date_str,
+            nights=(check_out_date - check_in_date).days
+        )
+
+        if current_app.config['FAST_REJECT_ENABLED']:
+
+            sold_out = find_sold_out_nights(room_id, check_in_date, check_out_date)
+
+            if sold_out:
+                return jsonify({
+                    'success': False,
+                    'error': 'No availability for the selected dates',
+                    'unavailable_dates': [night.isoformat() for night in sold_out]
+                }), 409
+
+        room_data = get_room_metadata(room_id)
+
+        if room_data is None:
+            return jsonify({
+                'success': False,
+                'error': 'Could not get room information'
+            }), 500
+
+        total_price = room_data['price_per_night'] * (check_out_date - check_in_date).days
+
+        try:
+
+            if current_app.config['BOOKING_DISPATCH'] == 'lanes':
+
+                hold, error_msg = get_dispatcher().submit(
+                    room_id,
+                    create_hold,
+                    user_id,
+                    room_id,
+                    check_in_date,
+                    check_out_date,
+                    total_price,
+                    ttl
+                ).result()
+
+            else:
+
+                with create_booking_locks(room_id, check_in_date, check_out_date) as locks:
+
+                    hold, error_msg = create_hold(
+                        user_id,
+                        room_id,
+                        check_in_date,
+                        check_out_date,
+                        total_price,
+                        ttl,
+                        locks
+                    )
+
+        except (requests.RequestException, redis.RedisError):
+
+            raise
+
+        except Exception as lock_error:
 
             logger.error(f"Lock error: {str(lock_error)}")
 
+            return _room_busy(start_time)
+
+        if error_msg:
             return jsonify({
                 'success': False,
-                'error': 'No availability for the selected dates',
-                'response_time': f"{elapsed_time:.3f}s"
+                'error': error_msg
             }), 409
 
+        elapsed_time = time.time() - start_time
+
+        logger.info(
+            f"Room held: ID={hold['id']}, Room={room_id}, User={user_id}, "
+            f"TTL={ttl}s, Time={elapsed_time:.3f}s"
+        )
+
+        return jsonify({
+            'success': True,
+            'message': 'Room held',
+            'hold': hold,
+            'confirm_url': url_for('booking.confirm_room_hold', hold_id=hold['id']),
+            'response_time': f"{elapsed_time:.3f}s"
+        }), 201
+
     except ValueError as ve:
         return jsonify({
             'success': False,
-            'error': f'Invalid date format: {str(ve)}'
+            'error': f'Invalid request: {str(ve)}'
         }), 400
 
     except requests.RequestException as re:
@@ -169,9 +464,153 @@ def confirm_booking():
             'error': 'Inventory service unavailable'
         }), 503
 
+    except redis.RedisError as re:
+
+        logger.error(f"Could not schedule hold expiry: {str(re)}")
+
+        return jsonify({
+            'success': False,
+            'error': 'Hold store unavailable'
+        }), 503
+
     except Exception as e:
 
-        logger.error(f"Error confirming booking: {str(e)}")
+        logger.error(f"Error creating hold: {str(e)}")
+
+        db.session.rollback()
+
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@booking_bp.route('/holds/<int:hold_id>', methods=['GET'])
+def get_room_hold(hold_id):
+
+    try:
+
+        booking = get_hold(hold_id, request.args.get('user_id'))
+
+        expires_in = get_hold_expires_in(hold_id) if booking.status == 'held' else 0
+
+        return jsonify({
+            'success': True,
+            'hold': hold_to_dict(booking, expires_in)
+        }), 200
+
+    except HoldError as he:
+
+        return jsonify({
+            'success': False,
+            'error': he.error
+        }), he.status_code
+
+    except Exception as e:
+
+        logger.error(f"Error getting hold {hold_id}: {str(e)}")
+
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@booking_bp.route('/holds/<int:hold_id>/confirm', methods=['POST'])
+@idempotent()
+def confirm_room_hold(hold_id):
+
+    start_time = time.time()
+
+    bind_log_context(booking_id=hold_id)
+
+    try:
+
+        data = request.get_json(silent=True) or {}
+
+        booking_data, replayed = confirm_hold(hold_id, data.get('user_id'))
+
+        elapsed_time = time.time() - start_time
+
+        if replayed:
+            return jsonify({
+                'success': True,
+                'message': 'Hold already confirmed',
+                'booking': booking_data
+            }), 200
+
+        logger.info(
+            f"Hold confirmed: ID={hold_id}, Room={booking_data['room_id']}, "
+            f"User={booking_data['user_id']}, Time={elapsed_time:.3f}s"
+        )
+
+        return jsonify({
+            'success': True,
+            'message': 'Booking confirmed successfully',
+            'booking': booking_data,
+            'response_time': f"{elapsed_time:.3f}s"
+        }), 201
+
+    except HoldError as he:
+
+        return jsonify({
+            'success': False,
+            'error': he.error
+        }), he.status_code
+
+    except redis.RedisError as re:
+
+        logger.error(f"Could not check hold {hold_id}: {str(re)}")
+
+        return jsonify({
+            'success': False,
+            'error': 'Hold store unavailable'
+        }), 503
+
+    except Exception as e:
+
+        logger.error(f"Error confirming hold {hold_id}: {str(e)}")
+
+        db.session.rollback()
+
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@booking_bp.route('/holds/<int:hold_id>', methods=['DELETE'])
+def cancel_room_hold(hold_id):
+
+    bind_log_context(booking_id=hold_id)
+
+    try:
+
+        data = request.get_json(silent=True) or {}
+
+        booking = get_hold(hold_id, data.get('user_id', request.args.get('user_id')))
+
+        if booking.status != 'held':
+            raise HoldError(f'Hold is {booking.status}', 409)
+
+        if not expire_holds([hold_id], 'cancelled'):
+            raise HoldError('Hold is no longer held', 409)
+
+        return jsonify({
+            'success': True,
+            'message': 'Hold cancelled'
+        }), 200
+
+    except HoldError as he:
+
+        return jsonify({
+            'success': False,
+            'error': he.error
+        }), he.status_code
+
+    except Exception as e:
+
+        logger.error(f"Error cancelling hold {hold_id}: {str(e)}")
 
         db.session.rollback()
 
@@ -214,12 +653,14 @@ def get_user_bookings(user_id):
 
     try:
 
-        bookings = Booking.query.filter_by(user_id=user_id).all()
+        return list_bookings(Booking.user_id == user_id), 200
+
+    except ListingError as le:
 
         return jsonify({
-            'success': True,
-            'bookings': [booking.to_dict() for booking in bookings]
-        }), 200
+            'success': False,
+            'error': str(le)
+        }), 400
 
     except Exception as e:
 
@@ -236,13 +677,14 @@ def get_all_bookings():
 
     try:
 
-        bookings = Booking.query.all()
+        return list_bookings(), 200
+
+    except ListingError as le:
 
         return jsonify({
-            'success': True,
-            'count': len(bookings),
-            'bookings': [booking.to_dict() for booking in bookings]
-        }), 200
+            'success': False,
+            'error': str(le)
+        }), 400
 
     except Exception as e:
 
@@ -251,4 +693,4 @@ def get_all_bookings():
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -1,8 +1,25 @@
 #!/bin/bash
 set -e
 
-echo "Initializing database..."
-python init_db.py
+# Schema migrations normally run once per deploy in a dedicated step
+# (the *-migrate compose service / k8s Job). RUN_MIGRATIONS=true keeps the
+# old run-on-boot behaviour for deployments without that step.
+if [ "${RUN_MIGRATIONS:-false}" = "true" ]; then
+    echo "Initializing database..."
+    python init_db.py
+fi
+
+# Each gunicorn worker writes its metrics here; /metrics aggregates them.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Lanes only queue anything when a worker serves requests concurrently; a
+# sync worker handles one at a time, so BOOKING_DISPATCH=lanes runs
+# threaded (gthread) workers.
+if [ "${BOOKING_DISPATCH:-locks}" = "lanes" ]; then
+    GUNICORN_THREADS="${GUNICORN_THREADS:-16}"
+fi
 
 echo "Starting gunicorn..."
-exec gunicorn --bind 0.0.0.0:5002 --workers 4 --timeout 120 "app:create_app()"
+exec gunicorn --bind 0.0.0.0:5002 --workers 4 --threads "${GUNICORN_THREADS:-1}" --timeout 120 --preload "app:create_app()"
@@ -0,0 +1,52 @@
+import argparse
+import logging
+import signal
+import threading
+from app import create_app
+from app.holds import sweep_expired_holds
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+def run(once=False):
+    app = create_app()
+    interval = app.config['HOLD_SWEEP_INTERVAL']
+    batch_size = app.config['HOLD_SWEEP_BATCH_SIZE']
+    
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    
+    print(f"Hold sweeper running every {interval}s")
+    
+    with app.app_context():
+        while not stopped.is_set():
+            released = 0
+            try:
+                # A full batch means more holds are already due; sweep
+                # again right away instead of waiting for the interval.
+                while True:
+                    count = sweep_expired_holds()
+                    released += count
+                    if count < batch_size:
+                        break
+            except Exception as e:
+                logger.error(f"Hold sweep failed: {str(e)}")
+            finally:
+                db.session.remove()
+            
+            if released:
+                print(f"Expired {released} holds")
+            
+            if once:
+                break
+            
+            stopped.wait(interval)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Release booking holds whose TTL has passed'
+    )
+    parser.add_argument('--once', action='store_true', help='Run a single sweep and exit')
+    args = parser.parse_args()
+    
+    run(args.once)
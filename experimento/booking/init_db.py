@@ -1,12 +1,10 @@
-from app import create_app
-from app.database import db
+import os
+from alembic import command
+from alembic.config import Config
 
 def init_database():
-    app = create_app()
-    
-    with app.app_context():
-        db.create_all()
-        print("Booking database initialized successfully!")
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic.ini')), 'head')
+    print("Booking database initialized successfully!")
 
 if __name__ == '__main__':
     init_database()
@@ -0,0 +1,38 @@
+"""Baseline bookings schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by the old db.create_all() already have the table.
+    # Only the original columns are created here; 0003 adds the later ones
+    # to fresh and adopted databases alike.
+    if sa.inspect(op.get_bind()).has_table('bookings'):
+        return
+
+    op.create_table(
+        'bookings',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('check_in_date', sa.Date(), nullable=False),
+        sa.Column('check_out_date', sa.Date(), nullable=False),
+        sa.Column('total_price', sa.Numeric(10, 2), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_table('bookings')
@@ -0,0 +1,54 @@
+"""Composite indexes, room units and the overlap exclusion constraint
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('bookings', sa.Column('room_unit', sa.Integer(), nullable=True))
+
+    # room_id = ? AND check_in_date <= ? AND check_out_date > ?
+    op.create_index('ix_bookings_room_stay', 'bookings', ['room_id', 'check_in_date', 'check_out_date'])
+    # Reconciler: confirmed bookings that have not checked out yet
+    op.create_index('ix_bookings_status_check_out', 'bookings', ['status', 'check_out_date'])
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+
+    # daterange(check_in_date, check_out_date) && daterange(?, ?)
+    op.execute(
+        "CREATE INDEX ix_bookings_room_stay_gist ON bookings "
+        "USING gist (room_id, daterange(check_in_date, check_out_date, '[)'))"
+    )
+
+    # Two confirmed bookings can never hold the same unit of a room on the
+    # same night. Rows without a unit (NULL) are not compared.
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT excl_bookings_room_unit_overlap "
+        "EXCLUDE USING gist ("
+        "room_id WITH =, "
+        "room_unit WITH =, "
+        "daterange(check_in_date, check_out_date, '[)') WITH &&"
+        ") WHERE (status = 'confirmed')"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE bookings DROP CONSTRAINT IF EXISTS excl_bookings_room_unit_overlap')
+        op.execute('DROP INDEX IF EXISTS ix_bookings_room_stay_gist')
+
+    op.drop_index('ix_bookings_status_check_out', 'bookings')
+    op.drop_index('ix_bookings_room_stay', 'bookings')
+    op.drop_column('bookings', 'room_unit')
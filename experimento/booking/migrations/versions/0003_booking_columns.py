@@ -0,0 +1,72 @@
+"""Reservation, failure and idempotency columns and keyset indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ('reservation_key', sa.String(64)),
+    ('failure_reason', sa.String(255)),
+    ('idempotency_key', sa.String(255))
+)
+
+UNIQUE_COLUMNS = ('reservation_key', 'idempotency_key')
+
+INDEXES = (
+    ('ix_bookings_created_at_id', ['created_at', 'id']),
+    ('ix_bookings_user_created_at_id', ['user_id', 'created_at', 'id'])
+)
+
+
+def _unique_columns(inspector):
+    unique = [constraint['column_names'] for constraint in inspector.get_unique_constraints('bookings')]
+    unique += [index['column_names'] for index in inspector.get_indexes('bookings') if index['unique']]
+
+    return {columns[0] for columns in unique if len(columns) == 1}
+
+
+def upgrade():
+    # A table adopted by 0001 may come from any earlier db.create_all(), so
+    # each column, unique constraint and index is only added if missing.
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {column['name'] for column in inspector.get_columns('bookings')}
+
+    for name, column_type in COLUMNS:
+        if name not in columns:
+            op.add_column('bookings', sa.Column(name, column_type, nullable=True))
+
+    unique = _unique_columns(inspector)
+
+    for name in UNIQUE_COLUMNS:
+        if name not in unique:
+            op.create_index(f'uq_bookings_{name}', 'bookings', [name], unique=True)
+
+    indexes = {index['name'] for index in inspector.get_indexes('bookings')}
+
+    for name, index_columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, 'bookings', index_columns)
+
+
+def downgrade():
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('bookings')}
+
+    for name in UNIQUE_COLUMNS:
+        if f'uq_bookings_{name}' in indexes:
+            op.drop_index(f'uq_bookings_{name}', 'bookings')
+
+    for name, _ in INDEXES:
+        op.drop_index(name, 'bookings')
+
+    with op.batch_alter_table('bookings') as batch:
+        for name, _ in reversed(COLUMNS):
+            batch.drop_column(name)
@@ -0,0 +1,32 @@
+"""Hold expiry column
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('bookings')}
+
+    if 'hold_expires_at' not in columns:
+        op.add_column('bookings', sa.Column('hold_expires_at', sa.DateTime(), nullable=True))
+
+    # Bookings still held were created by POST /holds; created_at only marks
+    # them as holds, their real deadline is the hold:{id} key's TTL.
+    op.execute(
+        "UPDATE bookings SET hold_expires_at = created_at "
+        "WHERE status = 'held' AND hold_expires_at IS NULL"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('bookings') as batch:
+        batch.drop_column('hold_expires_at')
@@ -0,0 +1,46 @@
+import argparse
+import logging
+import time
+from app import create_app
+from app.compensation import reconcile_reservations
+from app.holds import expire_stale_holds
+from app.booking_queue import requeue_stale_bookings
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+def run(once=False):
+    app = create_app()
+    interval = app.config['RECONCILE_INTERVAL']
+    
+    with app.app_context():
+        while True:
+            try:
+                result = reconcile_reservations()
+                stale_holds = expire_stale_holds()
+                requeued = requeue_stale_bookings()
+                print(
+                    f"Reconciliation done: {result['orphan_reservations']} orphan reservations, "
+                    f"{result['released']} released, "
+                    f"{len(result['unbacked_bookings'])} unbacked bookings, "
+                    f"{stale_holds} stale holds expired, "
+                    f"{requeued} pending bookings re-queued"
+                )
+            except Exception as e:
+                logger.error(f"Reconciliation failed: {str(e)}")
+            finally:
+                db.session.remove()
+            
+            if once:
+                break
+            
+            time.sleep(interval)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Release inventory reservations leaked by failed bookings'
+    )
+    parser.add_argument('--once', action='store_true', help='Run a single pass and exit')
+    args = parser.parse_args()
+    
+    run(args.once)
@@ -0,0 +1,58 @@
+import argparse
+import logging
+import signal
+import threading
+from app import create_app
+from app.booking_queue import PartitionConsumer
+
+logger = logging.getLogger(__name__)
+
+def parse_partitions(value, total):
+    if not value:
+        return list(range(total))
+    
+    partitions = []
+    for part in value.split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            partitions.extend(range(int(start), int(end) + 1))
+        else:
+            partitions.append(int(part))
+    
+    return partitions
+
+def run(partitions=None):
+    app = create_app()
+    partitions = parse_partitions(partitions, app.config['BOOKING_STREAM_PARTITIONS'])
+    
+    consumers = [PartitionConsumer(app, partition) for partition in partitions]
+    for consumer in consumers:
+        consumer.start()
+    
+    print(f"Booking worker consuming partitions {partitions}")
+    
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for consumer in consumers:
+            consumer.stop()
+        for consumer in consumers:
+            consumer.join()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Process bookings queued by BOOKING_MODE=async'
+    )
+    parser.add_argument(
+        '--partitions',
+        help='Partitions to consume, e.g. "0-3" or "0,2,5" (default: all). '
+             'Each partition must be owned by exactly one worker.'
+    )
+    args = parser.parse_args()
+    
+    run(args.partitions)
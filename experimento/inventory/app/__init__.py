@@ -1,14 +1,24 @@
 from flask import Flask
 from flask_cors import CORS
 from .database import init_db
+from .events import init_events
+from .counters import init_counters
+from .logging_config import configure_logging, init_request_logging
+from .metrics import init_metrics
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('app.config.Config')
     
+    configure_logging(app)
+    
     CORS(app)
     
     init_db(app)
+    init_request_logging(app)
+    init_events(app)
+    init_counters(app)
+    init_metrics(app)
     
     from .routes import inventory_bp
     app.register_blueprint(inventory_bp, url_prefix='/api')
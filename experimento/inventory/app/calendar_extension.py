@@ -0,0 +1,68 @@
+import time
+from datetime import date, timedelta
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from .database import db
+from .models import Room, Availability
+
+def _insert_ignoring_conflicts():
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    # RETURNING only yields the rows actually inserted; executemany rowcount
+    # is not reliable across drivers.
+    return dialect.insert(Availability.__table__).on_conflict_do_nothing(
+        index_elements=['room_id', 'date']
+    ).returning(Availability.__table__.c.id)
+
+def _write(statement, batch):
+    inserted = len(db.session.execute(statement, batch).all())
+    db.session.commit()
+    return inserted
+
+def extend_calendar(horizon_days, batch_size=5000, full=False):
+    """
+    Makes sure every room has an availability row for each day from today
+    to today + horizon_days - 1, so request paths never have to insert.
+    
+    By default only days after each room's last existing row are written,
+    which keeps the daily rolling run cheap; full=True rewrites the whole
+    horizon (existing rows are left untouched either way).
+    
+    Returns (rows_written, elapsed_seconds); rows that already existed are
+    not counted.
+    """
+    start_time = time.perf_counter()
+    today = date.today()
+    end = today + timedelta(days=horizon_days)
+    
+    last_dates = {}
+    if not full:
+        last_dates = dict(
+            db.session.query(Availability.room_id, func.max(Availability.date))
+            .group_by(Availability.room_id)
+            .all()
+        )
+    
+    statement = _insert_ignoring_conflicts()
+    rows_written = 0
+    batch = []
+    
+    for room_id, total_quantity in db.session.query(Room.id, Room.total_quantity).order_by(Room.id):
+        last_date = last_dates.get(room_id)
+        current_date = max(today, last_date + timedelta(days=1)) if last_date else today
+        
+        while current_date < end:
+            batch.append({
+                'room_id': room_id,
+                'date': current_date,
+                'available_quantity': total_quantity
+            })
+            current_date += timedelta(days=1)
+            
+            if len(batch) >= batch_size:
+                rows_written += _write(statement, batch)
+                batch = []
+    
+    if batch:
+        rows_written += _write(statement, batch)
+    
+    return rows_written, time.perf_counter() - start_time
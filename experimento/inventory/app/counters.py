@@ -0,0 +1,179 @@
+import time
+import logging
+import threading
+from datetime import date
+import redis
+from flask import current_app
+from .events import get_redis_client
+from .models import Availability
+
+logger = logging.getLogger(__name__)
+
+# Counters are stored as "<available_quantity>:<version>" where the version
+# is the row's availability.version. Every write bumps it while holding the
+# row lock (FOR UPDATE, or the UPDATE's own lock in the optimistic engine),
+# so versions follow commit order and a late write-through carrying an
+# older version never overwrites a newer count.
+WRITE_IF_NEWER_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    local value = ARGV[2 * i]
+    local version = tonumber(ARGV[2 * i + 1])
+    local current = redis.call("get", key)
+    if not current or tonumber(string.match(current, ":(%d+)$")) < version then
+        redis.call("set", key, value .. ":" .. ARGV[2 * i + 1], "EX", ARGV[1])
+    end
+end
+return 1
+"""
+
+# Set after every full rebuild. Its absence means Redis lost the counters
+# (restart, flush) and CounterWatcher rebuilds them.
+READY_KEY_SUFFIX = 'ready'
+REBUILD_LOCK_SUFFIX = 'rebuilding'
+REBUILD_LOCK_TTL = 600
+
+def counter_key(room_id, night):
+    return f"{current_app.config['AVAILABILITY_COUNTER_PREFIX']}{room_id}:{night.isoformat()}"
+
+def counter_values(availabilities):
+    """
+    Copies (room_id, date, available_quantity, version) out of availability
+    rows or RETURNING rows. Call it before commit: afterwards the ORM rows
+    are expired and reading them costs a SELECT per night.
+    """
+    return [
+        (a.room_id, a.date, a.available_quantity, a.version)
+        for a in availabilities
+    ]
+
+def _write_counters(redis_client, counters):
+    args = [current_app.config['AVAILABILITY_COUNTER_TTL']]
+    for room_id, night, available_quantity, version in counters:
+        args.extend([available_quantity, version])
+    
+    current_app.extensions['write_if_newer_script'](
+        keys=[counter_key(room_id, night) for room_id, night, _, _ in counters],
+        args=args,
+        client=redis_client
+    )
+
+def write_through(counters):
+    """
+    Mirrors counter_values() of committed rows into Redis. Must be called
+    after commit; a failure only costs the booking service its fast reject.
+    """
+    if not counters:
+        return
+    
+    try:
+        _write_counters(get_redis_client(), counters)
+    except Exception as e:
+        logger.warning(f"Could not update availability counters: {str(e)}")
+
+def rebuild_counters(batch_size=1000):
+    """
+    Rebuilds every counter from today onwards from Postgres. Uses the same
+    version check as write_through, so it is safe to run while other
+    instances are serving reservations.
+    """
+    redis_client = get_redis_client()
+    
+    query = Availability.query.with_entities(
+        Availability.room_id,
+        Availability.date,
+        Availability.available_quantity,
+        Availability.version
+    ).filter(
+        Availability.date >= date.today()
+    ).order_by(Availability.id)
+    
+    batch = []
+    count = 0
+    for counter in query.yield_per(batch_size):
+        batch.append(tuple(counter))
+        if len(batch) >= batch_size:
+            _write_counters(redis_client, batch)
+            count += len(batch)
+            batch = []
+    
+    if batch:
+        _write_counters(redis_client, batch)
+        count += len(batch)
+    
+    redis_client.set(f"{current_app.config['AVAILABILITY_COUNTER_PREFIX']}{READY_KEY_SUFFIX}", 1)
+    
+    return count
+
+def ensure_counters(force=False):
+    """
+    Rebuilds the counters if Redis has lost them (or always, with force).
+    A lock key lets only one worker of one instance rebuild at a time; the
+    others skip. Returns the number of counters written, or None if no
+    rebuild ran.
+    """
+    redis_client = get_redis_client()
+    prefix = current_app.config['AVAILABILITY_COUNTER_PREFIX']
+    
+    if not force and redis_client.exists(f"{prefix}{READY_KEY_SUFFIX}"):
+        return None
+    
+    lock_key = f"{prefix}{REBUILD_LOCK_SUFFIX}"
+    if not redis_client.set(lock_key, 1, nx=True, ex=REBUILD_LOCK_TTL):
+        return None
+    
+    try:
+        return rebuild_counters()
+    finally:
+        redis_client.delete(lock_key)
+
+class CounterWatcher(threading.Thread):
+    """
+    Rebuilds the counters when the worker starts and then every interval
+    seconds checks that Redis still has them, so a Redis restart under a
+    running service doesn't leave fast reject on empty counters until the
+    next calendar run.
+    """
+    
+    def __init__(self, app, interval):
+        super().__init__(daemon=True)
+        self.app = app
+        self.interval = interval
+    
+    def run(self):
+        force = True
+        
+        while True:
+            try:
+                with self.app.app_context():
+                    count = ensure_counters(force)
+                force = False
+                if count is not None:
+                    logger.info(f"Rebuilt {count} availability counters")
+            except Exception as e:
+                logger.warning(f"Could not rebuild availability counters: {str(e)}")
+            
+            time.sleep(self.interval)
+
+def init_counters(app):
+    # Registering only hashes the script; calls pass their own client.
+    app.extensions['write_if_newer_script'] = redis.Redis(
+        connection_pool=app.extensions['redis_pool']
+    ).register_script(WRITE_IF_NEWER_SCRIPT)
+    
+    # Started with the first request, like booking's room change
+    # subscriber: scripts that build an app (init_db, extend_calendar)
+    # don't get the thread, and each preloaded gunicorn worker does.
+    started = []
+    start_lock = threading.Lock()
+    
+    @app.before_request
+    def start_counter_watcher():
+        if started or app.config['AVAILABILITY_COUNTER_CHECK_INTERVAL'] <= 0:
+            return
+        
+        with start_lock:
+            if started:
+                return
+            
+            CounterWatcher(app, app.config['AVAILABILITY_COUNTER_CHECK_INTERVAL']).start()
+            started.append(True)
@@ -3,7 +3,6 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 def init_db(app):
+    # The schema is owned by Alembic (migrations/); run
+    # `alembic upgrade head` (init_db.py does) before serving.
     db.init_app(app)
-    
-    with app.app_context():
-        db.create_all()
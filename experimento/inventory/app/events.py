@@ -0,0 +1,62 @@
+import logging
+import redis
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .models import Room
+
+logger = logging.getLogger(__name__)
+
+ROOM_META_KEY_PREFIX = 'room:meta:'
+# Bumped on every change; booking's read-through fill only writes a room's
+# hash if its generation is still the one it saw before asking us.
+ROOM_META_VERSION_KEY_PREFIX = 'room:meta:version:'
+
+
+def init_events(app):
+    app.extensions['redis_pool'] = redis.ConnectionPool(
+        host=app.config['REDIS_HOST'],
+        port=app.config['REDIS_PORT'],
+        db=app.config['REDIS_DB'],
+        max_connections=app.config['REDIS_POOL_SIZE'],
+        decode_responses=True,
+        socket_connect_timeout=5,
+        socket_timeout=5
+    )
+
+def get_redis_client():
+    return redis.Redis(connection_pool=current_app.extensions['redis_pool'])
+
+@event.listens_for(Room, 'after_update')
+@event.listens_for(Room, 'after_delete')
+def _track_room_change(mapper, connection, room):
+    session = Session.object_session(room)
+    if session is not None:
+        session.info.setdefault('changed_room_ids', set()).add(room.id)
+
+@event.listens_for(Session, 'after_commit')
+def _publish_room_changes(session):
+    room_ids = session.info.pop('changed_room_ids', None)
+    if room_ids:
+        publish_room_changes(room_ids)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_room_changes(session):
+    session.info.pop('changed_room_ids', None)
+
+def publish_room_changes(room_ids):
+    """
+    Drops the shared room metadata cache entries and tells every booking
+    worker to evict its in-process copy. Failures are logged, not raised:
+    the cache TTLs bound how long a missed invalidation can be served.
+    """
+    try:
+        redis_client = get_redis_client()
+        pipe = redis_client.pipeline()
+        for room_id in room_ids:
+            pipe.incr(f"{ROOM_META_VERSION_KEY_PREFIX}{room_id}")
+            pipe.delete(f"{ROOM_META_KEY_PREFIX}{room_id}")
+            pipe.publish(current_app.config['ROOM_EVENTS_CHANNEL'], room_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not publish room changes {sorted(room_ids)}: {str(e)}")
@@ -0,0 +1,88 @@
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_SECONDS = Histogram(
+    'inventory_http_request_seconds',
+    'Time spent serving a request, by route',
+    ['endpoint', 'method'],
+    buckets=LATENCY_BUCKETS
+)
+RESPONSES = Counter(
+    'inventory_http_responses_total',
+    'Responses by route and status code',
+    ['endpoint', 'method', 'status']
+)
+SELECT_FOR_UPDATE_SECONDS = Histogram(
+    'inventory_select_for_update_seconds',
+    'Time spent in SELECT ... FOR UPDATE, mostly waiting for row locks held by other reservations',
+    ['target'],
+    buckets=LATENCY_BUCKETS
+)
+DB_TRANSACTION_SECONDS = Histogram(
+    'inventory_db_transaction_seconds',
+    'Time from BEGIN to COMMIT/ROLLBACK on inventory_db',
+    ['outcome'],
+    buckets=LATENCY_BUCKETS
+)
+
+@event.listens_for(Engine, 'begin')
+def _transaction_started(connection):
+    connection.info['transaction_started'] = time.perf_counter()
+
+def _transaction_finished(connection, outcome):
+    started = connection.info.pop('transaction_started', None)
+    if started is not None:
+        DB_TRANSACTION_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+
+@event.listens_for(Engine, 'commit')
+def _transaction_committed(connection):
+    _transaction_finished(connection, 'commit')
+
+@event.listens_for(Engine, 'rollback')
+def _transaction_rolled_back(connection):
+    _transaction_finished(connection, 'rollback')
+
+def observe_for_update(target, query):
+    """
+    Runs query() (a SELECT ... FOR UPDATE) and records how long it took
+    under target ('availability_range', 'availability', 'reservation').
+    """
+    start = time.perf_counter()
+    try:
+        return query()
+    finally:
+        SELECT_FOR_UPDATE_SECONDS.labels(target).observe(time.perf_counter() - start)
+
+def render_metrics():
+    # Aggregates every gunicorn worker when PROMETHEUS_MULTIPROC_DIR is set
+    # (entrypoint.sh does); otherwise only this process.
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+def init_metrics(app):
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started')
+        if started is not None and request.url_rule is not None:
+            endpoint = request.url_rule.rule
+            REQUEST_SECONDS.labels(endpoint, request.method).observe(time.perf_counter() - started)
+            RESPONSES.labels(endpoint, request.method, str(response.status_code)).inc()
+        return response
+    
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_metrics(), mimetype=CONTENT_TYPE_LATEST)
@@ -30,6 +30,10 @@ class Availability(db.Model):
     room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
     available_quantity = db.Column(db.Integer, nullable=False)
+    fencing_token = db.Column(db.BigInteger, nullable=False, default=0)
+    # Bumped by every write, in commit order (the row lock serializes
+    # writers), so it identifies the row's committed state.
+    version = db.Column(db.BigInteger, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -45,3 +49,27 @@ class Availability(db.Model):
             'available_quantity': self.available_quantity,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class Reservation(db.Model):
+    __tablename__ = 'reservations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    reservation_key = db.Column(db.String(64), unique=True, nullable=False)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    check_in = db.Column(db.Date, nullable=False)
+    check_out = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='reserved')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'reservation_key': self.reservation_key,
+            'room_id': self.room_id,
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from .database import db
+from .models import Room, Availability
+from .metrics import observe_for_update
+
+class ReservationConflict(Exception):
+    def __init__(self, error, unavailable_dates=None, status_code=409):
+        super().__init__(error)
+        self.error = error
+        self.unavailable_dates = unavailable_dates or []
+        self.status_code = status_code
+
+def _nights(check_in, check_out):
+    current_date = check_in
+    while current_date < check_out:
+        yield current_date
+        current_date += timedelta(days=1)
+
+def lock_range(room_id, check_in, check_out):
+    # One ordered SELECT ... FOR UPDATE locks every night of the stay;
+    # ordering by date keeps lock acquisition deadlock-free between
+    # overlapping ranges.
+    availabilities = observe_for_update('availability_range', Availability.query.filter(
+        Availability.room_id == room_id,
+        Availability.date >= check_in,
+        Availability.date < check_out
+    ).order_by(Availability.date).with_for_update().all)
+    
+    return {availability.date: availability for availability in availabilities}
+
+def reserve_pessimistic(room_id, check_in, check_out, fencing_token=None):
+    """
+    Locks the range with SELECT ... FOR UPDATE, validates it in Python and
+    decrements every night. Returns the updated Availability rows.
+    """
+    room = Room.query.get(room_id)
+    if not room:
+        raise ReservationConflict('Room not found', status_code=404)
+    
+    by_date = lock_range(room_id, check_in, check_out)
+    
+    # Reject holders whose Redis lease expired and was taken over: a
+    # newer lock holder has already written with a higher token.
+    if fencing_token is not None and any(
+        availability.fencing_token > fencing_token
+        for availability in by_date.values()
+    ):
+        raise ReservationConflict('Stale fencing token')
+    
+    # Rows are pre-materialized by extend_calendar.py; a missing night is
+    # outside the sellable calendar, never created here.
+    unavailable_dates = [
+        night.isoformat() for night in _nights(check_in, check_out)
+        if night not in by_date or by_date[night].available_quantity <= 0
+    ]
+    if unavailable_dates:
+        raise ReservationConflict('No availability for the selected dates', unavailable_dates)
+    
+    nights = [by_date[night] for night in _nights(check_in, check_out)]
+    
+    now = datetime.utcnow()
+    for availability in nights:
+        availability.available_quantity -= 1
+        availability.version += 1
+        availability.updated_at = now
+        if fencing_token is not None:
+            availability.fencing_token = fencing_token
+    
+    return nights
+
+def reserve_optimistic(room_id, check_in, check_out, fencing_token=None):
+    """
+    Decrements every night with a single conditional UPDATE ... RETURNING and
+    compares the affected row count with the stay length. The row locks are
+    held only for the statement itself, and under READ COMMITTED a
+    concurrent update makes Postgres re-check the WHERE clause against the
+    committed row, so available_quantity can never go below zero.
+    Returns the updated rows.
+    """
+    conditions = [
+        Availability.room_id == room_id,
+        Availability.date >= check_in,
+        Availability.date < check_out,
+        Availability.available_quantity > 0
+    ]
+    values = {
+        'available_quantity': Availability.available_quantity - 1,
+        'version': Availability.version + 1,
+        'updated_at': datetime.utcnow()
+    }
+    if fencing_token is not None:
+        conditions.append(Availability.fencing_token <= fencing_token)
+        values['fencing_token'] = fencing_token
+    
+    statement = update(Availability).where(*conditions).values(**values).returning(
+        Availability.room_id,
+        Availability.date,
+        Availability.available_quantity,
+        Availability.version,
+        Availability.updated_at
+    )
+    
+    nights = db.session.execute(
+        statement,
+        execution_options={'synchronize_session': False}
+    ).all()
+    
+    expected = (check_out - check_in).days
+    if len(nights) != expected:
+        reserved = {night.date for night in nights}
+        db.session.rollback()
+        
+        if not Room.query.get(room_id):
+            raise ReservationConflict('Room not found', status_code=404)
+        
+        raise ReservationConflict(
+            'No availability for the selected dates',
+            [night.isoformat() for night in _nights(check_in, check_out) if night not in reserved]
+        )
+    
+    return sorted(nights, key=lambda night: night.date)
+
+def release_reservation(reservation):
+    """
+    Gives back every night held by a reserved reservation (never above
+    total_quantity) and marks it released. Returns (released_nights,
+    availability rows); the caller commits.
+    """
+    room = Room.query.get(reservation.room_id)
+    by_date = lock_range(reservation.room_id, reservation.check_in, reservation.check_out)
+    
+    now = datetime.utcnow()
+    released_nights = 0
+    for availability in by_date.values():
+        if availability.available_quantity < room.total_quantity:
+            availability.available_quantity += 1
+            availability.version += 1
+            availability.updated_at = now
+            released_nights += 1
+    
+    reservation.status = 'released'
+    return released_nights, list(by_date.values())
+
+ENGINES = {
+    'pessimistic': reserve_pessimistic,
+    'optimistic': reserve_optimistic
+}
@@ -1,12 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response, current_app
 from datetime import datetime, timedelta
 from .database import db
-from .models import Room, Availability
+from .models import Room, Availability, Reservation
+from .counters import counter_values, write_through
+from .reservations import ENGINES, ReservationConflict, release_reservation
+from .logging_config import bind_log_context
+from .metrics import observe_for_update
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+import hashlib
 import logging
 
 inventory_bp = Blueprint('inventory', __name__)
 logger = logging.getLogger(__name__)
 
+MAX_CALENDAR_DAYS = 366
+MAX_BULK_RELEASE = 1000
+
 @inventory_bp.route('/health', methods=['GET'])
 def health():
     return jsonify({'status': 'healthy', 'service': 'inventory'}), 200
@@ -38,6 +48,31 @@ def get_room(room_id):
         logger.error(f"Error getting room {room_id}: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@inventory_bp.route('/rooms/<int:room_id>', methods=['PUT'])
+def update_room(room_id):
+    try:
+        data = request.get_json()
+        
+        room = Room.query.get(room_id)
+        if not room:
+            return jsonify({'success': False, 'error': 'Room not found'}), 404
+        
+        if 'price_per_night' in data:
+            room.price_per_night = data['price_per_night']
+        if 'room_type' in data:
+            room.room_type = data['room_type']
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'room': room.to_dict()
+        }), 200
+    except Exception as e:
+        logger.error(f"Error updating room {room_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @inventory_bp.route('/rooms/<int:room_id>/availability', methods=['GET'])
 def check_availability(room_id):
     try:
@@ -56,28 +91,113 @@ def check_availability(room_id):
             date=date
         ).first()
         
-        if not availability:
-            availability = Availability(
-                room_id=room_id,
-                date=date,
-                available_quantity=room.total_quantity
-            )
-            db.session.add(availability)
-            db.session.commit()
+        # Nights past the materialized calendar can't be reserved, so they
+        # read as sold out rather than fully free.
+        available_quantity = availability.available_quantity if availability else 0
         
         return jsonify({
             'success': True,
             'room_id': room_id,
             'date': date_str,
-            'available_quantity': availability.available_quantity,
-            'is_available': availability.available_quantity > 0
+            'available_quantity': available_quantity,
+            'is_available': available_quantity > 0
         }), 200
         
     except ValueError:
         return jsonify({'success': False, 'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     except Exception as e:
         logger.error(f"Error checking availability: {str(e)}")
-        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@inventory_bp.route('/rooms/availability', methods=['GET'])
+def get_availability_calendar():
+    try:
+        from_str = request.args.get('from')
+        to_str = request.args.get('to')
+        room_ids_str = request.args.get('room_ids')
+        
+        if not from_str or not to_str:
+            return jsonify({'success': False, 'error': 'from and to parameters required'}), 400
+        
+        start = datetime.strptime(from_str, '%Y-%m-%d').date()
+        end = datetime.strptime(to_str, '%Y-%m-%d').date()
+        
+        if end < start:
+            return jsonify({'success': False, 'error': 'to must not be before from'}), 400
+        
+        num_days = (end - start).days + 1
+        if num_days > MAX_CALENDAR_DAYS:
+            return jsonify({'success': False, 'error': f'Range cannot exceed {MAX_CALENDAR_DAYS} days'}), 400
+        
+        rooms_query = Room.query.order_by(Room.id)
+        if room_ids_str:
+            room_ids = [int(room_id) for room_id in room_ids_str.split(',') if room_id]
+            rooms_query = rooms_query.filter(Room.id.in_(room_ids))
+        rooms = rooms_query.all()
+        
+        range_filter = (
+            Availability.room_id.in_([room.id for room in rooms]),
+            Availability.date >= start,
+            Availability.date <= end
+        )
+        
+        # Every committed reserve/release bumps the version of the rows it
+        # touched, so row count plus the sum of versions identifies the
+        # calendar's state; a revalidation that matches is answered with 304
+        # without loading the rows. updated_at is stamped before commit and
+        # is only good for Last-Modified.
+        row_count, version_sum, last_updated = db.session.query(
+            func.count(Availability.id),
+            func.coalesce(func.sum(Availability.version), 0),
+            func.max(Availability.updated_at)
+        ).filter(*range_filter).one()
+        
+        etag = hashlib.sha1(
+            f"{start}:{end}:{[(room.id, room.total_quantity) for room in rooms]}:"
+            f"{row_count}:{version_sum}".encode()
+        ).hexdigest()
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            availabilities = Availability.query.with_entities(
+                Availability.room_id,
+                Availability.date,
+                Availability.available_quantity
+            ).filter(*range_filter).all()
+            
+            dates = [start + timedelta(days=offset) for offset in range(num_days)]
+            stored = {(room_id, date): quantity for room_id, date, quantity in availabilities}
+            
+            response = jsonify({
+                'success': True,
+                'from': from_str,
+                'to': to_str,
+                'dates': [date.isoformat() for date in dates],
+                'rooms': [
+                    {
+                        'room_id': room.id,
+                        'total_quantity': room.total_quantity,
+                        'available_quantity': [
+                            stored.get((room.id, date), 0)
+                            for date in dates
+                        ]
+                    }
+                    for room in rooms
+                ]
+            })
+        
+        response.set_etag(etag)
+        if last_updated:
+            response.last_modified = last_updated
+        response.cache_control.no_cache = True
+        
+        return response
+        
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid parameters. Use YYYY-MM-DD dates and comma-separated room ids'}), 400
+    except Exception as e:
+        logger.error(f"Error getting availability calendar: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @inventory_bp.route('/rooms/<int:room_id>/reserve', methods=['POST'])
@@ -91,49 +211,307 @@ def reserve_room(room_id):
         
         date = datetime.strptime(date_str, '%Y-%m-%d').date()
         
-        room = Room.query.get(room_id)
-        if not room:
-            return jsonify({'success': False, 'error': 'Room not found'}), 404
+        engine = ENGINES[current_app.config['RESERVATION_ENGINE']]
         
-        availability = Availability.query.filter_by(
-            room_id=room_id,
-            date=date
-        ).with_for_update().first()
+        try:
+            nights = engine(room_id, date, date + timedelta(days=1))
+        except ReservationConflict as conflict:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': conflict.error}), conflict.status_code
         
-        if not availability:
-            availability = Availability(
+        counters = counter_values(nights)
+        remaining = counters[0][2]
+        db.session.commit()
+        write_through(counters)
+        
+        logger.info(f"Room {room_id} reserved for {date_str}. Remaining: {remaining}")
+        
+        return jsonify({
+            'success': True,
+            'message': 'Room reserved successfully',
+            'remaining_quantity': remaining
+        }), 200
+        
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format'}), 400
+    except Exception as e:
+        logger.error(f"Error reserving room: {str(e)}")
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _reservation_replay(reservation):
+    if reservation.status == 'reserved':
+        return jsonify({
+            'success': True,
+            'message': 'Reservation already applied',
+            'reservation': reservation.to_dict()
+        }), 200
+    
+    return jsonify({
+        'success': False,
+        'error': 'Reservation was already released',
+        'reservation': reservation.to_dict()
+    }), 409
+
+@inventory_bp.route('/rooms/<int:room_id>/reserve-range', methods=['POST'])
+def reserve_room_range(room_id):
+    try:
+        data = request.get_json()
+        check_in_str = data.get('check_in')
+        check_out_str = data.get('check_out')
+        reservation_key = data.get('reservation_key')
+        fencing_token = data.get('fencing_token')
+        
+        if not check_in_str or not check_out_str:
+            return jsonify({'success': False, 'error': 'check_in and check_out required'}), 400
+        
+        check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+        check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+        
+        if check_out <= check_in:
+            return jsonify({'success': False, 'error': 'check_out must be after check_in'}), 400
+        
+        bind_log_context(room_id=room_id, check_in=check_in_str, nights=(check_out - check_in).days, reservation_key=reservation_key)
+        
+        engine = ENGINES[current_app.config['RESERVATION_ENGINE']]
+        
+        try:
+            nights = engine(room_id, check_in, check_out, fencing_token)
+        except ReservationConflict as conflict:
+            db.session.rollback()
+            # A retry of a reservation that already landed sees its own
+            # nights as taken; answer it from the ledger instead.
+            if reservation_key:
+                reservation = Reservation.query.filter_by(reservation_key=reservation_key).first()
+                if reservation:
+                    return _reservation_replay(reservation)
+            response = {'success': False, 'error': conflict.error}
+            if conflict.unavailable_dates:
+                response['unavailable_dates'] = conflict.unavailable_dates
+            return jsonify(response), conflict.status_code
+        
+        if reservation_key:
+            db.session.add(Reservation(
+                reservation_key=reservation_key,
                 room_id=room_id,
-                date=date,
-                available_quantity=room.total_quantity
-            )
-            db.session.add(availability)
-            db.session.flush()
+                check_in=check_in,
+                check_out=check_out,
+                status='reserved'
+            ))
         
-        if availability.available_quantity <= 0:
+        counters = counter_values(nights)
+        db.session.commit()
+        write_through(counters)
+        
+        logger.info(f"Room {room_id} reserved from {check_in_str} to {check_out_str} ({len(nights)} nights)")
+        
+        return jsonify({
+            'success': True,
+            'message': 'Room reserved successfully',
+            'nights': len(nights),
+            'remaining_quantity': {
+                night.isoformat(): available_quantity
+                for _, night, available_quantity, _ in counters
+            }
+        }), 200
+        
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format'}), 400
+    except IntegrityError:
+        # A concurrent request with the same reservation key won the race.
+        db.session.rollback()
+        reservation = Reservation.query.filter_by(reservation_key=reservation_key).first()
+        if reservation:
+            return _reservation_replay(reservation)
+        return jsonify({'success': False, 'error': 'Concurrent reservation conflict'}), 409
+    except Exception as e:
+        logger.error(f"Error reserving room range: {str(e)}")
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@inventory_bp.route('/rooms/<int:room_id>/release-range', methods=['POST'])
+def release_room_range(room_id):
+    try:
+        data = request.get_json()
+        check_in_str = data.get('check_in')
+        check_out_str = data.get('check_out')
+        reservation_key = data.get('reservation_key')
+        
+        if not check_in_str or not check_out_str or not reservation_key:
+            return jsonify({'success': False, 'error': 'check_in, check_out and reservation_key required'}), 400
+        
+        check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+        check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+        
+        bind_log_context(room_id=room_id, check_in=check_in_str, nights=(check_out - check_in).days, reservation_key=reservation_key)
+        
+        reservation = observe_for_update('reservation', Reservation.query.filter_by(
+            reservation_key=reservation_key
+        ).with_for_update().first)
+        
+        if reservation and reservation.status == 'released':
             return jsonify({
-                'success': False,
-                'error': 'No availability for this date'
-            }), 409
+                'success': True,
+                'message': 'Reservation already released',
+                'released_nights': 0
+            }), 200
         
-        availability.available_quantity -= 1
-        availability.updated_at = datetime.utcnow()
+        if not reservation:
+            # The reserve call never landed (or has not landed yet). Record a
+            # tombstone so a late reserve with this key is rejected instead
+            # of leaking capacity.
+            db.session.add(Reservation(
+                reservation_key=reservation_key,
+                room_id=room_id,
+                check_in=check_in,
+                check_out=check_out,
+                status='released'
+            ))
+            db.session.commit()
+            
+            return jsonify({
+                'success': True,
+                'message': 'Nothing to release',
+                'released_nights': 0
+            }), 200
+        
+        released_nights, nights = release_reservation(reservation)
+        counters = counter_values(nights)
         db.session.commit()
+        write_through(counters)
         
-        logger.info(f"Room {room_id} reserved for {date_str}. Remaining: {availability.available_quantity}")
+        logger.info(f"Reservation {reservation_key} released for room {reservation.room_id} ({released_nights} nights)")
         
         return jsonify({
             'success': True,
-            'message': 'Room reserved successfully',
-            'remaining_quantity': availability.available_quantity
+            'message': 'Reservation released successfully',
+            'released_nights': released_nights
         }), 200
         
     except ValueError:
         return jsonify({'success': False, 'error': 'Invalid date format'}), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Concurrent release conflict, retry'}), 409
     except Exception as e:
-        logger.error(f"Error reserving room: {str(e)}")
+        logger.error(f"Error releasing room range: {str(e)}")
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Bulk release-range for sweepers (expired booking holds): every listed
+# reservation is released in one transaction, with the same tombstone for
+# keys that never landed.
+@inventory_bp.route('/reservations/release', methods=['POST'])
+def release_reservations():
+    try:
+        data = request.get_json()
+        items = data.get('reservations') or []
+        
+        if len(items) > MAX_BULK_RELEASE:
+            return jsonify({'success': False, 'error': f'At most {MAX_BULK_RELEASE} reservations per call'}), 400
+        
+        requested = {}
+        for item in items:
+            if not item.get('reservation_key') or not item.get('room_id') or not item.get('check_in') or not item.get('check_out'):
+                return jsonify({'success': False, 'error': 'room_id, check_in, check_out and reservation_key required'}), 400
+            requested[item['reservation_key']] = item
+        
+        # Reservations are locked and released in (room, check-in) order so
+        # the night locks are taken in ascending order, like a single
+        # release-range, and concurrent sweeps cannot deadlock.
+        reservations = observe_for_update('reservation', Reservation.query.filter(
+            Reservation.reservation_key.in_(list(requested))
+        ).order_by(Reservation.room_id, Reservation.check_in, Reservation.id).with_for_update().all) if requested else []
+        
+        found = {reservation.reservation_key for reservation in reservations}
+        for key, item in requested.items():
+            if key not in found:
+                db.session.add(Reservation(
+                    reservation_key=key,
+                    room_id=item['room_id'],
+                    check_in=datetime.strptime(item['check_in'], '%Y-%m-%d').date(),
+                    check_out=datetime.strptime(item['check_out'], '%Y-%m-%d').date(),
+                    status='released'
+                ))
+        
+        released = 0
+        released_nights = 0
+        nights = []
+        for reservation in reservations:
+            if reservation.status != 'reserved':
+                continue
+            reservation_nights, rows = release_reservation(reservation)
+            released += 1
+            released_nights += reservation_nights
+            nights.extend(rows)
+        
+        counters = counter_values(nights)
+        db.session.commit()
+        write_through(counters)
+        
+        logger.info(f"Bulk release: {released} of {len(requested)} reservations released ({released_nights} nights)")
+        
+        return jsonify({
+            'success': True,
+            'released': released,
+            'released_nights': released_nights
+        }), 200
+        
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format'}), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Concurrent release conflict, retry'}), 409
+    except Exception as e:
+        logger.error(f"Error releasing reservations: {str(e)}")
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@inventory_bp.route('/reservations', methods=['GET'])
+def get_reservations():
+    try:
+        status = request.args.get('status', 'reserved')
+        older_than = request.args.get('older_than', 0, type=int)
+        after_id = request.args.get('after_id', 0, type=int)
+        limit = min(request.args.get('limit', 500, type=int), 5000)
+        
+        cutoff = datetime.utcnow() - timedelta(seconds=older_than)
+        
+        reservations = Reservation.query.filter(
+            Reservation.status == status,
+            Reservation.created_at <= cutoff,
+            Reservation.id > after_id
+        ).order_by(Reservation.id).limit(limit).all()
+        
+        return jsonify({
+            'success': True,
+            'reservations': [reservation.to_dict() for reservation in reservations]
+        }), 200
+    except Exception as e:
+        logger.error(f"Error listing reservations: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@inventory_bp.route('/reservations/lookup', methods=['POST'])
+def lookup_reservations():
+    try:
+        data = request.get_json()
+        keys = data.get('reservation_keys') or []
+        
+        reservations = Reservation.query.filter(
+            Reservation.reservation_key.in_(keys)
+        ).all() if keys else []
+        
+        return jsonify({
+            'success': True,
+            'statuses': {
+                reservation.reservation_key: reservation.status
+                for reservation in reservations
+            }
+        }), 200
+    except Exception as e:
+        logger.error(f"Error looking up reservations: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @inventory_bp.route('/rooms/<int:room_id>/release', methods=['POST'])
 def release_room(room_id):
     try:
@@ -145,10 +523,10 @@ def release_room(room_id):
         
         date = datetime.strptime(date_str, '%Y-%m-%d').date()
         
-        availability = Availability.query.filter_by(
+        availability = observe_for_update('availability', Availability.query.filter_by(
             room_id=room_id,
             date=date
-        ).with_for_update().first()
+        ).with_for_update().first)
         
         if not availability:
             return jsonify({'success': False, 'error': 'Availability record not found'}), 404
@@ -156,15 +534,18 @@ def release_room(room_id):
         room = Room.query.get(room_id)
         if availability.available_quantity < room.total_quantity:
             availability.available_quantity += 1
+            availability.version += 1
             availability.updated_at = datetime.utcnow()
+            counters = counter_values([availability])
             db.session.commit()
+            write_through(counters)
             
-            logger.info(f"Room {room_id} released for {date_str}. Available: {availability.available_quantity}")
+            logger.info(f"Room {room_id} released for {date_str}. Available: {counters[0][2]}")
             
             return jsonify({
                 'success': True,
                 'message': 'Room released successfully',
-                'available_quantity': availability.available_quantity
+                'available_quantity': counters[0][2]
             }), 200
         else:
             return jsonify({
@@ -1,8 +1,18 @@
 #!/bin/bash
 set -e
 
-echo "Initializing database..."
-python init_db.py
+# Schema migrations normally run once per deploy in a dedicated step
+# (the *-migrate compose service / k8s Job). RUN_MIGRATIONS=true keeps the
+# old run-on-boot behaviour for deployments without that step.
+if [ "${RUN_MIGRATIONS:-false}" = "true" ]; then
+    echo "Initializing database..."
+    python init_db.py
+fi
+
+# Each gunicorn worker writes its metrics here; /metrics aggregates them.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
 
 echo "Starting gunicorn..."
-exec gunicorn --bind 0.0.0.0:5001 --workers 4 --timeout 120 "app:create_app()"
+exec gunicorn --bind 0.0.0.0:5001 --workers 4 --timeout 120 --preload "app:create_app()"
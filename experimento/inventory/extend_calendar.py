@@ -0,0 +1,36 @@
+import argparse
+import time
+from app import create_app
+from app.calendar_extension import extend_calendar
+from app.counters import rebuild_counters
+
+def run(days, batch_size, full, interval):
+    app = create_app()
+    
+    with app.app_context():
+        horizon = days or app.config['CALENDAR_HORIZON_DAYS']
+        
+        while True:
+            rows, elapsed = extend_calendar(horizon, batch_size, full)
+            rate = rows / elapsed if elapsed > 0 else 0
+            print(f"Calendar extended to {horizon} days: {rows} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+            
+            if rows:
+                rebuild_counters()
+            
+            if not interval:
+                break
+            
+            time.sleep(interval)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Pre-materialize availability rows for a rolling horizon'
+    )
+    parser.add_argument('--days', type=int, default=None, help='Horizon in days (default CALENDAR_HORIZON_DAYS)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--full', action='store_true', help='Cover the whole horizon, not only days after each room\'s last row')
+    parser.add_argument('--interval', type=int, default=0, help='Seconds between runs; 0 runs once and exits')
+    args = parser.parse_args()
+    
+    run(args.days, args.batch_size, args.full, args.interval)
@@ -1,14 +1,18 @@
+import os
+from alembic import command
+from alembic.config import Config
 from app import create_app
 from app.database import db
-from app.models import Room, Availability
-from datetime import datetime, timedelta
+from app.models import Room
+from app.calendar_extension import extend_calendar
+from app.counters import rebuild_counters
 
 def init_sample_data():
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic.ini')), 'head')
+    
     app = create_app()
     
     with app.app_context():
-        db.create_all()
-        
         if Room.query.count() == 0:
             rooms = [
                 Room(
@@ -42,21 +46,18 @@ def init_sample_data():
             
             db.session.commit()
             
-            today = datetime.now().date()
-            for room in rooms:
-                for i in range(30):
-                    date = today + timedelta(days=i)
-                    availability = Availability(
-                        room_id=room.id,
-                        date=date,
-                        available_quantity=room.total_quantity
-                    )
-                    db.session.add(availability)
-            
-            db.session.commit()
             print("Sample data initialized successfully!")
         else:
             print("Database already contains data. Skipping initialization.")
+        
+        # Reservations never create rows, so an existing database (e.g.
+        # seeded with the old 30-day calendar) must be brought up to the
+        # horizon too. Only missing nights are inserted.
+        rows, elapsed = extend_calendar(app.config['CALENDAR_HORIZON_DAYS'])
+        print(f"Created {rows} availability rows in {elapsed:.2f}s")
+        
+        count = rebuild_counters()
+        print(f"Rebuilt {count} availability counters in Redis.")
 
 if __name__ == '__main__':
     init_sample_data()
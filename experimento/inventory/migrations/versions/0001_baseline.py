@@ -0,0 +1,48 @@
+"""Baseline inventory schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by the old db.create_all() already have the tables.
+    # Only the original schema is created here; 0002 adds the later
+    # columns and tables to fresh and adopted databases alike.
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('rooms'):
+        op.create_table(
+            'rooms',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('room_number', sa.String(20), nullable=False, unique=True),
+            sa.Column('room_type', sa.String(50), nullable=False),
+            sa.Column('price_per_night', sa.Numeric(10, 2), nullable=False),
+            sa.Column('total_quantity', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True)
+        )
+
+    if not inspector.has_table('availability'):
+        op.create_table(
+            'availability',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('room_id', sa.Integer(), sa.ForeignKey('rooms.id'), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('available_quantity', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.UniqueConstraint('room_id', 'date', name='uix_room_date')
+        )
+
+
+def downgrade():
+    op.drop_table('availability')
+    op.drop_table('rooms')
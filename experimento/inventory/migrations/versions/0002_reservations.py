@@ -0,0 +1,49 @@
+"""Fencing tokens and the reservations ledger
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables adopted by 0001 may come from any earlier db.create_all(), so
+    # the column and the table are only added if missing.
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {column['name'] for column in inspector.get_columns('availability')}
+
+    if 'fencing_token' not in columns:
+        # The server default fills existing rows: no lock holder has
+        # written them yet.
+        op.add_column(
+            'availability',
+            sa.Column('fencing_token', sa.BigInteger(), nullable=False, server_default='0')
+        )
+
+    if not inspector.has_table('reservations'):
+        op.create_table(
+            'reservations',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('reservation_key', sa.String(64), nullable=False, unique=True),
+            sa.Column('room_id', sa.Integer(), sa.ForeignKey('rooms.id'), nullable=False),
+            sa.Column('check_in', sa.Date(), nullable=False),
+            sa.Column('check_out', sa.Date(), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True)
+        )
+
+
+def downgrade():
+    op.drop_table('reservations')
+
+    with op.batch_alter_table('availability') as batch:
+        batch.drop_column('fencing_token')
@@ -0,0 +1,25 @@
+"""Per-row version counter on availability
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'availability',
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0')
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('availability') as batch:
+        batch.drop_column('version')
@@ -67,9 +67,26 @@ resource "aws_ecs_task_definition" "inventory" {
         name  = "DATABASE_URL"
         value = "postgresql://${var.db_username}:${var.db_password}@${split(":", var.rds_endpoint)[0]}:5432/${var.inventory_db_name}"
       },
+      {
+        name  = "REDIS_HOST"
+        value = var.redis_endpoint
+      },
+      {
+        name  = "REDIS_PORT"
+        value = "6379"
+      },
+      {
+        name  = "REDIS_DB"
+        value = "0"
+      },
       {
         name  = "FLASK_ENV"
         value = "production"
+      },
+      {
+        # No one-shot migration task on ECS yet: migrate on boot.
+        name  = "RUN_MIGRATIONS"
+        value = "true"
       }
     ]
 
@@ -143,6 +160,11 @@ resource "aws_ecs_task_definition" "booking" {
       {
         name  = "FLASK_ENV"
         value = "production"
+      },
+      {
+        # No one-shot migration task on ECS yet: migrate on boot.
+        name  = "RUN_MIGRATIONS"
+        value = "true"
       }
     ]
 
@@ -0,0 +1,192 @@
+import requests
+import time
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from collections import defaultdict
+
+
+class ServiceBenchmark:
+    """
+    Throughput benchmark for the booking service. Every request books a
+    different (room, night), so the numbers measure how many bookings a
+    deployment keeps in flight rather than lock contention.
+    """
+
+    def __init__(self, num_requests=200, concurrency=100, room_ids=(1, 2, 3, 4), start_date=None):
+        self.num_requests = num_requests
+        self.concurrency = concurrency
+        self.room_ids = list(room_ids)
+        self.start_date = start_date or (datetime.now() + timedelta(days=30)).date()
+
+    def booking_payload(self, target_index, i):
+
+        room_id = self.room_ids[i % len(self.room_ids)]
+
+        # Each target gets its own window of nights so runs don't collide.
+        offset = (target_index * self.num_requests + i) // len(self.room_ids)
+        check_in = self.start_date + timedelta(days=offset)
+
+        return {
+            "user_id": 5000 + i,
+            "room_id": room_id,
+            "check_in_date": check_in.strftime("%Y-%m-%d"),
+            "check_out_date": (check_in + timedelta(days=1)).strftime("%Y-%m-%d")
+        }
+
+    def make_request(self, session, url, payload):
+
+        start_time = time.time()
+
+        try:
+
+            response = session.post(
+                f"{url}/bookings/confirm",
+                json=payload,
+                headers={"Idempotency-Key": uuid.uuid4().hex},
+                timeout=30
+            )
+
+            status_code = response.status_code
+
+        except requests.exceptions.Timeout:
+
+            status_code = 503
+
+        except Exception:
+
+            status_code = 500
+
+        return status_code, time.time() - start_time
+
+    def run_target(self, target_index, name, url):
+
+        print(f"Running {self.num_requests} bookings against {name} ({url}) "
+              f"with {self.concurrency} concurrent clients...")
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+        session.mount("http://", adapter)
+
+        payloads = [self.booking_payload(target_index, i) for i in range(self.num_requests)]
+
+        start_time = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(
+                lambda payload: self.make_request(session, url, payload),
+                payloads
+            ))
+
+        total_time = time.time() - start_time
+
+        status_codes = defaultdict(int)
+
+        for status_code, _ in results:
+            status_codes[status_code] += 1
+
+        response_times = sorted(elapsed for _, elapsed in results)
+
+        return {
+            "target": name,
+            "url": url,
+            "requests": len(results),
+            "duration": total_time,
+            "throughput": len(results) / total_time,
+            "p50": response_times[int(len(response_times) * 0.50)],
+            "p95": response_times[int(len(response_times) * 0.95)],
+            "p99": response_times[int(len(response_times) * 0.99)],
+            "status_codes": dict(status_codes)
+        }
+
+    def run(self, targets):
+
+        summaries = [
+            self.run_target(index, name, url)
+            for index, (name, url) in enumerate(targets)
+        ]
+
+        print("\n" + "=" * 80)
+        print("BENCHMARK RESULTS")
+        print("=" * 80 + "\n")
+
+        print(f"{'Target':<12} {'req/s':>8} {'P50':>8} {'P95':>8} {'P99':>8}  Status codes")
+
+        for summary in summaries:
+            print(
+                f"{summary['target']:<12} "
+                f"{summary['throughput']:>8.1f} "
+                f"{summary['p50']:>7.3f}s "
+                f"{summary['p95']:>7.3f}s "
+                f"{summary['p99']:>7.3f}s  "
+                f"{summary['status_codes']}"
+            )
+
+        if len(summaries) > 1:
+
+            baseline = summaries[0]
+
+            for summary in summaries[1:]:
+                print(
+                    f"\n{summary['target']} vs {baseline['target']}: "
+                    f"{summary['throughput'] / baseline['throughput']:.2f}x throughput, "
+                    f"P95 {summary['p95'] / baseline['p95']:.2f}x"
+                )
+
+        return summaries
+
+
+def parse_target(value):
+
+    name, _, url = value.partition("=")
+
+    return name, url
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compare booking service deployments (gunicorn vs ASGI)"
+    )
+
+    parser.add_argument(
+        "--target",
+        action="append",
+        type=parse_target,
+        help="name=url, repeatable (default: gunicorn on 5002 and asgi on 5003)"
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--room-ids", default="1,2,3,4")
+    parser.add_argument("--start-date", default=None)
+    parser.add_argument("--output", default="benchmark_results.json")
+
+    args = parser.parse_args()
+
+    targets = args.target or [
+        ("gunicorn", "http://localhost:5002/api"),
+        ("asgi", "http://localhost:5003/api")
+    ]
+
+    start_date = datetime.strptime(args.start_date, "%Y-%m-%d").date() if args.start_date else None
+
+    benchmark = ServiceBenchmark(
+        args.requests,
+        args.concurrency,
+        [int(room_id) for room_id in args.room_ids.split(",")],
+        start_date
+    )
+
+    summaries = benchmark.run(targets)
+
+    with open(args.output, "w") as f:
+        json.dump(summaries, f, indent=2)
+
+    print(f"\nDetailed results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+import json
+import math
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+
+REPORT_SCHEMA = 1
+
+PERCENTILES = (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99))
+
+# Outcomes the services are expected to produce (200 for reads, 201/409/503
+# for bookings); anything else is grouped as "other".
+OUTCOMES = ("200", "201", "409", "503")
+
+
+def percentile(values, fraction):
+    """
+    Linearly interpolated percentile of values (the Hyndman-Fan type 7
+    estimator numpy uses by default). Unlike indexing a sorted list at
+    int(n * q), it does not collapse P99 of a small sample into its max.
+    """
+
+    if not values:
+        return None
+
+    ordered = sorted(values)
+
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+
+    if lower == upper:
+        return ordered[lower]
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_summary(values):
+
+    summary = {"count": len(values)}
+
+    if not values:
+        return summary
+
+    summary["min"] = min(values)
+    summary["mean"] = sum(values) / len(values)
+
+    for name, fraction in PERCENTILES:
+        summary[name] = percentile(values, fraction)
+
+    summary["max"] = max(values)
+
+    return summary
+
+
+def correct_coordinated_omission(latencies, expected_interval):
+    """
+    Closed-loop correction in the style of HdrHistogram's
+    recordValueWithExpectedInterval: a client that waits for each response
+    before sending the next one never measures the requests it *would* have
+    sent during a stall. For every latency longer than expected_interval,
+    the missing requests are added back with the latency they would have
+    seen (latency - interval, latency - 2 * interval, ...).
+    """
+
+    if not expected_interval or expected_interval <= 0:
+        return list(latencies)
+
+    corrected = []
+
+    for latency in latencies:
+
+        corrected.append(latency)
+
+        missed = latency - expected_interval
+
+        while missed >= expected_interval:
+            corrected.append(missed)
+            missed -= expected_interval
+
+    return corrected
+
+
+def _outcome(status):
+
+    status = str(status)
+
+    return status if status in OUTCOMES else "other"
+
+
+def _parse_time(value):
+
+    return datetime.fromisoformat(value).timestamp()
+
+
+def samples_from_concurrent_test(results, expected_interval=None):
+    """
+    Normalizes concurrent_booking_test.py output: one request per user, all
+    started together. Start times are recovered from the completion
+    timestamp minus the response time.
+    """
+
+    samples = []
+
+    for result in results:
+
+        latency = result.get("completion_time", result["response_time"])
+        finished = _parse_time(result["timestamp"])
+
+        samples.append({
+            "status": result["status_code"],
+            "latency": latency,
+            "service_time": result["response_time"],
+            "started": finished - latency,
+            "finished": finished
+        })
+
+    return samples, expected_interval
+
+
+def samples_from_load_generator(lines):
+    """
+    Normalizes load_generator.py --samples-output. Latency counts from the
+    scheduled start, so it is already free of coordinated omission; the
+    service time (from the actual send) is kept alongside for comparison.
+    """
+
+    samples = []
+
+    for line in lines:
+
+        if not line.strip():
+            continue
+
+        sample = json.loads(line)
+
+        samples.append({
+            "status": sample["status"] or sample.get("error") or "error",
+            "latency": sample["finished"] - sample["intended_start"],
+            "service_time": sample["finished"] - sample["sent"],
+            "started": sample["intended_start"],
+            "finished": sample["finished"],
+            "scenario": sample.get("scenario")
+        })
+
+    return samples, None
+
+
+def build_report(samples, source, label=None, expected_interval=None):
+
+    if not samples:
+        raise ValueError("No samples to report on")
+
+    duration = max(sample["finished"] for sample in samples) - min(sample["started"] for sample in samples)
+
+    status_codes = defaultdict(int)
+    by_outcome = defaultdict(list)
+
+    for sample in samples:
+        status_codes[str(sample["status"])] += 1
+        by_outcome[_outcome(sample["status"])].append(sample["latency"])
+
+    latencies = [sample["latency"] for sample in samples]
+
+    report = {
+        "schema": REPORT_SCHEMA,
+        "source": source,
+        "label": label,
+        "created_at": datetime.now().isoformat(),
+        "requests": len(samples),
+        "duration": duration,
+        "throughput": len(samples) / duration if duration > 0 else None,
+        "status_codes": dict(sorted(status_codes.items())),
+        "error_rate": sum(
+            count for status, count in status_codes.items()
+            if not status.isdigit() or int(status) >= 500
+        ) / len(samples),
+        "latency": latency_summary(correct_coordinated_omission(latencies, expected_interval)),
+        "service_time": latency_summary([sample["service_time"] for sample in samples]),
+        "by_outcome": {
+            outcome: latency_summary(correct_coordinated_omission(values, expected_interval))
+            for outcome, values in sorted(by_outcome.items())
+        }
+    }
+
+    if expected_interval:
+        report["coordinated_omission"] = {"expected_interval": expected_interval}
+
+    scenarios = defaultdict(list)
+
+    for sample in samples:
+        if sample.get("scenario"):
+            scenarios[sample["scenario"]].append(sample["latency"])
+
+    if scenarios:
+        report["by_scenario"] = {
+            scenario: latency_summary(values)
+            for scenario, values in sorted(scenarios.items())
+        }
+
+    return report
+
+
+def compare(report, baseline, max_p95_regression=0.10, max_throughput_regression=0.10, min_p95_delta=0.005):
+    """
+    Returns (checks, regressions). P95 regresses when it grows by more than
+    max_p95_regression (a fraction) and by more than min_p95_delta seconds,
+    so sub-millisecond jitter on a fast run does not fail the gate.
+    Throughput regresses when it drops by more than
+    max_throughput_regression.
+    """
+
+    checks = []
+
+    def check(name, current, previous, worse, limit):
+
+        if current is None or previous is None or previous == 0:
+            return
+
+        change = (current - previous) / previous
+
+        checks.append({
+            "metric": name,
+            "baseline": previous,
+            "current": current,
+            "change": change,
+            "limit": limit,
+            "regressed": worse(change, current, previous)
+        })
+
+    check(
+        "latency.p95",
+        report["latency"].get("p95"),
+        baseline["latency"].get("p95"),
+        lambda change, current, previous: change > max_p95_regression and current - previous > min_p95_delta,
+        max_p95_regression
+    )
+
+    for outcome in OUTCOMES:
+
+        if outcome in report["by_outcome"] and outcome in baseline.get("by_outcome", {}):
+            check(
+                f"by_outcome.{outcome}.p95",
+                report["by_outcome"][outcome].get("p95"),
+                baseline["by_outcome"][outcome].get("p95"),
+                lambda change, current, previous: change > max_p95_regression and current - previous > min_p95_delta,
+                max_p95_regression
+            )
+
+    check(
+        "throughput",
+        report.get("throughput"),
+        baseline.get("throughput"),
+        lambda change, current, previous: -change > max_throughput_regression,
+        max_throughput_regression
+    )
+
+    return checks, [c for c in checks if c["regressed"]]
+
+
+def print_report(report):
+
+    print("\n" + "=" * 80)
+    print(f"BENCHMARK REPORT ({report['source']}{', ' + report['label'] if report['label'] else ''})")
+    print("=" * 80 + "\n")
+
+    throughput = report["throughput"]
+
+    print(f"Requests: {report['requests']} in {report['duration']:.3f}s "
+          f"({throughput:.2f} req/s)" if throughput else f"Requests: {report['requests']}")
+    print(f"Status codes: {report['status_codes']}")
+    print(f"Error rate: {report['error_rate']:.2%}")
+
+    print(f"\n{'':<14} {'n':>6} {'P50':>9} {'P90':>9} {'P95':>9} {'P99':>9} {'Max':>9}")
+
+    rows = [("all", report["latency"]), ("service time", report["service_time"])]
+    rows += [(f"  {outcome}", summary) for outcome, summary in report["by_outcome"].items()]
+    rows += [(f"  {scenario}", summary) for scenario, summary in report.get("by_scenario", {}).items()]
+
+    for name, summary in rows:
+
+        if not summary["count"]:
+            continue
+
+        print(f"{name:<14} {summary['count']:>6} " + " ".join(
+            f"{summary[key] * 1000:>7.1f}ms" for key in ("p50", "p90", "p95", "p99", "max")
+        ))
+
+    if report["latency"]["count"] < 100:
+        print(f"\n⚠ Only {report['latency']['count']} samples: P99 is interpolated between the "
+              f"two slowest requests and will be noisy")
+
+
+def print_comparison(checks):
+
+    print("\n" + "=" * 80)
+    print("BASELINE COMPARISON")
+    print("=" * 80 + "\n")
+
+    for c in checks:
+        print(
+            f"{'✗' if c['regressed'] else '✓'} {c['metric']:<24} "
+            f"{c['baseline']:.4f} → {c['current']:.4f} ({c['change']:+.1%}, limit {c['limit']:.0%})"
+        )
+
+
+def load_samples(path, expected_interval=None):
+
+    if path.endswith(".jsonl"):
+
+        with open(path) as f:
+            samples, _ = samples_from_load_generator(f)
+
+        return samples, "load_generator", None
+
+    with open(path) as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+
+        samples, interval = samples_from_concurrent_test(data, expected_interval)
+
+        return samples, "concurrent_booking_test", interval
+
+    raise ValueError(
+        f"{path}: expected concurrent_booking_test.py results (a JSON list) "
+        f"or load_generator.py --samples-output (.jsonl)"
+    )
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Build a benchmark report and gate it against a stored baseline"
+    )
+
+    parser.add_argument("results", help="test_results.json or a load_generator .jsonl samples file")
+    parser.add_argument("--label", default=None, help="Free-form label stored in the report (commit, config...)")
+    parser.add_argument(
+        "--expected-interval",
+        type=float,
+        default=None,
+        help="Closed-loop send interval in seconds; enables coordinated-omission correction"
+    )
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--baseline", default=None, help="Report to compare against")
+    parser.add_argument("--max-p95-regression", type=float, default=0.10)
+    parser.add_argument("--max-throughput-regression", type=float, default=0.10)
+    parser.add_argument("--min-p95-delta", type=float, default=0.005,
+                        help="Ignore P95 increases smaller than this many seconds")
+    parser.add_argument("--save-baseline", default=None, help="Also write this report as the new baseline")
+
+    args = parser.parse_args()
+
+    samples, source, interval = load_samples(args.results, args.expected_interval)
+
+    report = build_report(samples, source, args.label, interval)
+
+    print_report(report)
+
+    regressions = []
+
+    if args.baseline:
+
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        checks, regressions = compare(
+            report,
+            baseline,
+            args.max_p95_regression,
+            args.max_throughput_regression,
+            args.min_p95_delta
+        )
+
+        report["baseline_comparison"] = {"baseline": args.baseline, "checks": checks}
+
+        print_comparison(checks)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nReport saved to {args.output}")
+
+    if args.save_baseline:
+
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if regressions:
+        print(f"\n✗ {len(regressions)} metrics regressed beyond their threshold")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,28 @@ import threading
 import time
 from datetime import datetime, timedelta
 import json
+import uuid
 from collections import defaultdict
 
+from benchmark_report import percentile
+
+
+# Final async booking status -> the status code the sync endpoint would
+# have returned for it.
+BOOKING_STATUS_CODES = {
+    "confirmed": 201,
+    "rejected": 409,
+    "failed": 503
+}
+
 
 class ConcurrentBookingTest:
 
-    def __init__(self, booking_service_url, num_users=50):
+    def __init__(self, booking_service_url, num_users=50, retries=0, timeout=10):
         self.booking_service_url = booking_service_url
         self.num_users = num_users
+        self.retries = retries
+        self.timeout = timeout
         self.results = []
         self.lock = threading.Lock()
 
@@ -18,26 +32,54 @@ class ConcurrentBookingTest:
 
         start_time = time.time()
 
+        # Retries after a timeout reuse the key, like a well-behaved client.
+        idempotency_key = uuid.uuid4().hex
+
         try:
 
-            response = requests.post(
-                f"{self.booking_service_url}/bookings/confirm",
-                json={
-                    "user_id": user_id,
-                    "room_id": room_id,
-                    "check_in_date": check_in_date,
-                    "check_out_date": check_out_date
-                },
-                timeout=10
-            )
+            for attempt in range(self.retries + 1):
+
+                try:
+
+                    response = requests.post(
+                        f"{self.booking_service_url}/bookings/confirm",
+                        json={
+                            "user_id": user_id,
+                            "room_id": room_id,
+                            "check_in_date": check_in_date,
+                            "check_out_date": check_out_date
+                        },
+                        headers={"Idempotency-Key": idempotency_key},
+                        timeout=self.timeout
+                    )
+
+                    break
+
+                except requests.exceptions.Timeout:
+
+                    if attempt == self.retries:
+                        raise
 
             elapsed_time = time.time() - start_time
 
+            status_code = response.status_code
+            completion_time = elapsed_time
+
+            if status_code == 202:
+
+                # BOOKING_MODE=async: poll the status URL until the worker
+                # settles the booking, and report the final outcome.
+                status_code = self.wait_for_booking(response.json()["status_url"])
+                completion_time = time.time() - start_time
+
             result = {
                 "user_id": user_id,
-                "status_code": response.status_code,
+                "status_code": status_code,
                 "response_time": elapsed_time,
-                "success": response.status_code == 201,
+                "completion_time": completion_time,
+                "attempts": attempt + 1,
+                "replayed": response.headers.get("Idempotent-Replayed") == "true",
+                "success": status_code == 201,
                 "timestamp": datetime.now().isoformat()
             }
 
@@ -72,6 +114,22 @@ class ConcurrentBookingTest:
 
         return result
 
+    def wait_for_booking(self, status_url, timeout=30, poll_interval=0.2):
+
+        base_url = self.booking_service_url.rsplit("/api", 1)[0]
+        deadline = time.time() + timeout
+
+        while time.time() < deadline:
+
+            booking = requests.get(f"{base_url}{status_url}", timeout=10).json()["booking"]
+
+            if booking["status"] != "pending":
+                return BOOKING_STATUS_CODES.get(booking["status"], 500)
+
+            time.sleep(poll_interval)
+
+        return 503
+
     def run_concurrent_test(self, room_id, check_in_date, check_out_date):
 
         print("\n" + "=" * 80)
@@ -174,12 +232,21 @@ class ConcurrentBookingTest:
         print(f"  Max: {max(response_times):.3f}s")
         print(f"  Avg: {sum(response_times)/len(response_times):.3f}s")
 
-        p95 = response_times[int(len(response_times)*0.95)]
-        p99 = response_times[int(len(response_times)*0.99)]
+        p95 = percentile(response_times, 0.95)
+        p99 = percentile(response_times, 0.99)
 
         print(f"  P95: {p95:.3f}s")
         print(f"  P99: {p99:.3f}s")
 
+        completion_times = sorted(r.get("completion_time", r["response_time"]) for r in self.results)
+
+        if completion_times != response_times:
+
+            print("\nCompletion Times (async, until settled):")
+
+            print(f"  P95: {percentile(completion_times, 0.95):.3f}s")
+            print(f"  P99: {percentile(completion_times, 0.99):.3f}s")
+
         throughput = len(self.results) / total_test_time
 
         print(f"\nThroughput: {throughput:.2f} requests/sec")
@@ -230,6 +297,10 @@ def main():
     parser.add_argument("--check-in", default=None)
     parser.add_argument("--check-out", default=None)
 
+    parser.add_argument("--retries", type=int, default=0,
+                        help="Retries after a client timeout, with the same Idempotency-Key")
+    parser.add_argument("--timeout", type=float, default=10)
+
     parser.add_argument("--output", default="test_results.json")
 
     args = parser.parse_args()
@@ -261,7 +332,7 @@ def main():
         print(f"Cannot connect to service: {e}")
         return
 
-    test = ConcurrentBookingTest(args.url, args.users)
+    test = ConcurrentBookingTest(args.url, args.users, args.retries, args.timeout)
 
     results = test.run_concurrent_test(args.room_id, check_in, check_out)
 
@@ -0,0 +1,564 @@
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram: latencies are recorded in microseconds into
+    log-linear buckets (256 linear sub-buckets per power of two), so every
+    recorded value keeps better than 1% precision from 1 us to hours in a
+    few kilobytes, no matter how many samples a run produces.
+    """
+
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.sum = 0
+
+    def _key(self, value):
+
+        shift = max(value.bit_length() - self.SUB_BUCKET_BITS, 0)
+
+        return shift, value >> shift
+
+    @staticmethod
+    def _bounds(key):
+
+        shift, sub_bucket = key
+
+        return sub_bucket << shift, ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds, count=1):
+
+        value = max(int(seconds * 1_000_000), 0)
+
+        self.counts[self._key(value)] += count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum += other.sum
+
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        """
+        Smallest recorded value (bucket midpoint, in seconds) such that at
+        least fraction of all samples are at or below it.
+        """
+
+        if not self.total:
+            return None
+
+        rank = max(1, math.ceil(fraction * self.total - 1e-9))
+        seen = 0
+
+        for key in sorted(self.counts, key=self._bounds):
+
+            seen += self.counts[key]
+
+            if seen >= rank:
+                low, high = self._bounds(key)
+                return min(max((low + high) / 2, self.min), self.max) / 1_000_000
+
+        return self.max / 1_000_000
+
+    def mean(self):
+
+        return self.sum / self.total / 1_000_000 if self.total else None
+
+    def to_dict(self):
+
+        return {
+            "count": self.total,
+            "min": self.min / 1_000_000 if self.total else None,
+            "mean": self.mean(),
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "p999": self.percentile(0.999),
+            "max": self.max / 1_000_000 if self.total else None,
+            "buckets": [[shift, sub_bucket, count] for (shift, sub_bucket), count in sorted(self.counts.items())]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+
+        histogram = cls()
+
+        for shift, sub_bucket, count in data["buckets"]:
+            histogram.counts[(shift, sub_bucket)] = count
+
+        histogram.total = data["count"]
+        histogram.sum = int((data["mean"] or 0) * 1_000_000 * histogram.total)
+        histogram.min = int(data["min"] * 1_000_000) if data["min"] is not None else None
+        histogram.max = int(data["max"] * 1_000_000) if data["max"] is not None else None
+
+        return histogram
+
+
+class Scenarios:
+    """
+    Request factories for each traffic pattern. Each returns
+    (service, method, path, json body or None).
+    """
+
+    def __init__(self, rng, room_ids, hot_room_id, start_date, horizon_days, user_ids):
+        self.rng = rng
+        self.room_ids = room_ids
+        self.hot_room_id = hot_room_id
+        self.start_date = start_date
+        self.horizon_days = horizon_days
+        self.user_ids = user_ids
+
+    def _booking(self, room_id, check_in, nights):
+
+        return (
+            "booking",
+            "POST",
+            "/bookings/confirm",
+            {
+                "user_id": self.rng.randint(*self.user_ids),
+                "room_id": room_id,
+                "check_in_date": check_in.strftime("%Y-%m-%d"),
+                "check_out_date": (check_in + timedelta(days=nights)).strftime("%Y-%m-%d")
+            }
+        )
+
+    def flash_sale(self):
+        """Everyone wants the same room for the same weekend."""
+
+        return self._booking(self.hot_room_id, self.start_date, 2)
+
+    def long_stay(self):
+        """7-14 nights anywhere in the calendar; locks many nights at once."""
+
+        check_in = self.start_date + timedelta(days=self.rng.randrange(self.horizon_days))
+
+        return self._booking(self.rng.choice(self.room_ids), check_in, self.rng.randint(7, 14))
+
+    def short_stay(self):
+
+        check_in = self.start_date + timedelta(days=self.rng.randrange(self.horizon_days))
+
+        return self._booking(self.rng.choice(self.room_ids), check_in, self.rng.randint(1, 3))
+
+    def browse(self):
+        """Availability calendar for the next two weeks from a random date."""
+
+        start = self.start_date + timedelta(days=self.rng.randrange(self.horizon_days))
+
+        return (
+            "inventory",
+            "GET",
+            f"/rooms/availability?from={start:%Y-%m-%d}&to={start + timedelta(days=13):%Y-%m-%d}",
+            None
+        )
+
+    def history(self):
+        """A user's latest bookings."""
+
+        return ("booking", "GET", f"/bookings/user/{self.rng.randint(*self.user_ids)}?limit=20", None)
+
+
+SCENARIOS = ("flash_sale", "long_stay", "short_stay", "browse", "history")
+
+MIXES = {
+    "flash-sale": {"flash_sale": 0.8, "browse": 0.2},
+    "mixed": {"short_stay": 0.4, "long_stay": 0.1, "browse": 0.35, "history": 0.15},
+    "long-stays": {"long_stay": 0.7, "browse": 0.3},
+    "read-heavy": {"browse": 0.6, "history": 0.3, "short_stay": 0.1}
+}
+
+
+def parse_mix(value):
+
+    if value in MIXES:
+        return MIXES[value]
+
+    mix = {}
+
+    for item in value.split(","):
+
+        name, _, weight = item.partition("=")
+
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+
+        mix[name] = float(weight or 1)
+
+    return mix
+
+
+def parse_stages(rates, ramp_to, duration, step_duration):
+    """
+    Builds (start_rate, end_rate, seconds) stages: one stage per
+    comma-separated rate (a step test), or a single linear ramp from
+    rates to ramp_to over duration.
+    """
+
+    if ramp_to is not None:
+        return [(float(rates), ramp_to, duration)]
+
+    steps = [float(rate) for rate in str(rates).split(",")]
+
+    return [(rate, rate, step_duration or duration) for rate in steps]
+
+
+class LoadGenerator:
+    """
+    Open-loop load: requests start on a Poisson schedule at the target rate
+    whether or not earlier ones have answered, so a slow service faces a
+    growing queue exactly like it would in production instead of slowing
+    the client down. Latency is measured from each request's scheduled
+    start, so time spent queued behind a saturated client counts too.
+    """
+
+    def __init__(self, booking_url, inventory_url, mix, scenarios, max_in_flight=1000,
+                 timeout=30, seed=None, idempotency_keys=True):
+        self.urls = {"booking": booking_url.rstrip("/"), "inventory": inventory_url.rstrip("/")}
+        self.mix = mix
+        self.scenarios = scenarios
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.idempotency_keys = idempotency_keys
+        self.samples = []
+        self.dropped = Counter()
+
+    def pick_scenario(self):
+
+        names = list(self.mix)
+
+        return self.rng.choices(names, weights=[self.mix[name] for name in names])[0]
+
+    async def send(self, client, stage, scenario, intended_start, in_flight):
+
+        service, method, path, body = getattr(self.scenarios, scenario)()
+
+        headers = {}
+
+        if body is not None and self.idempotency_keys:
+            headers["Idempotency-Key"] = uuid.uuid4().hex
+
+        sent = time.perf_counter()
+        error = None
+
+        try:
+
+            response = await client.request(method, f"{self.urls[service]}{path}", json=body, headers=headers)
+            status = response.status_code
+
+        except httpx.TimeoutException:
+
+            status, error = 0, "timeout"
+
+        except httpx.HTTPError as e:
+
+            status, error = 0, type(e).__name__
+
+        finally:
+
+            in_flight.release()
+
+        self.samples.append({
+            "stage": stage,
+            "scenario": scenario,
+            "status": status,
+            "error": error,
+            "intended_start": intended_start,
+            "sent": sent,
+            "finished": time.perf_counter()
+        })
+
+    async def run_stage(self, client, index, start_rate, end_rate, duration, in_flight, tasks):
+
+        stage_start = time.perf_counter()
+        next_arrival = stage_start
+
+        while True:
+
+            elapsed = next_arrival - stage_start
+
+            if elapsed >= duration:
+                break
+
+            # Linear ramp: the rate in effect at this arrival sets the gap
+            # to the next one.
+            rate = start_rate + (end_rate - start_rate) * elapsed / duration
+
+            delay = next_arrival - time.perf_counter()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            scenario = self.pick_scenario()
+
+            if in_flight.locked():
+                # The client itself is saturated; record the miss rather
+                # than silently lowering the offered rate.
+                self.dropped[(index, scenario)] += 1
+            else:
+                await in_flight.acquire()
+                tasks.add(asyncio.create_task(self.send(client, index, scenario, next_arrival, in_flight)))
+                tasks.difference_update([task for task in tasks if task.done()])
+
+            next_arrival += self.rng.expovariate(rate) if rate > 0 else duration
+
+    async def run(self, stages):
+
+        limits = httpx.Limits(max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight)
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+
+            run_start = time.perf_counter()
+
+            for index, (start_rate, end_rate, duration) in enumerate(stages):
+
+                print(f"Stage {index}: {start_rate:g} -> {end_rate:g} req/s for {duration:g}s")
+
+                await self.run_stage(client, index, start_rate, end_rate, duration, in_flight, tasks)
+
+            await asyncio.gather(*tasks)
+
+        return time.perf_counter() - run_start
+
+
+def summarize(samples, stages, dropped):
+    """
+    Per-stage and per-scenario throughput, status codes and latency
+    histograms (from scheduled start, and service time from actual send).
+    """
+
+    groups = defaultdict(list)
+
+    for sample in samples:
+        groups[(sample["stage"], sample["scenario"])].append(sample)
+
+    summary = []
+
+    for index, (start_rate, end_rate, duration) in enumerate(stages):
+
+        stage_samples = [sample for sample in samples if sample["stage"] == index]
+
+        stage = {
+            "stage": index,
+            "offered_rate": (start_rate + end_rate) / 2,
+            "duration": duration,
+            "scenarios": {}
+        }
+
+        for scenario in sorted({sample["scenario"] for sample in stage_samples}):
+
+            latency = LatencyHistogram()
+            service_time = LatencyHistogram()
+            status_codes = Counter()
+
+            for sample in groups[(index, scenario)]:
+                latency.record(sample["finished"] - sample["intended_start"])
+                service_time.record(sample["finished"] - sample["sent"])
+                status_codes[sample["status"]] += 1
+
+            stage["scenarios"][scenario] = {
+                "requests": latency.total,
+                "dropped": dropped.get((index, scenario), 0),
+                "status_codes": dict(status_codes),
+                "latency": latency.to_dict(),
+                "service_time": service_time.to_dict()
+            }
+
+        total = LatencyHistogram()
+
+        for scenario in stage["scenarios"].values():
+            total.merge(LatencyHistogram.from_dict(scenario["latency"]))
+
+        answered = sum(1 for sample in stage_samples if sample["status"])
+
+        stage["requests"] = total.total
+        stage["throughput"] = answered / duration if duration else 0
+        stage["errors"] = sum(1 for sample in stage_samples if sample["status"] == 0 or sample["status"] >= 500)
+        stage["latency"] = total.to_dict()
+
+        summary.append(stage)
+
+    return summary
+
+
+def find_knee(summary, throughput_ratio=0.9, latency_factor=3.0):
+    """
+    First stage where the service stops keeping up: achieved throughput
+    falls below throughput_ratio of the offered rate, or P99 grows past
+    latency_factor times the first stage's P99.
+    """
+
+    baseline_p99 = summary[0]["latency"]["p99"] if summary and summary[0]["latency"]["count"] else None
+
+    for stage in summary:
+
+        if stage["offered_rate"] and stage["throughput"] < throughput_ratio * stage["offered_rate"]:
+            return stage["stage"]
+
+        p99 = stage["latency"]["p99"]
+
+        if baseline_p99 and p99 and p99 > latency_factor * baseline_p99:
+            return stage["stage"]
+
+    return None
+
+
+def format_ms(value):
+
+    return f"{value * 1000:>7.1f}ms" if value is not None else f"{'-':>9}"
+
+
+def print_summary(summary, knee):
+
+    print("\n" + "=" * 80)
+    print("LOAD TEST RESULTS")
+    print("=" * 80 + "\n")
+
+    print(f"{'Stage':<6} {'Offered':>8} {'Achieved':>9} {'P50':>9} {'P95':>9} {'P99':>9} {'Errors':>7}")
+
+    for stage in summary:
+
+        latency = stage["latency"]
+
+        print(
+            f"{stage['stage']:<6} "
+            f"{stage['offered_rate']:>8.1f} "
+            f"{stage['throughput']:>9.1f} "
+            f"{format_ms(latency['p50'])} "
+            f"{format_ms(latency['p95'])} "
+            f"{format_ms(latency['p99'])} "
+            f"{stage['errors']:>7}"
+        )
+
+        for name, scenario in stage["scenarios"].items():
+            print(
+                f"{'':<6} {name:<18} {scenario['requests']:>6} req  "
+                f"P99 {format_ms(scenario['latency']['p99'])}  {scenario['status_codes']}"
+                + (f"  dropped={scenario['dropped']}" if scenario["dropped"] else "")
+            )
+
+    if knee is None:
+        print("\n✓ No saturation knee within the tested rates")
+    else:
+        print(f"\n⚠ Saturation knee at stage {knee} ({summary[knee]['offered_rate']:.1f} req/s offered)")
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Open-loop Poisson load generator for the booking and inventory services"
+    )
+
+    parser.add_argument("--url", default="http://localhost:5002/api", help="Booking service base URL")
+    parser.add_argument("--inventory-url", default="http://localhost:5001/api", help="Inventory service base URL")
+    parser.add_argument(
+        "--mix",
+        default="mixed",
+        help=f"Preset ({', '.join(MIXES)}) or weights like 'flash_sale=0.7,browse=0.3'"
+    )
+    parser.add_argument(
+        "--rate",
+        default="20",
+        help="Arrival rate in req/s; comma-separated for a step test (e.g. 25,50,100,200)"
+    )
+    parser.add_argument("--ramp-to", type=float, default=None, help="Ramp linearly from --rate to this rate")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds per run (or per ramp)")
+    parser.add_argument("--step-duration", type=float, default=None, help="Seconds per step (default: --duration)")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--room-ids", default="1,2,3,4")
+    parser.add_argument("--hot-room-id", type=int, default=1)
+    parser.add_argument("--start-date", default=None, help="First night YYYY-MM-DD (default: in 30 days)")
+    parser.add_argument("--horizon-days", type=int, default=300)
+    parser.add_argument("--users", default="1000,100000", help="User id range 'min,max'")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default="load_results.json")
+    parser.add_argument("--samples-output", default=None, help="Also write every request as JSON lines")
+
+    args = parser.parse_args()
+
+    start_date = (
+        datetime.strptime(args.start_date, "%Y-%m-%d").date()
+        if args.start_date else (datetime.now() + timedelta(days=30)).date()
+    )
+
+    rng = random.Random(args.seed)
+
+    scenarios = Scenarios(
+        rng,
+        [int(room_id) for room_id in args.room_ids.split(",")],
+        args.hot_room_id,
+        start_date,
+        args.horizon_days,
+        tuple(int(user_id) for user_id in args.users.split(","))
+    )
+
+    stages = parse_stages(args.rate, args.ramp_to, args.duration, args.step_duration)
+
+    generator = LoadGenerator(
+        args.url,
+        args.inventory_url,
+        parse_mix(args.mix),
+        scenarios,
+        args.max_in_flight,
+        args.timeout,
+        args.seed
+    )
+
+    total_time = asyncio.run(generator.run(stages))
+
+    summary = summarize(generator.samples, stages, generator.dropped)
+    knee = find_knee(summary)
+
+    print_summary(summary, knee)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "mix": generator.mix,
+            "stages": summary,
+            "knee_stage": knee,
+            "total_time": total_time,
+            "timestamp": datetime.now().isoformat()
+        }, f, indent=2)
+
+    print(f"\nDetailed results saved to {args.output}")
+
+    if args.samples_output:
+
+        with open(args.samples_output, "w") as f:
+            for sample in generator.samples:
+                f.write(json.dumps(sample) + "\n")
+
+        print(f"Raw samples saved to {args.samples_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+import gc
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import platform
+import sqlite3
+import tempfile
+import importlib
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+import redis
+import requests
+import fakeredis
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from benchmark_report import latency_summary
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Booking's inventory session sends everything under this host to the
+# inventory app's test client instead of the network.
+INVENTORY_URL = "http://inventory.local/api"
+
+
+class FlaskClientAdapter(BaseAdapter):
+    """
+    requests transport adapter that answers from a Flask app's test client,
+    so booking's inventory_client code runs unchanged with no socket in
+    between.
+    """
+
+    def __init__(self, app):
+        super().__init__()
+        self.client = app.test_client()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+
+        url = urlsplit(request.url)
+
+        response = self.client.open(
+            url.path,
+            method=request.method,
+            query_string=url.query,
+            headers=dict(request.headers),
+            data=request.body
+        )
+
+        result = requests.Response()
+
+        result.status_code = response.status_code
+        result.reason = response.status.partition(" ")[2]
+        result.headers = CaseInsensitiveDict(response.headers)
+        result.encoding = get_encoding_from_headers(result.headers)
+        result._content = response.get_data()
+        result.url = request.url
+        result.request = request
+
+        return result
+
+    def close(self):
+
+        pass
+
+
+def load_service(name, env, imports=()):
+    """
+    Imports <name>/app, builds it with create_app() and imports any extra
+    app.* modules in imports. Both services ship a top-level package called
+    `app`, so the modules are taken out of sys.modules afterwards (and
+    returned) to let the other one load. Nothing in either package imports
+    lazily after create_app(), so the moved modules keep working.
+    """
+
+    service_dir = os.path.join(ROOT_DIR, name)
+
+    os.environ.update(env)
+
+    sys.path.insert(0, service_dir)
+
+    try:
+
+        flask_app = importlib.import_module("app").create_app()
+
+        for module_name in imports:
+            importlib.import_module(module_name)
+
+    finally:
+
+        sys.path.remove(service_dir)
+
+    modules = {
+        module_name: sys.modules.pop(module_name)
+        for module_name in list(sys.modules)
+        if module_name == "app" or module_name.startswith("app.")
+    }
+
+    return flask_app, modules
+
+
+class LocalBenchmark:
+    """
+    Runs both services in this process against throwaway SQLite databases
+    and one fakeredis server, then times the booking path piece by piece.
+    Needs no Docker, Postgres, Redis or network, so numbers are repeatable
+    on a laptop. They are not production numbers: SQLite ignores
+    SELECT ... FOR UPDATE and every call runs on one thread.
+    """
+
+    def __init__(self, iterations=500, warmup=50, nights=2, lock_mode="retry", engine="pessimistic"):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.nights = nights
+        self.lock_mode = lock_mode
+        self.engine = engine
+        self.check_in = date.today() + timedelta(days=1)
+        self.check_out = self.check_in + timedelta(days=nights)
+        self.work_dir = None
+        self.results = {}
+
+    def setup(self):
+
+        self.work_dir = tempfile.mkdtemp(prefix="local_benchmark_")
+        self.redis_server = fakeredis.FakeServer()
+
+        common = {
+            "LOG_LEVEL": "WARNING",
+            "LOG_LEVELS": "",
+            "CALENDAR_HORIZON_DAYS": str(self.nights + 7),
+            # Counters are rebuilt explicitly below; no background rebuilds
+            # while measuring.
+            "AVAILABILITY_COUNTER_CHECK_INTERVAL": "0",
+            "RESERVATION_ENGINE": self.engine,
+            "LOCK_MODE": self.lock_mode,
+            "LOCK_BACKEND": "redis",
+            "BOOKING_DISPATCH": "locks",
+            "BOOKING_MODE": "sync",
+            "INVENTORY_SERVICE_URL": INVENTORY_URL
+        }
+
+        self.inventory_app, self.inventory = load_service("inventory", {
+            **common,
+            "DATABASE_URL": f"sqlite:///{os.path.join(self.work_dir, 'inventory.db')}"
+        }, imports=("app.calendar_extension", "app.counters"))
+
+        self.booking_app, self.booking = load_service("booking", {
+            **common,
+            "DATABASE_URL": f"sqlite:///{os.path.join(self.work_dir, 'booking.db')}"
+        })
+
+        # Only the connection class differs from production, so booking's
+        # instrumented pool is still the one handing out connections.
+        self.inventory_app.extensions["redis_pool"] = redis.ConnectionPool(
+            connection_class=fakeredis.FakeConnection,
+            server=self.redis_server,
+            decode_responses=True
+        )
+
+        self.booking_app.extensions["redis_pool"] = self.booking["app.clients"].InstrumentedConnectionPool(
+            connection_class=fakeredis.FakeConnection,
+            server=self.redis_server,
+            max_connections=self.booking_app.config["REDIS_POOL_SIZE"],
+            timeout=self.booking_app.config["REDIS_POOL_TIMEOUT"],
+            decode_responses=True
+        )
+
+        self.booking_app.extensions["inventory_session"].mount(
+            INVENTORY_URL,
+            FlaskClientAdapter(self.inventory_app)
+        )
+
+        with self.inventory_app.app_context():
+
+            db = self.inventory["app.database"].db
+
+            db.create_all()
+
+            # Enough units that no iteration sells out.
+            room = self.inventory["app.models"].Room(
+                room_number="BENCH",
+                room_type="Standard",
+                price_per_night=100.00,
+                total_quantity=10 * (self.iterations + self.warmup)
+            )
+
+            db.session.add(room)
+            db.session.commit()
+
+            self.room_id = room.id
+
+            self.inventory["app.calendar_extension"].extend_calendar(
+                self.inventory_app.config["CALENDAR_HORIZON_DAYS"]
+            )
+            self.inventory["app.counters"].rebuild_counters()
+
+        with self.booking_app.app_context():
+            self.booking["app.database"].db.create_all()
+
+    def teardown(self):
+
+        if self.work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def measure(self, name, operation, before=None, after=None):
+        """
+        Times operation() self.iterations times after self.warmup untimed
+        runs. before() and after() run around it outside the timed section,
+        e.g. to set up or undo what operation does.
+        """
+
+        timings = []
+
+        gc.collect()
+
+        for i in range(self.warmup + self.iterations):
+
+            if before:
+                before()
+
+            start = time.perf_counter()
+            operation()
+            elapsed = time.perf_counter() - start
+
+            if after:
+                after()
+
+            if i >= self.warmup:
+                timings.append(elapsed)
+
+        self.results[name] = latency_summary(timings)
+
+        print(f"✓ {name}")
+
+    def bench_create_booking_locks(self):
+
+        create_booking_locks = self.booking["app.redis_lock"].create_booking_locks
+
+        with self.booking_app.app_context():
+
+            self.measure(
+                "create_booking_locks",
+                lambda: create_booking_locks(self.room_id, self.check_in, self.check_out)
+            )
+
+    def bench_lock_acquire_release(self):
+
+        create_booking_locks = self.booking["app.redis_lock"].create_booking_locks
+
+        with self.booking_app.app_context():
+
+            managers = []
+
+            def create():
+
+                managers.append(create_booking_locks(self.room_id, self.check_in, self.check_out))
+
+            def acquire():
+
+                if not managers[-1].acquire():
+                    raise RuntimeError("Uncontended lock acquisition failed")
+
+            def release():
+
+                managers.pop().release()
+
+            self.measure("BookingLockManager.acquire", acquire, before=create, after=release)
+
+            self.measure(
+                "BookingLockManager.release",
+                release,
+                before=lambda: (create(), acquire())
+            )
+
+    def bench_reserve_range(self):
+
+        client = self.inventory_app.test_client()
+
+        def body(key):
+
+            return {
+                "check_in": self.check_in.isoformat(),
+                "check_out": self.check_out.isoformat(),
+                "reservation_key": key
+            }
+
+        keys = []
+
+        def reserve():
+
+            key = uuid.uuid4().hex
+            response = client.post(f"/api/rooms/{self.room_id}/reserve-range", json=body(key))
+
+            if response.status_code != 200:
+                raise RuntimeError(f"reserve-range returned {response.status_code}: {response.get_data(as_text=True)}")
+
+            keys.append(key)
+
+        def release():
+
+            response = client.post(f"/api/rooms/{self.room_id}/release-range", json=body(keys.pop()))
+
+            if response.status_code != 200:
+                raise RuntimeError(f"release-range returned {response.status_code}: {response.get_data(as_text=True)}")
+
+        self.measure(f"inventory reserve-range ({self.engine})", reserve, after=release)
+
+        self.measure("inventory release-range", release, before=reserve)
+
+    def bench_confirm_booking(self):
+
+        client = self.booking_app.test_client()
+
+        users = iter(range(1, sys.maxsize))
+
+        def confirm():
+
+            response = client.post("/api/bookings/confirm", json={
+                "user_id": next(users),
+                "room_id": self.room_id,
+                "check_in_date": self.check_in.isoformat(),
+                "check_out_date": self.check_out.isoformat()
+            })
+
+            if response.status_code != 201:
+                raise RuntimeError(f"confirm returned {response.status_code}: {response.get_data(as_text=True)}")
+
+        self.measure(f"POST /bookings/confirm ({self.lock_mode} locks)", confirm)
+
+    def run(self, benchmarks):
+
+        self.setup()
+
+        try:
+
+            for benchmark in benchmarks:
+                getattr(self, f"bench_{benchmark}")()
+
+        finally:
+
+            self.teardown()
+
+        return self.results
+
+    def print_results(self):
+
+        print("\n" + "=" * 80)
+        print("LOCAL BENCHMARK (in-process, SQLite + fakeredis)")
+        print("=" * 80 + "\n")
+
+        print(f"Iterations: {self.iterations} (+{self.warmup} warmup), {self.nights} nights, "
+              f"LOCK_MODE={self.lock_mode}, RESERVATION_ENGINE={self.engine}\n")
+
+        print(f"{'':<40} {'Mean':>9} {'P50':>9} {'P95':>9} {'P99':>9}")
+
+        for name, summary in self.results.items():
+            print(f"{name:<40} " + " ".join(
+                f"{summary[key] * 1000:>7.3f}ms" for key in ("mean", "p50", "p95", "p99")
+            ))
+
+
+BENCHMARKS = ("create_booking_locks", "lock_acquire_release", "reserve_range", "confirm_booking")
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks of the booking path with both services in-process"
+    )
+
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--nights", type=int, default=2)
+    parser.add_argument("--lock-mode", choices=["retry", "queue"], default="retry")
+    parser.add_argument("--engine", choices=["pessimistic", "optimistic"], default="pessimistic")
+    parser.add_argument(
+        "--only",
+        default=",".join(BENCHMARKS),
+        help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--output", default="local_benchmark.json")
+
+    args = parser.parse_args()
+
+    benchmarks = [name.strip() for name in args.only.split(",") if name.strip()]
+
+    unknown = set(benchmarks) - set(BENCHMARKS)
+
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    benchmark = LocalBenchmark(args.iterations, args.warmup, args.nights, args.lock_mode, args.engine)
+
+    results = benchmark.run(benchmarks)
+
+    benchmark.print_results()
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "config": {
+                "iterations": args.iterations,
+                "warmup": args.warmup,
+                "nights": args.nights,
+                "lock_mode": args.lock_mode,
+                "engine": args.engine,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version
+            },
+            "benchmarks": results
+        }, f, indent=2)
+
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,11 @@ echo.
 if "%BOOKING_URL%"=="" set BOOKING_URL=http://localhost:5002/api
 if "%NUM_USERS%"=="" set NUM_USERS=50
 if "%ROOM_ID%"=="" set ROOM_ID=1
+if "%BASELINE%"=="" set BASELINE=baseline_report.json
+
+REM --save-baseline records this run as the baseline instead of gating it.
+set SAVE_BASELINE=0
+if "%~1"=="--save-baseline" set SAVE_BASELINE=1
 
 REM Get current date in YYYY-MM-DD format
 for /f "tokens=2 delims==" %%I in ('wmic os get localdatetime /value') do set datetime=%%I
@@ -33,6 +38,7 @@ echo   Concurrent Users: %NUM_USERS%
 echo   Room ID: %ROOM_ID%
 echo   Check-in Date: %CHECK_IN%
 echo   Check-out Date: %CHECK_OUT%
+echo   Baseline: %BASELINE%
 echo.
 
 echo Step 1: Running concurrent booking test...
@@ -46,13 +52,26 @@ python validation\validate_results.py --room-id %ROOM_ID% --check-in "%CHECK_IN%
 
 set VALIDATION_EXIT_CODE=%ERRORLEVEL%
 
+echo.
+echo Step 3: Comparing against the performance baseline...
+if %SAVE_BASELINE%==1 (
+    python benchmark_report.py test_results.json --output "benchmark_report.json" --save-baseline "%BASELINE%"
+    set REPORT_EXIT_CODE=!ERRORLEVEL!
+) else if exist "%BASELINE%" (
+    python benchmark_report.py test_results.json --baseline "%BASELINE%" --output "benchmark_report.json"
+    set REPORT_EXIT_CODE=!ERRORLEVEL!
+) else (
+    echo No baseline at %BASELINE%; run with --save-baseline to record one
+    set REPORT_EXIT_CODE=1
+)
+
 echo.
 echo ========================================
 echo TEST SUMMARY
 echo ========================================
 echo.
 
-if %TEST_EXIT_CODE%==0 if %VALIDATION_EXIT_CODE%==0 (
+if %TEST_EXIT_CODE%==0 if %VALIDATION_EXIT_CODE%==0 if %REPORT_EXIT_CODE%==0 (
     echo [32m✓ ALL TESTS PASSED[0m
     exit /b 0
 ) else (
@@ -67,5 +86,10 @@ if %TEST_EXIT_CODE%==0 if %VALIDATION_EXIT_CODE%==0 (
     ) else (
         echo   DB Validation: FAIL
     )
+    if %REPORT_EXIT_CODE%==0 (
+        echo   Performance Baseline: PASS
+    ) else (
+        echo   Performance Baseline: FAIL
+    )
     exit /b 1
 )
@@ -10,6 +10,16 @@ NUM_USERS="${NUM_USERS:-50}"
 ROOM_ID="${ROOM_ID:-1}"
 CHECK_IN="${CHECK_IN:-$(date -d '+1 day' +%Y-%m-%d)}"
 CHECK_OUT="${CHECK_OUT:-$(date -d '+3 days' +%Y-%m-%d)}"
+BASELINE="${BASELINE:-baseline_report.json}"
+
+# --save-baseline records this run as the baseline instead of gating it.
+SAVE_BASELINE=0
+for arg in "$@"; do
+    case "$arg" in
+        --save-baseline) SAVE_BASELINE=1 ;;
+        *) echo "Unknown argument: $arg"; exit 2 ;;
+    esac
+done
 
 echo "Configuration:"
 echo "  Booking Service: $BOOKING_URL"
@@ -17,6 +27,7 @@ echo "  Concurrent Users: $NUM_USERS"
 echo "  Room ID: $ROOM_ID"
 echo "  Check-in Date: $CHECK_IN"
 echo "  Check-out Date: $CHECK_OUT"
+echo "  Baseline: $BASELINE"
 echo ""
 
 echo "Step 1: Running concurrent booking test..."
@@ -38,18 +49,36 @@ python validation/validate_results.py \
 
 VALIDATION_EXIT_CODE=$?
 
+echo ""
+echo "Step 3: Comparing against the performance baseline..."
+if [ $SAVE_BASELINE -eq 1 ]; then
+    python benchmark_report.py test_results.json \
+        --output "benchmark_report.json" \
+        --save-baseline "$BASELINE"
+    REPORT_EXIT_CODE=$?
+elif [ -f "$BASELINE" ]; then
+    python benchmark_report.py test_results.json \
+        --baseline "$BASELINE" \
+        --output "benchmark_report.json"
+    REPORT_EXIT_CODE=$?
+else
+    echo "No baseline at $BASELINE; run with --save-baseline to record one"
+    REPORT_EXIT_CODE=1
+fi
+
 echo ""
 echo "========================================"
 echo "TEST SUMMARY"
 echo "========================================"
 echo ""
 
-if [ $TEST_EXIT_CODE -eq 0 ] && [ $VALIDATION_EXIT_CODE -eq 0 ]; then
+if [ $TEST_EXIT_CODE -eq 0 ] && [ $VALIDATION_EXIT_CODE -eq 0 ] && [ $REPORT_EXIT_CODE -eq 0 ]; then
     echo "✓ ALL TESTS PASSED"
     exit 0
 else
     echo "✗ SOME TESTS FAILED"
     echo "  Concurrent Test: $([ $TEST_EXIT_CODE -eq 0 ] && echo 'PASS' || echo 'FAIL')"
     echo "  DB Validation: $([ $VALIDATION_EXIT_CODE -eq 0 ] && echo 'PASS' || echo 'FAIL')"
+    echo "  Performance Baseline: $([ $REPORT_EXIT_CODE -eq 0 ] && echo 'PASS' || echo 'FAIL')"
     exit 1
 fi
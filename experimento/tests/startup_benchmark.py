@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import signal
+import subprocess
+import requests
+
+
+# Runs in a fresh interpreter so module imports are part of the measurement,
+# like in a new gunicorn master.
+CREATE_APP_SNIPPET = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def percentile(values, fraction):
+
+    values = sorted(values)
+
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class StartupBenchmark:
+    """
+    Measures how long a service takes to become usable: the cost of
+    create_app() in a fresh process, and the time from spawning the server
+    command until its health endpoint answers 200 (what a readiness probe
+    waits for).
+    """
+
+    def __init__(self, runs=5, timeout=60, poll_interval=0.05):
+        self.runs = runs
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def measure_create_app(self, service_dir):
+
+        timings = []
+
+        for _ in range(self.runs):
+
+            result = subprocess.run(
+                [sys.executable, "-c", CREATE_APP_SNIPPET],
+                cwd=service_dir,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+
+            if result.returncode != 0:
+                raise RuntimeError(f"create_app() failed in {service_dir}:\n{result.stderr}")
+
+            timings.append(float(result.stdout.strip().splitlines()[-1]))
+
+        return timings
+
+    def wait_until_ready(self, health_url, process):
+
+        deadline = time.monotonic() + self.timeout
+
+        while time.monotonic() < deadline:
+
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode} before becoming ready")
+
+            try:
+
+                if requests.get(health_url, timeout=1).status_code == 200:
+                    return True
+
+            except requests.exceptions.RequestException:
+                pass
+
+            time.sleep(self.poll_interval)
+
+        return False
+
+    def measure_time_to_ready(self, command, health_url, cwd=None):
+
+        timings = []
+
+        for _ in range(self.runs):
+
+            start_time = time.perf_counter()
+
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                cwd=cwd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+
+            try:
+
+                if not self.wait_until_ready(health_url, process):
+                    raise RuntimeError(f"{health_url} not ready after {self.timeout}s")
+
+                timings.append(time.perf_counter() - start_time)
+
+            finally:
+
+                os.killpg(process.pid, signal.SIGTERM)
+                process.wait()
+
+        return timings
+
+    def summarize(self, name, metric, timings):
+
+        return {
+            "target": name,
+            "metric": metric,
+            "runs": len(timings),
+            "min": min(timings),
+            "p50": percentile(timings, 0.50),
+            "max": max(timings),
+            "timings": timings
+        }
+
+
+def parse_pair(value):
+
+    name, _, rest = value.partition("=")
+
+    return name, rest
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Measure create_app() cost and time-to-ready of the services"
+    )
+
+    parser.add_argument(
+        "--service",
+        action="append",
+        type=parse_pair,
+        help="name=service_dir to time create_app() in, repeatable "
+             "(default: inventory and booking next to this script)"
+    )
+    parser.add_argument("--command", help="Server command for the time-to-ready measurement")
+    parser.add_argument("--health-url", help="URL polled until it answers 200")
+    parser.add_argument("--cwd", default=None, help="Working directory for --command")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", default="startup_results.json")
+
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    services = args.service or [
+        ("inventory", os.path.join(root, "inventory")),
+        ("booking", os.path.join(root, "booking"))
+    ]
+
+    benchmark = StartupBenchmark(args.runs, args.timeout)
+
+    summaries = []
+
+    for name, service_dir in services:
+
+        print(f"Timing create_app() for {name} ({args.runs} runs)...")
+
+        summaries.append(benchmark.summarize(name, "create_app", benchmark.measure_create_app(service_dir)))
+
+    if args.command:
+
+        if not args.health_url:
+            parser.error("--command requires --health-url")
+
+        print(f"Timing time-to-ready for '{args.command}' ({args.runs} runs)...")
+
+        summaries.append(benchmark.summarize(
+            args.command,
+            "time_to_ready",
+            benchmark.measure_time_to_ready(args.command, args.health_url, args.cwd)
+        ))
+
+    print("\n" + "=" * 80)
+    print("STARTUP RESULTS")
+    print("=" * 80 + "\n")
+
+    print(f"{'Target':<40} {'Metric':<14} {'min':>8} {'P50':>8} {'max':>8}")
+
+    for summary in summaries:
+        print(
+            f"{summary['target'][:40]:<40} "
+            f"{summary['metric']:<14} "
+            f"{summary['min']:>7.3f}s "
+            f"{summary['p50']:>7.3f}s "
+            f"{summary['max']:>7.3f}s"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(summaries, f, indent=2)
+
+    print(f"\nDetailed results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import psycopg2
+import json
+import sys
+
+
+# The booking service's hot queries, with representative parameters. Each
+# one must be answerable from an index once the migrations have run.
+HOT_QUERIES = [
+    (
+        "Bookings by user (GET /bookings/user/<id>)",
+        """
+        SELECT id, status FROM bookings
+        WHERE user_id = %s
+        ORDER BY created_at, id
+        LIMIT 100
+        """,
+        (1000,)
+    ),
+    (
+        "Bookings page after cursor (GET /bookings)",
+        """
+        SELECT id, status FROM bookings
+        WHERE (created_at, id) > (%s, %s)
+        ORDER BY created_at, id
+        LIMIT 100
+        """,
+        ('2026-01-01 00:00:00', 0)
+    ),
+    (
+        "Overlapping stays (validate_results.py)",
+        """
+        SELECT id FROM bookings
+        WHERE room_id = %s
+        AND check_in_date <= %s
+        AND check_out_date > %s
+        """,
+        (1, '2026-03-15', '2026-03-15')
+    ),
+    (
+        "Overlapping stays by daterange",
+        """
+        SELECT id FROM bookings
+        WHERE room_id = %s
+        AND daterange(check_in_date, check_out_date, '[)') && daterange(%s, %s, '[)')
+        """,
+        (1, '2026-03-15', '2026-03-17')
+    ),
+    (
+        "Units taken for a stay (room unit assignment)",
+        """
+        SELECT room_unit FROM bookings
+        WHERE room_id = %s
+        AND status = 'confirmed'
+        AND room_unit IS NOT NULL
+        AND check_in_date < %s
+        AND check_out_date > %s
+        """,
+        (1, '2026-03-17', '2026-03-15')
+    ),
+    (
+        "Live bookings by reservation key (reconciler)",
+        """
+        SELECT reservation_key FROM bookings
+        WHERE reservation_key IN (%s, %s)
+        AND status IN ('pending', 'held', 'confirmed')
+        """,
+        ('a', 'b')
+    ),
+    (
+        "Confirmed bookings not checked out (reconciler)",
+        """
+        SELECT id FROM bookings
+        WHERE status = 'confirmed'
+        AND reservation_key IS NOT NULL
+        AND check_out_date >= %s
+        ORDER BY id
+        """,
+        ('2026-03-15',)
+    ),
+    (
+        "Booking by idempotency key",
+        """
+        SELECT id FROM bookings
+        WHERE idempotency_key = %s
+        """,
+        ('key',)
+    )
+]
+
+
+def find_unindexed_scans(plan, table):
+    """
+    Returns the scans on table that don't narrow the rows through an index:
+    sequential scans, and index scans with no Index Cond (a full walk of
+    some other index just for its ordering).
+    """
+
+    scans = []
+
+    if plan.get("Relation Name") == table:
+
+        node_type = plan.get("Node Type")
+
+        if node_type == "Seq Scan":
+            scans.append(plan)
+
+        elif node_type in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan:
+            scans.append(plan)
+
+    for child in plan.get("Plans", []):
+        scans.extend(find_unindexed_scans(child, table))
+
+    return scans
+
+
+def node_summary(plan):
+
+    nodes = [plan["Node Type"] + (f" using {plan['Index Name']}" if "Index Name" in plan else "")]
+
+    for child in plan.get("Plans", []):
+        nodes.extend(node_summary(child))
+
+    return nodes
+
+
+class QueryPlanChecker:
+
+    def __init__(self, booking_db_config):
+        self.booking_db_config = booking_db_config
+
+    def check(self):
+
+        print(f"\n{'='*80}")
+        print("QUERY PLAN GUARDRAILS")
+        print(f"{'='*80}\n")
+
+        conn = psycopg2.connect(**self.booking_db_config)
+
+        failures = []
+
+        try:
+
+            cursor = conn.cursor()
+
+            # With seq scans priced out, the planner still picks one only
+            # when no index can answer the query, so small test tables
+            # give the same verdict as production-sized ones.
+            cursor.execute("SET enable_seqscan = off")
+
+            for name, query, params in HOT_QUERIES:
+
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+
+                plan = cursor.fetchone()[0][0]["Plan"]
+
+                if find_unindexed_scans(plan, "bookings"):
+                    failures.append(name)
+                    print(f"✗ {name}: {' → '.join(node_summary(plan))} (no index condition on bookings)")
+                else:
+                    print(f"✓ {name}: {' → '.join(node_summary(plan))}")
+
+        finally:
+
+            conn.rollback()
+            conn.close()
+
+        print()
+
+        if failures:
+            print(f"✗ {len(failures)} hot queries no longer use an index")
+            return False
+
+        print("✓ All hot queries use indexes")
+        return True
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Fail when the booking hot queries stop using indexes'
+    )
+
+    parser.add_argument('--booking-host', default='localhost')
+    parser.add_argument('--booking-port', type=int, default=5433)
+    parser.add_argument('--booking-db', default='booking_db')
+    parser.add_argument('--booking-user', default='booking_user')
+    parser.add_argument('--booking-password', default='booking_pass')
+
+    parser.add_argument('--json', action='store_true', help='Print the raw plans as JSON')
+
+    args = parser.parse_args()
+
+    booking_db_config = {
+        'host': args.booking_host,
+        'port': args.booking_port,
+        'database': args.booking_db,
+        'user': args.booking_user,
+        'password': args.booking_password
+    }
+
+    try:
+
+        if args.json:
+
+            conn = psycopg2.connect(**booking_db_config)
+            cursor = conn.cursor()
+
+            for name, query, params in HOT_QUERIES:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+                print(json.dumps({"query": name, "plan": cursor.fetchone()[0]}, indent=2))
+
+            conn.close()
+
+        result = QueryPlanChecker(booking_db_config).check()
+
+        sys.exit(0 if result else 1)
+
+    except Exception as e:
+
+        print(f"\n✗ Query plan check failed with error: {e}")
+
+        import traceback
+        traceback.print_exc()
+
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+import psycopg2
+import csv
+import sys
+import time
+
+
+# Per-night occupancy of every stay overlapping [start, end). The series
+# is of integer offsets rather than timestamps, which is cheaper per row.
+# Pending bookings and live holds are counted apart: they may already hold
+# inventory, so they can explain a shortfall but never count as sold.
+OCCUPANCY_QUERY = """
+    SELECT b.room_id, GREATEST(b.check_in_date, %(start)s::date) + night AS date,
+           COUNT(*) FILTER (WHERE b.status = 'confirmed'),
+           COUNT(*) FILTER (WHERE b.status IN ('pending', 'held'))
+    FROM bookings b
+    CROSS JOIN LATERAL generate_series(
+        0,
+        LEAST(b.check_out_date, %(end)s::date) - GREATEST(b.check_in_date, %(start)s::date) - 1
+    ) AS night
+    WHERE b.status IN ('confirmed', 'pending', 'held')
+    AND b.check_out_date > %(start)s::date
+    AND b.check_in_date < %(end)s::date
+    AND (%(room_ids)s::int[] IS NULL OR b.room_id = ANY(%(room_ids)s::int[]))
+    GROUP BY 1, 2
+"""
+
+# Every night whose stock disagrees with the bookings copied in above:
+# oversold (more confirmed stays than units), overcounted (more units free
+# than confirmed stays leave, so the room will oversell), leaked (fewer
+# free than confirmed + pending stays explain) or booked on a night that
+# has no availability row.
+DISCREPANCY_QUERY = """
+    SELECT room_id, date, total_quantity, available_quantity, booked, pending,
+           CASE
+               WHEN available_quantity IS NULL THEN 'missing_night'
+               WHEN booked > total_quantity THEN 'oversold'
+               WHEN available_quantity > total_quantity - booked THEN 'overcounted'
+               ELSE 'leaked'
+           END AS problem
+    FROM (
+        SELECT COALESCE(a.room_id, o.room_id) AS room_id,
+               COALESCE(a.date, o.date) AS date,
+               r.total_quantity,
+               a.available_quantity,
+               COALESCE(o.booked, 0) AS booked,
+               COALESCE(o.pending, 0) AS pending
+        FROM (
+            SELECT room_id, date, available_quantity
+            FROM availability
+            WHERE date >= %(start)s::date
+            AND date < %(end)s::date
+            AND (%(room_ids)s::int[] IS NULL OR room_id = ANY(%(room_ids)s::int[]))
+        ) a
+        FULL JOIN booked_nights o ON o.room_id = a.room_id AND o.date = a.date
+        LEFT JOIN rooms r ON r.id = COALESCE(a.room_id, o.room_id)
+    ) nights
+    WHERE available_quantity IS NULL
+    OR booked > total_quantity
+    OR available_quantity > total_quantity - booked
+    OR available_quantity < total_quantity - booked - pending
+    ORDER BY room_id, date
+"""
+
+
+class CursorReader:
+    """
+    File-like view of a cursor's rows as COPY text, so copy_expert() can
+    stream them into the other database without building the whole
+    payload in memory.
+    """
+
+    def __init__(self, cursor):
+        self.rows = iter(cursor)
+        self.buffer = ''
+        self.count = 0
+
+    def read(self, size=-1):
+
+        while size < 0 or len(self.buffer) < size:
+
+            row = next(self.rows, None)
+
+            if row is None:
+                break
+
+            self.buffer += '\t'.join(str(value) for value in row) + '\n'
+            self.count += 1
+
+        if size < 0:
+            size = len(self.buffer)
+
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+
+        return data
+
+
+class RangeValidator:
+    """
+    Audits every room and night in a date range in one pass: booking_db
+    expands confirmed stays into per-night counts, which are streamed with
+    COPY into a temp table on inventory_db and checked against
+    availability with a single join.
+    """
+
+    def __init__(self, booking_db_config, inventory_db_config, batch_size=50000, work_mem='256MB'):
+        self.booking_db_config = booking_db_config
+        self.inventory_db_config = inventory_db_config
+        self.batch_size = batch_size
+        self.work_mem = work_mem
+
+    def validate(self, start, end, room_ids=None, limit=50, output=None):
+
+        print(f"\n{'='*80}")
+        print("FULL-RANGE INVENTORY VALIDATION")
+        print(f"{'='*80}\n")
+
+        print(f"Range: {start} → {end} (exclusive), rooms: {', '.join(map(str, room_ids)) if room_ids else 'all'}")
+
+        params = {'start': start, 'end': end, 'room_ids': room_ids}
+
+        booking_conn = psycopg2.connect(**self.booking_db_config)
+        inventory_conn = psycopg2.connect(**self.inventory_db_config)
+
+        try:
+
+            started = time.perf_counter()
+
+            booking_cursor = booking_conn.cursor()
+
+            # Room for the per-night aggregate to stay in memory instead of
+            # spilling to disk; scoped to this transaction only.
+            booking_cursor.execute('SELECT set_config(%s, %s, true)', ('work_mem', self.work_mem))
+
+            # A named cursor is server-side: rows arrive batch_size at a
+            # time instead of all at once.
+            occupancy = booking_conn.cursor(name='occupancy')
+            occupancy.itersize = self.batch_size
+            occupancy.execute(OCCUPANCY_QUERY, params)
+
+            inventory_cursor = inventory_conn.cursor()
+
+            inventory_cursor.execute("""
+                CREATE TEMP TABLE booked_nights (
+                    room_id integer,
+                    date date,
+                    booked integer,
+                    pending integer,
+                    PRIMARY KEY (room_id, date)
+                ) ON COMMIT DROP
+            """)
+
+            reader = CursorReader(occupancy)
+
+            inventory_cursor.copy_expert('COPY booked_nights FROM STDIN', reader, size=1 << 16)
+            inventory_cursor.execute('ANALYZE booked_nights')
+
+            copied = time.perf_counter()
+
+            print(f"Copied {reader.count} occupied room-nights in {copied - started:.2f}s")
+
+            inventory_cursor.execute(DISCREPANCY_QUERY, params)
+
+            problems = inventory_cursor.fetchall()
+
+            inventory_cursor.execute("""
+                SELECT COUNT(*) FROM availability
+                WHERE date >= %(start)s::date
+                AND date < %(end)s::date
+                AND (%(room_ids)s::int[] IS NULL OR room_id = ANY(%(room_ids)s::int[]))
+            """, params)
+
+            checked = inventory_cursor.fetchone()[0]
+
+            print(f"Checked {checked} availability rows in {time.perf_counter() - copied:.2f}s")
+
+        finally:
+
+            booking_conn.rollback()
+            booking_conn.close()
+
+            inventory_conn.rollback()
+            inventory_conn.close()
+
+        by_problem = {}
+
+        for problem in problems:
+            by_problem[problem[6]] = by_problem.get(problem[6], 0) + 1
+
+        print(f"\n{'='*80}")
+        print("VALIDATION RESULTS")
+        print(f"{'='*80}\n")
+
+        for problem in ('oversold', 'overcounted', 'leaked', 'missing_night'):
+            count = by_problem.get(problem, 0)
+            print(f"{'✓' if count == 0 else '✗'} {problem}: {count} nights")
+
+        if problems:
+
+            print(f"\n   {'Room':>6} {'Date':<12} {'Total':>6} {'Avail':>6} {'Booked':>7} {'Pending':>8}  Problem")
+
+            for room_id, date, total, available, booked, pending, problem in problems[:limit]:
+                print(
+                    f"   {room_id:>6} {date.isoformat():<12} {str(total):>6} {str(available):>6} "
+                    f"{booked:>7} {pending:>8}  {problem}"
+                )
+
+            if len(problems) > limit:
+                print(f"   ... {len(problems) - limit} more")
+
+        if output:
+
+            with open(output, 'w', newline='') as f:
+
+                writer = csv.writer(f)
+
+                writer.writerow([
+                    'room_id', 'date', 'total_quantity', 'available_quantity',
+                    'booked', 'pending', 'problem'
+                ])
+                writer.writerows(problems)
+
+            print(f"\nAll {len(problems)} discrepancies saved to {output}")
+
+        passed = not problems
+
+        print(f"\n{'='*80}")
+        print(f"OVERALL VALIDATION: {'✓ PASS' if passed else '✗ FAIL'}")
+        print(f"{'='*80}\n")
+
+        return passed
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Check every room and night in a date range against the confirmed bookings'
+    )
+
+    parser.add_argument('--booking-host', default='localhost')
+    parser.add_argument('--booking-port', type=int, default=5433)
+    parser.add_argument('--booking-db', default='booking_db')
+    parser.add_argument('--booking-user', default='booking_user')
+    parser.add_argument('--booking-password', default='booking_pass')
+
+    parser.add_argument('--inventory-host', default='localhost')
+    parser.add_argument('--inventory-port', type=int, default=5432)
+    parser.add_argument('--inventory-db', default='inventory_db')
+    parser.add_argument('--inventory-user', default='inventory_user')
+    parser.add_argument('--inventory-password', default='inventory_pass')
+
+    parser.add_argument('--start', required=True, help='First night to check (YYYY-MM-DD)')
+    parser.add_argument('--end', required=True, help='Night after the last one to check (YYYY-MM-DD)')
+    parser.add_argument('--room-ids', default=None, help='Comma-separated room ids (default: all)')
+    parser.add_argument('--batch-size', type=int, default=50000, help='Rows per server-side cursor fetch')
+    parser.add_argument('--work-mem', default='256MB', help='work_mem for the occupancy aggregate')
+    parser.add_argument('--limit', type=int, default=50, help='Discrepancies to print')
+    parser.add_argument('--output', default=None, help='CSV file for every discrepancy')
+
+    args = parser.parse_args()
+
+    booking_db_config = {
+        'host': args.booking_host,
+        'port': args.booking_port,
+        'database': args.booking_db,
+        'user': args.booking_user,
+        'password': args.booking_password
+    }
+
+    inventory_db_config = {
+        'host': args.inventory_host,
+        'port': args.inventory_port,
+        'database': args.inventory_db,
+        'user': args.inventory_user,
+        'password': args.inventory_password
+    }
+
+    room_ids = [int(room_id) for room_id in args.room_ids.split(',')] if args.room_ids else None
+
+    validator = RangeValidator(booking_db_config, inventory_db_config, args.batch_size, args.work_mem)
+
+    try:
+
+        result = validator.validate(args.start, args.end, room_ids, args.limit, args.output)
+
+        sys.exit(0 if result else 1)
+
+    except Exception as e:
+
+        print(f"\n✗ Validation failed with error: {e}")
+
+        import traceback
+        traceback.print_exc()
+
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()